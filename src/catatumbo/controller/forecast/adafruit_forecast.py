@@ -32,19 +32,29 @@ limitations under the License.
 @deffield    created: December 2019
 @deffield    updated: Updated
 '''
+import hashlib
+import logging
 
-from datetime import timedelta, datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
 from catatumbo.controller.forecast.forecast_colors import ForecastNeoPixelColors
+from catatumbo.controller.forecast.forecast_colormap import ForecastColormap
+from catatumbo.controller.forecast.forecast_provider import createForecastProvider, ForecastUnavailableError
 from catatumbo.core.neopixel_multibase import NeoPixelMultiBase
+from catatumbo.core.neopixel_backend import RGB
+from catatumbo.core.animation import Pulse
 from catatumbo.core.util.cmd_functions import cmd_options
 from catatumbo.core.util.configurations import Configurations
+from catatumbo.core.util.instrumentation import timed, startTimer, stopTimer
+from catatumbo.core.util.log import configureLogging
+from catatumbo.core.util import events
 from catatumbo.core.util.update_thread import queueUpdate
 from catatumbo.core.util.utility import numberToBase, is_dst
-from pyowm import OWM
-from pyowm.exceptions.api_call_error import APIInvalidSSLCertificateError
 
 
+_log = logging.getLogger(__name__)
+
 class NeoPixelForecast(NeoPixelMultiBase):
     
     __version__ = 0.1
@@ -81,10 +91,19 @@ class NeoPixelForecast(NeoPixelMultiBase):
     CONDITION_SLRAI = 0x04
     CONDITION_RAI   = 0x05 
     
+    # COLOR MAP
+    # discrete colors per weather condition or continuous gradients of temperature, cloud and rain, see forecast_colormap.py
+    COLORMAP_DISCRETE   = 'discrete'
+    COLORMAP_CONTINUOUS = 'continuous'
+    
+    # indication of storm and extreme weather slots, see animation.py
+    STORM_EFFECT    = Pulse(period = 1.0, minimum = 0.2)
+    
     """
     OBJECT ATTRIBUTES
     """
-    owm = None
+    # source of the forecast data, see forecast_provider.py
+    provider = None
     # geo coordinates for desired location
     cityID = 0
     cityName = None
@@ -96,10 +115,24 @@ class NeoPixelForecast(NeoPixelMultiBase):
     winterConf = False
     # winterMode is the mode dependent on the time of the year
     winterMode = False
+    # color scale of the forecast, see COLORMAP_DISCRETE and COLORMAP_CONTINUOUS
+    colorMap = COLORMAP_DISCRETE
     
     # sampleboard storing currently displayed weather conditions
     # a dictionary consisting of {<id> : {"timestamp", "color", "CATAcode", "OWMcode", "temp", "cloud", "rain", "debug"}, ...}
     __sampleboard = None
+    # palette resolving the colors of the weather conditions published for external status requests
+    __statusPalette = None
+    # lookup tables of the continuous color scale, created on first use
+    __colormap = None
+    # pixel ranges of the animated storm slots, see __animateStorm
+    __stormSlots = ()
+    # serialized sampleboard and its entity tag, built once per update for external status requests
+    __conditionsSnapshot = None
+    # forecast provider passed to a deferred constructor, see initialize
+    __pendingProvider = None
+    # forecast requested during initialize, consumed by the first fillStrips
+    __prefetchedForecast = None
 
     """
         TODO adapt config to Forecast requirement
@@ -129,18 +162,79 @@ class NeoPixelForecast(NeoPixelMultiBase):
         
         :param    color_schema: the color schema class which defined the color values, e.g. NeoPixelColors or derived classes
         :type     color_schema: class
+        :param    forecast_provider: source of the forecast data, if not defined the provider will be created based on configuration
+        :type     forecast_provider: ForecastProvider
+        :param    deferred: only initializes the strips and shows the last frame, initialize needs to be called before fillStrips
+        :type     deferred: boolean
     """  
-    def __init__(self, color_schema):
+    def __init__(self, color_schema, forecast_provider = None, deferred = False):
+        
+        super().__init__(color_schema, resolve_location = not deferred)
         
-        super().__init__(color_schema)
+        # published colors are RGB, independent of the pixel order of the strips
+        self.__statusPalette = color_schema(RGB).getPalette()
         
         config = Configurations()
         
         #get non OWM specific properties          
         self.winterConf = config.isWinterMode()
+        self.colorMap = config.getColorMap()
+        
+        #init forecast provider and location
+        if deferred:
+            self.__pendingProvider = forecast_provider
+        else:
+            self.__init_Provider(config, forecast_provider)
+            self.__init_CityID()
+    
+    """
+        completes a deferred construction by resolving the location, the forecast provider and the first forecast concurrently
+        the external IP lookup runs alongside the provider initialization, the forecast is requested alongside the city registry lookup
+        if the location is defined by coordinates
+        a failed initialization may be repeated, e.g. if the network was not up yet
+    """
+    def initialize(self):
+        config = Configurations()
+        provider = self.__pendingProvider
+        
+        with ThreadPoolExecutor(max_workers = 2, thread_name_prefix = 'forecast-init') as executor:
+            location = executor.submit(self.resolveLocation)
+            
+            if provider is None:
+                provider = createForecastProvider(config)
+            self.__init_Provider(config, provider, location)
+            
+            # the request does not depend on the registry lookup if coordinates or the city id are known already
+            if (self.cityLat is not None and self.cityLon is not None) or \
+               self.cityID is not None or \
+               not self.provider.requiresLocation():
+                self.__prefetchedForecast = executor.submit(self.__requestForecast)
+            self.__init_CityID()
+            
+            # location is required for the brightness adaption
+            location.result()
+        
+        self.__pendingProvider = None
+
+    """
+        reloads the forecast configuration after a change, e.g. by the batch configuration service
+        the change becomes visible with the next call of fillStrips
+        
+        :param    location: the location was changed and needs to be resolved again
+        :type     location: boolean
+    """
+    def reloadConfiguration(self, location = False):
+        config = Configurations()
+        
+        self.winterConf = config.isWinterMode()
+        if not self.winterConf:
+            self.winterMode = False
+        self.colorMap = config.getColorMap()
         
-        #init OWM registration
-        self.__init_OWM(config)
+        if location:
+            # keep the current forecast provider
+            self.__init_Provider(config, self.provider)
+            self.__init_CityID()
 
     ########################################
     #            UTILITY METHODS           #
@@ -148,17 +242,21 @@ class NeoPixelForecast(NeoPixelMultiBase):
     
     """
         reads forecast config values from the defined property file
-        this will instantiate the OpenWeatherMap instance and read country, city, ... data
+        this will instantiate the forecast provider, e.g. OpenWeatherMap, and read country, city, ... data
         
-        property file consists of two sections:
+        property file consists of three sections:
             - [OWMData]:APIKeyDomain, APIKeyName(optional), APIKey
+            - [ProviderData]:Provider, ReplayDir, ReplayLatency, RecordDir (all optional)
             - [ApplicationData]:CityID, CityName, Country
+        
+        :param    location: pending resolution of the local location, only awaited if required as fallback
+        :type     location: Future
     """
-    def __init_OWM(self, config):            
-        #get your personal key
-        apiKey = config.getOWMKey();
-        if apiKey is None:
-            raise RuntimeError('You need to define an Open Weather Map API key to run the forecast module!')
+    def __init_Provider(self, config, provider = None, location = None):
+        #get the source of the forecast data
+        if provider is None:
+            provider = createForecastProvider(config)
+        self.provider = provider
         
         #get location for request
         #TODO get location via IP: https://ipinfo.io/developers
@@ -167,16 +265,12 @@ class NeoPixelForecast(NeoPixelMultiBase):
         self.cityID         = config.getCityID()
         self.cityName       = config.getCityName()
         self.cityCountry    = config.getCityCountry()
-               
-        #initiate OpenWeatherMap object
-        self.owm = OWM(apiKey);
-        reg = self.owm.city_id_registry()
                 
         #check whether we can get get lon/lat and id based on cityName and cityCountry
         if self.cityName is not None and self.cityCountry is not None:
             if self.cityLat is None or self.cityLon is None:
                 try:
-                    locs = reg.locations_for(self.cityName, self.cityCountry, matching='exact')
+                    locs = self.provider.getLocations(self.cityName, self.cityCountry)
                     #always select first from list
                     loc = locs.pop(0)
                     self.cityID = int(loc[0])
@@ -184,24 +278,30 @@ class NeoPixelForecast(NeoPixelMultiBase):
                     self.cityLon = float(loc[3])
                 except (ValueError, IndexError):
                     pass
-        else:
+        elif self.cityLat is None or self.cityLon is None:
+            if location is not None:
+                location.result()
             # fallback to location determined by external IP of Raspberry
             self.cityName       = self.localCity
             self.cityCountry    = self.localCountry
             self.cityLat        = self.localLat
             self.cityLon        = self.localLon 
-        
+    
+    """
+        looks up the city id in the registry of the forecast provider, if not defined by configuration
+    """
+    def __init_CityID(self):
         # final try to get city id for defined location
         if self.cityID is None:
             try:
-                locs = reg.ids_for(self.cityName, self.cityCountry, matching='exact')
+                locs = self.provider.getIDs(self.cityName, self.cityCountry)
                 #always select first from list
                 loc = locs.pop(0)
                 self.cityID = int(loc[0])
             except (ValueError, IndexError):
                 pass
         
-        if self.cityID is None and self.cityLat == self.cityLon == None:          
+        if self.cityID is None and self.cityLat == self.cityLon == None and self.provider.requiresLocation():          
             raise RuntimeError('Defined city could not be found: {0}'.format(self.cityName))
     
     
@@ -218,23 +318,27 @@ class NeoPixelForecast(NeoPixelMultiBase):
                     see MODE_TODAY, MODE_TOMORROW_DAYTIME, MODE_ALL, ...
         :type     color_mode: str
     """
+    @timed('forecast.fillStrips', 'full forecast update: fetch, classification and rendering')
     def fillStrips(self, color_mode = '2'):
         
-        print("#### " + str(datetime.now()) + " Updating weather information")
+        _log.info("Updating weather information")
         
-        #request forecast
-        #https://pyowm.readthedocs.io/en/latest/usage-examples-v2/weather-api-usage-examples.html#getting-weather-forecasts
+        #request forecast from the configured provider, e.g. OWM
+        prefetched, self.__prefetchedForecast = self.__prefetchedForecast, None
         try:
-            if self.cityLat is not None and self.cityLon is not None:
-                forecast = self.owm.three_hours_forecast_at_coords(float(self.cityLat),
-                                                                   float(self.cityLon))
+            if prefetched is not None:
+                forecast = prefetched.result()
             else:
-                forecast = self.owm.three_hours_forecast_at_id(self.cityID)
-        except (APIInvalidSSLCertificateError):
+                forecast = self.__requestForecast()
+        except (ForecastUnavailableError) as e:
             # network temporarily not available
-            print('Network error during OWM call')
+            _log.warning("Forecast not available: %s", e)
             # stop processing here
             return
+        
+        if forecast is None:
+            _log.warning("No forecast available for defined location")
+            return
 
         # create sampleboard dictionary for current weather condition
         sampleboard = {}
@@ -256,6 +360,7 @@ class NeoPixelForecast(NeoPixelMultiBase):
         
         
         # track current date & time of forecast
+        start = startTimer()
         cdate = forecast.when_starts('date')
         index = 0
 
@@ -275,14 +380,46 @@ class NeoPixelForecast(NeoPixelMultiBase):
         
         # prepare mask for day turn analysis by shifting by the offset
         mask = (mask >> offset) & 0xFFFFFFFFFF
+        stopTimer('forecast.classify', start)
 
-        print(sampleboard)
+        _log.debug("sampleboard: %s", sampleboard)
 
         # display weather forecast on LED strip
         self.setPixelBySampleboard(sampleboard, mask)
         
         # store currently displayed weather condition for external status requests
-        self.__sampleboard = sampleboard
+        # the palette index of the colors is resolved to the color values
+        conditions = {index : dict(condition, color = self.__statusPalette.getColor(condition['color']))
+                      for index, condition in sampleboard.items()}
+        self.__sampleboard = conditions
+        self.__conditionsSnapshot = self.__createSnapshot(conditions)
+        events.publish(conditions = conditions)
+
+    """
+        requests the forecast for the defined location from the forecast provider
+    """
+    def __requestForecast(self):
+        start = startTimer()
+        try:
+            return self.provider.getForecast(self.cityLat, 
+                                             self.cityLon, 
+                                             self.cityID)
+        finally:
+            stopTimer('forecast.fetch', start)
+
+    """
+        serializes the weather condition once, so status requests do not need to encode it again
+        the entity tag is derived from the content, so an unchanged forecast keeps its tag across updates
+        
+        :param    sampleboard: currently displayed weather condition
+        :type     sampleboard: dict
+        :returns: tuple (<entity tag>, <serialized weather condition>)
+    """
+    def __createSnapshot(self, sampleboard):
+        import json5
+        
+        body = json5.dumps(sampleboard, allow_nan = True)
+        return (hashlib.sha1(body.encode('utf-8')).hexdigest()[:16], body)
 
     def _fillSampleBoard(self, cdate, index, sampleboard, weather):
         # get 3-byte or 4-byte color representation based on weather condition
@@ -342,19 +479,28 @@ class NeoPixelForecast(NeoPixelMultiBase):
         the logic for the blocks resulted from the forecast functionality, in which only certain periods of the day were taken over into sampleboard.
         
         TODO the implementation of divider needs refactoring, simplifying coding and also considering cases where full day is considered in bit mask but still there should be a day divider being shown
-        TODO implement blinking indication for storm and extreme weather situations
+        slots indicating storm or extreme weather pulse on top of the static frame, see STORM_EFFECT
         
         :param    sampleboard: TODO UPDATE DESCRIPTION BASED ON CHANGED STRUCTURE list of color values defining the section, the section size depends on the number of pixels available in total
         :type     sampleboard: list
         :param    mask: a binary list, indicating each sampleboard entry by a binary 1 and each block being separated by a binary 0 in between.
         :type     mask: long int
     """       
+    @timed('render.setPixelBySampleboard', 'rendering of a sampleboard including transfer to the strips')
     def setPixelBySampleboard(self, sampleboard, mask = -1):
+        # the frame is drawn into the back buffer and published as a whole by show
+        self.draw(self.__renderSampleboard, sampleboard, mask)
+    
+    def __renderSampleboard(self, sampleboard, mask):
         
         # do nothing if sampleboard is empty
         if len(sampleboard) == 0:
             return
         
+        if self.colorMap == type(self).COLORMAP_CONTINUOUS:
+            self.__renderColormap(sampleboard)
+            return
+        
         # check if a color block mask was provided
         # set with all individual block lengths, the total number of dividers and divider length in relation to strip length
         block_set = ()
@@ -443,9 +589,51 @@ class NeoPixelForecast(NeoPixelMultiBase):
                     #print('[' + str(pixelindex) + '] ' + str(sampleboard[int(pixelindex / sectionsize)]))
                     
         
+        # animations are shown with the frame
+        self.__animateStorm(sampleboard, sectionsize)
+        
         # update color values if not done automatically
         self.show()
     
+    """
+        renders the sampleboard by the continuous color scale, each strip is rendered as a whole, see forecast_colormap.py
+        day dividers are not shown in this mode
+    """
+    def __renderColormap(self, sampleboard):
+        if self.__colormap is None:
+            self.__colormap = ForecastColormap()
+        
+        sectionsize = int(self.getNumPixels() / len(sampleboard))
+        frames = self.__colormap.render(sampleboard, self.getLayer().getStrips(), self.getPalettes(), sectionsize,
+                                        self.winterMode)
+        for num, frame in enumerate(frames):
+            self.setStripFrame(num, frame)
+        
+        self.__animateStorm(sampleboard, sectionsize)
+        self.show()
+    
+    """
+        pulses the slots of the sampleboard indicating storm or extreme weather, only the pixels of these slots are animated
+        
+        :param    sampleboard: sampleboard shown
+        :type     sampleboard: dict
+        :param    sectionsize: number of pixels per slot
+        :type     sectionsize: int
+    """
+    def __animateStorm(self, sampleboard, sectionsize):
+        slots = []
+        for index in range(len(sampleboard)):
+            if sampleboard[index].get('CATAcode', 0) & type(self).CONDITION_STORM:
+                # the last slot covers the remaining pixels
+                end = self.getNumPixels() if index == len(sampleboard) - 1 else (index + 1) * sectionsize
+                slots.append(range(index * sectionsize, end))
+        
+        # running animations continue if the storm slots did not change
+        # the animator is created with the first storm
+        if tuple(slots) != self.__stormSlots:
+            self.getAnimator().setAnimations({index : (pixels, type(self).STORM_EFFECT) for index, pixels in enumerate(slots)})
+            self.__stormSlots = tuple(slots)
+    
     """
         maps weather conditions (temperature, rain and cloud) to color values
         For each temperature scale (low, medium, high) values for rain (prioritized over cloud) and cloudiness will be indicated
@@ -470,7 +658,8 @@ class NeoPixelForecast(NeoPixelMultiBase):
         :type     humidity: integer
         :param    pressure: athmosperic pressure in hPa
         :type     pressure: float
-        :returns: a dictionary consisting of {"timestamp", "color", "CATAcode", "OWMcode", "temp", "cloud", "rain", "debug"}
+        :returns: a dictionary consisting of {"timestamp", "color", "CATAcode", "OWMcode", "temp", "cloud", "rain", "debug"},
+                    the color is a palette index of ForecastNeoPixelColors resolved per strip
     """
     def mapWeatherConditions(self,  
                                 temp, 
@@ -535,12 +724,12 @@ class NeoPixelForecast(NeoPixelMultiBase):
             if rain > 2.5:
                 c = ForecastNeoPixelColors.W_LOWTMP_RAINY
                 code = type(self).CONDITION_LTMP | type(self).CONDITION_RAI
-                debug = "low temp [{0} C], rainy [{1}mm/qm]".format(temp, rain)
+                debug = "low temp [{temp} C], rainy [{rain}mm/qm]"
             # slightly rainy
             elif rain > 0.3:
                 c = ForecastNeoPixelColors.W_LOWTMP_SLRAINY
                 code = type(self).CONDITION_LTMP | type(self).CONDITION_SLRAI
-                debug = "low temp [{0} C], slightly rainy [{1}mm/qm]".format(temp, rain)
+                debug = "low temp [{temp} C], slightly rainy [{rain}mm/qm]"
             # no rain
             else:
                 # second prio - cloud coverage
@@ -548,17 +737,17 @@ class NeoPixelForecast(NeoPixelMultiBase):
                 if cloud > (100 * 3/8):
                     c = ForecastNeoPixelColors.W_LOWTMP_CLOUDY
                     code = type(self).CONDITION_LTMP | type(self).CONDITION_CLO
-                    debug = "low temp [{0} C], cloudy [{1}%]".format(temp, cloud)
+                    debug = "low temp [{temp} C], cloudy [{cloud}%]"
                 # slightly cloudy
                 elif cloud > (100 * 1/8):
                     c = ForecastNeoPixelColors.W_LOWTMP_SLCLOUDY
                     code = type(self).CONDITION_LTMP | type(self).CONDITION_SLCLO
-                    debug = "low temp [{0} C], slightly cloudy [{1}%]".format(temp, cloud)
+                    debug = "low temp [{temp} C], slightly cloudy [{cloud}%]"
                 # no clouds
                 else:
                     c = ForecastNeoPixelColors.W_LOWTMP
                     code = type(self).CONDITION_LTMP | type(self).CONDITION_CLEAR
-                    debug = "low temp [{0} C]".format(temp)
+                    debug = "low temp [{temp} C]"
         # mid temp
         elif (not(self.winterMode) and temp <= 25) or (self.winterMode and temp <= 10):
             # highest prio - rain fall indication
@@ -566,12 +755,12 @@ class NeoPixelForecast(NeoPixelMultiBase):
             if rain > 2.5:
                 c = ForecastNeoPixelColors.W_MIDTMP_RAINY
                 code = type(self).CONDITION_MTMP | type(self).CONDITION_RAI
-                debug = "mid temp [{0} C], rainy [{1}mm/qm]".format(temp, rain)
+                debug = "mid temp [{temp} C], rainy [{rain}mm/qm]"
             # slightly rainy
             elif rain > 0.3:
                 c = ForecastNeoPixelColors.W_MIDTMP_SLRAINY
                 code = type(self).CONDITION_MTMP | type(self).CONDITION_SLRAI
-                debug = "mid temp [{0} C], slightly rainy [{1}mm/qm]".format(temp, rain)
+                debug = "mid temp [{temp} C], slightly rainy [{rain}mm/qm]"
             # no rain
             else:
                 # second prio - cloud coverage
@@ -579,17 +768,17 @@ class NeoPixelForecast(NeoPixelMultiBase):
                 if cloud > (100 * 3/8):
                     c = ForecastNeoPixelColors.W_MIDTMP_CLOUDY
                     code = type(self).CONDITION_MTMP | type(self).CONDITION_CLO
-                    debug = "mid temp [{0} C], cloudy [{1}%]".format(temp, cloud)
+                    debug = "mid temp [{temp} C], cloudy [{cloud}%]"
                 # slightly cloudy
                 elif cloud > (100 * 1/8):
                     c = ForecastNeoPixelColors.W_MIDTMP_SLCLOUDY
                     code = type(self).CONDITION_MTMP | type(self).CONDITION_SLCLO
-                    debug = "mid temp [{0} C], slightly cloudy [{1}%]".format(temp, cloud)
+                    debug = "mid temp [{temp} C], slightly cloudy [{cloud}%]"
                 # no clouds
                 else:
                     c = ForecastNeoPixelColors.W_MIDTMP
                     code = type(self).CONDITION_MTMP | type(self).CONDITION_CLEAR
-                    debug = "mid temp [{0} C]".format(temp)
+                    debug = "mid temp [{temp} C]"
         # high temp
         elif (not(self.winterMode) and temp > 25) or (self.winterMode and temp > 10):
             # highest prio - rain fall indication
@@ -597,12 +786,12 @@ class NeoPixelForecast(NeoPixelMultiBase):
             if rain > 2.5:
                 c = ForecastNeoPixelColors.W_HITMP_RAINY
                 code = type(self).CONDITION_HTMP | type(self).CONDITION_RAI
-                debug = "high temp [{0} C], rainy [{1}mm/qm]".format(temp, rain)
+                debug = "high temp [{temp} C], rainy [{rain}mm/qm]"
             # slightly rainy
             elif rain > 0.3:
                 c = ForecastNeoPixelColors.W_HITMP_SLRAINY
                 code = type(self).CONDITION_HTMP | type(self).CONDITION_SLRAI
-                debug = "high temp [{0} C], rainy [{1}mm/qm]".format(temp, rain)
+                debug = "high temp [{temp} C], rainy [{rain}mm/qm]"
             # no rain
             else:
                 # second prio - cloud coverage
@@ -610,19 +799,21 @@ class NeoPixelForecast(NeoPixelMultiBase):
                 if cloud > (100 * 3/8):
                     c = ForecastNeoPixelColors.W_HITMP_CLOUDY
                     code = type(self).CONDITION_HTMP | type(self).CONDITION_CLO
-                    debug = "high temp [{0} C], cloudy [{1}%]".format(temp, cloud)
+                    debug = "high temp [{temp} C], cloudy [{cloud}%]"
                 # slightly cloudy
                 elif cloud > (100 * 1/8):
                     c = ForecastNeoPixelColors.W_HITMP_SLCLOUDY
                     code = type(self).CONDITION_HTMP | type(self).CONDITION_SLCLO
-                    debug = "high temp [{0} C], slightly cloudy [{1}%]".format(temp, cloud)
+                    debug = "high temp [{temp} C], slightly cloudy [{cloud}%]"
                 # no clouds
                 else:
                     c = ForecastNeoPixelColors.W_HITMP
                     code = type(self).CONDITION_HTMP | type(self).CONDITION_CLEAR
-                    debug = "high temp [{0} C]".format(temp)
+                    debug = "high temp [{temp} C]"
                     
-        print("weather condition: " + debug)
+        # description is part of the weather condition, the log message is only built if debug output is enabled
+        debug = debug.format(temp = temp, rain = rain, cloud = cloud)
+        _log.debug("weather condition: %s", debug)
         
         return {"timestamp" : timestamp.ctime(),
                 "color"     : c,
@@ -646,6 +837,13 @@ class NeoPixelForecast(NeoPixelMultiBase):
     def getCurrentWeatherCondition(self):
         return self.__sampleboard
     
+    """
+        returns the serialized currently displayed weather condition
+        :returns:    tuple (<entity tag>, <weather condition serialized by json5>) or None if no forecast was displayed yet
+    """
+    def getCurrentWeatherConditionSnapshot(self):
+        return self.__conditionsSnapshot
+    
 
 ########################################
 #                MAIN                  #
@@ -659,6 +857,8 @@ if __name__ == '__main__':
                        NeoPixelForecast.__updated__,
                        par = "extended")
     
+    configureLogging(Configurations().getLogLevel())
+    
     np = NeoPixelForecast(color_schema  = ForecastNeoPixelColors)
     
     # start repetitive update
@@ -4,8 +4,8 @@ from catatumbo.controller.forecast.forecast_singularcolor import SingularForecas
 
 class NeoPixelSingularForecast(NeoPixelForecast):
 
-    def __init__(self, color_schema):
-        super().__init__(color_schema)
+    def __init__(self, color_schema, forecast_provider=None):
+        super().__init__(color_schema, forecast_provider)
 
     """
         return the mask for retrieving the weather report for the next 12 hours
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Continuous color scale for the forecast as an alternative to the discrete weather conditions of
+NeoPixelForecast.mapWeatherConditions. Temperature, cloud coverage and rain are mapped onto color ramps, the values of
+neighbouring slots are interpolated across the pixels of each section, so the strip shows gradients instead of blocks.
+
+The ramps are precomputed as lookup tables of LUT_SIZE entries in order of transmission, once per pixel order of the
+strips. Rendering a forecast quantizes the interpolated values and looks them up for all pixels of a strip at once,
+no color is computed per pixel.
+
+Slots indicating storm or snow are shown in their flat condition color, resolved by the palette of each strip.
+Day dividers are not shown, the gradients already separate the slots.
+
+Usage:
+    colormap = ForecastColormap()
+    frames = colormap.render(sampleboard, [(60, GRBW), (145, GRB)], palettes, sectionsize = 10)
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import numpy as np
+
+from catatumbo.core.neopixel_colors import PaletteColor
+
+
+class ForecastColormap(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    # entries of each lookup table, the values are quantized to one byte
+    LUT_SIZE            = 256
+
+    # temperature ramp from cold to hot, colors at equal distance as RGB
+    # light blue, cyan, warm yellow, light orange, red - see forecast_colors.py
+    TEMPERATURE_RAMP    = ((0, 70, 255), (50, 150, 127), (255, 100, 0), (255, 60, 0), (255, 0, 0))
+    # temperatures in Celsius at the colors of the ramp, the boundaries of low and high temperature match mapWeatherConditions
+    TEMPERATURE_SCALE   = (0.0, 10.0, 17.5, 25.0, 35.0)
+    TEMPERATURE_WINTER  = (-10.0, 0.0, 5.0, 10.0, 20.0)
+
+    # clouds mix white into the temperature color, up to CLOUD_MIX at full coverage
+    CLOUD_COLOR         = (255, 255, 255)
+    CLOUD_MIX           = 0.5
+    # rain mixes purple into the color, up to RAIN_MIX at RAIN_MAX mm/sqm and above
+    RAIN_COLOR          = (140, 0, 255)
+    RAIN_MIX            = 0.7
+    RAIN_MAX            = 5.0
+
+    # weather conditions shown in their flat color: storm and snow, see NeoPixelForecast.CONDITION_STORM and CONDITION_SNOW
+    FLAT_CONDITIONS     = 0x60
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    # lookup tables by pixel order: tuple (temperature colors, cloud color, rain color) in order of transmission
+    __luts          = None
+    # weight of the cloud and rain color per quantized value
+    __cloudWeights  = None
+    __rainWeights   = None
+
+    def __init__(self):
+        self.__luts = {}
+
+        position = np.linspace(0.0, 1.0, type(self).LUT_SIZE)
+        self.__cloudWeights = (position * type(self).CLOUD_MIX).astype(np.float32)
+        # slight rain is already visible
+        self.__rainWeights = (np.sqrt(position) * type(self).RAIN_MIX).astype(np.float32)
+
+    """
+        renders a sampleboard into frames for all strips
+
+        :param    sampleboard: weather conditions by slot index, see NeoPixelForecast.mapWeatherConditions
+        :type     sampleboard: dict
+        :param    strips: list of tuples (pixel number, pixel order) per strip
+        :type     strips: list
+        :param    palettes: palette per strip resolving the condition colors of the sampleboard, see neopixel_colors.Palette
+        :type     palettes: list
+        :param    sectionsize: number of pixels per slot, the last slot covers the remaining pixels
+        :type     sectionsize: int
+        :param    winterMode: temperature scale of the winter, see TEMPERATURE_WINTER
+        :type     winterMode: boolean
+        :returns: list of frame bytes in order of transmission per strip
+    """
+    def render(self, sampleboard, strips, palettes, sectionsize, winterMode = False):
+        slots = [sampleboard[index] for index in range(len(sampleboard))]
+        numPixels = sum(pixelnum for pixelnum, _ in strips)
+        lutMax = type(self).LUT_SIZE - 1
+
+        # values of the slots at their centers, interpolated for all pixels in between
+        centers = (np.arange(len(slots)) + 0.5) * sectionsize
+        pixels = np.arange(numPixels)
+        scale = type(self).TEMPERATURE_WINTER if winterMode else type(self).TEMPERATURE_SCALE
+        temperature = np.interp([slot['temp'] for slot in slots], scale, np.linspace(0.0, 1.0, len(scale)))
+        cloud = np.clip([slot['cloud'] / 100.0 for slot in slots], 0.0, 1.0)
+        rain = np.clip([slot['rain'] / type(self).RAIN_MAX for slot in slots], 0.0, 1.0)
+
+        temperature = np.rint(np.interp(pixels, centers, temperature) * lutMax).astype(np.intp)
+        cloud = np.rint(np.interp(pixels, centers, cloud) * lutMax).astype(np.intp)
+        rain = np.rint(np.interp(pixels, centers, rain) * lutMax).astype(np.intp)
+
+        # storm and snow slots keep their flat condition color
+        flat = []
+        for index, slot in enumerate(slots):
+            if isinstance(slot['color'], PaletteColor) and slot.get('CATAcode', 0) & type(self).FLAT_CONDITIONS:
+                end = numPixels if index == len(slots) - 1 else (index + 1) * sectionsize
+                flat.append((index * sectionsize, end, slot['color']))
+
+        frames = []
+        start = 0
+        for (pixelnum, pixelorder), palette in zip(strips, palettes):
+            ramp, cloudColor, rainColor = self.__getLUT(pixelorder)
+            end = start + pixelnum
+
+            # one lookup per table for all pixels of the strip
+            colors = ramp[temperature[start:end]]
+            weights = self.__cloudWeights[cloud[start:end]][:, None]
+            colors += (cloudColor - colors) * weights
+            weights = self.__rainWeights[rain[start:end]][:, None]
+            colors += (rainColor - colors) * weights
+            frame = np.rint(colors).astype(np.uint8)
+
+            for first, last, color in flat:
+                if first < end and last > start:
+                    frame[max(first, start) - start:min(last, end) - start] = \
+                        np.frombuffer(palette.getPixel(color), dtype = np.uint8)
+
+            frames.append(frame.tobytes())
+            start = end
+
+        return frames
+
+    """
+        returns the lookup tables of a pixel order, built on first use
+
+        :param    pixelorder: pixel order of the strip, see neopixel_backend
+        :type     pixelorder: tuple
+        :returns: tuple (temperature colors of LUT_SIZE entries, cloud color, rain color) in order of transmission
+    """
+    def __getLUT(self, pixelorder):
+        pixelorder = tuple(pixelorder)
+        luts = self.__luts.get(pixelorder)
+        if luts is None:
+            ramp = np.asarray(type(self).TEMPERATURE_RAMP, dtype = np.float32)
+            stops = np.linspace(0.0, 1.0, len(ramp))
+            position = np.linspace(0.0, 1.0, type(self).LUT_SIZE)
+            temperature = np.stack([np.interp(position, stops, ramp[:, channel]) for channel in range(3)], axis = 1)
+
+            luts = (self.__toWire(temperature, pixelorder),
+                    self.__toWire(np.asarray([type(self).CLOUD_COLOR], dtype = np.float32), pixelorder)[0],
+                    self.__toWire(np.asarray([type(self).RAIN_COLOR], dtype = np.float32), pixelorder)[0])
+            self.__luts[pixelorder] = luts
+        return luts
+
+    """
+        reorders RGB colors into the order of transmission, the white channel of RGBW strips stays off
+
+        :param    colors: array of RGB colors
+        :type     colors: numpy array
+        :param    pixelorder: pixel order of the strip, see neopixel_backend
+        :type     pixelorder: tuple
+        :returns: float32 array with one column per byte of a pixel
+    """
+    @staticmethod
+    def __toWire(colors, pixelorder):
+        wire = np.zeros((len(colors), len(pixelorder)), dtype = np.float32)
+        wire[:, list(pixelorder[:3])] = colors
+        return wire
@@ -50,23 +50,23 @@ class ForecastNeoPixelColors(NeoPixelColors):
         
         super().__initDerivedColors__()
 
-        type(self).W_HITMP             = ForecastNeoPixelColors.W_RED             #high temperature, no rain, no clouds
-        type(self).W_HITMP_SLRAINY     = ForecastNeoPixelColors.W_WARM_MAGENTA    #high temperature, slightly rainy
-        type(self).W_HITMP_RAINY       = ForecastNeoPixelColors.W_LIGHT_MAGENTA   #high temperature, rainy
-        type(self).W_HITMP_SLCLOUDY    = ForecastNeoPixelColors.W_WARM_ORANGE     #high temperature, slightly cloudy
-        type(self).W_HITMP_CLOUDY      = ForecastNeoPixelColors.W_LIGHT_ORANGE    #high temperature, cloudy
+        self.W_HITMP             = self.W_RED             #high temperature, no rain, no clouds
+        self.W_HITMP_SLRAINY     = self.W_WARM_MAGENTA    #high temperature, slightly rainy
+        self.W_HITMP_RAINY       = self.W_LIGHT_MAGENTA   #high temperature, rainy
+        self.W_HITMP_SLCLOUDY    = self.W_WARM_ORANGE     #high temperature, slightly cloudy
+        self.W_HITMP_CLOUDY      = self.W_LIGHT_ORANGE    #high temperature, cloudy
         
-        type(self).W_MIDTMP            = ForecastNeoPixelColors.W_WARM_YELLOW     #mid temperature, no rain, no clouds
-        type(self).W_MIDTMP_SLCLOUDY   = ForecastNeoPixelColors.W_YELLOW          #mid temperature, slightly cloudy
-        type(self).W_MIDTMP_CLOUDY     = ForecastNeoPixelColors.W_LIGHT_YELLOW    #mid temperature, cloudy
-        type(self).W_MIDTMP_SLRAINY    = ForecastNeoPixelColors.W_LIGHT_SALMON    #mid temperature, slightly rainy
-        type(self).W_MIDTMP_RAINY      = ForecastNeoPixelColors.W_LAVENDERBLUSH   #mid temperature, rainy
+        self.W_MIDTMP            = self.W_WARM_YELLOW     #mid temperature, no rain, no clouds
+        self.W_MIDTMP_SLCLOUDY   = self.W_YELLOW          #mid temperature, slightly cloudy
+        self.W_MIDTMP_CLOUDY     = self.W_LIGHT_YELLOW    #mid temperature, cloudy
+        self.W_MIDTMP_SLRAINY    = self.W_LIGHT_SALMON    #mid temperature, slightly rainy
+        self.W_MIDTMP_RAINY      = self.W_LAVENDERBLUSH   #mid temperature, rainy
         
-        type(self).W_LOWTMP            = ForecastNeoPixelColors.W_LIGHT_BLUE      #low temperature, no rain, no clouds
-        type(self).W_LOWTMP_SLRAINY    = ForecastNeoPixelColors.W_CORNFLOWERBLUE  #low temperature, slightly rainy
-        type(self).W_LOWTMP_RAINY      = ForecastNeoPixelColors.W_LIGHT_PURPLE    #low temperature, rainy
-        type(self).W_LOWTMP_SLCLOUDY   = ForecastNeoPixelColors.W_CYAN            #low temperature, slightly cloudy
-        type(self).W_LOWTMP_CLOUDY     = ForecastNeoPixelColors.W_AQUAMARINE      #low temperature, cloudy
+        self.W_LOWTMP            = self.W_LIGHT_BLUE      #low temperature, no rain, no clouds
+        self.W_LOWTMP_SLRAINY    = self.W_CORNFLOWERBLUE  #low temperature, slightly rainy
+        self.W_LOWTMP_RAINY      = self.W_LIGHT_PURPLE    #low temperature, rainy
+        self.W_LOWTMP_SLCLOUDY   = self.W_CYAN            #low temperature, slightly cloudy
+        self.W_LOWTMP_CLOUDY     = self.W_AQUAMARINE      #low temperature, cloudy
         
-        type(self).W_SNOW              = ForecastNeoPixelColors.W_LIGHT_WHITE
-        type(self).W_STORM             = ForecastNeoPixelColors.W_LIGHT_MINTH
\ No newline at end of file
+        self.W_SNOW              = self.W_LIGHT_WHITE
+        self.W_STORM             = self.W_LIGHT_MINTH
\ No newline at end of file
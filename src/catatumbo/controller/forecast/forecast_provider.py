@@ -0,0 +1,296 @@
+'''
+Forecast providers encapsulate the source of the three hours weather forecast used by the forecast controller.
+The OpenWeatherMap provider is the default and queries the OWM API via pyowm. The file provider replays forecast
+payloads recorded from OWM out of a directory, which allows running the fetch, classification and rendering
+on a machine without network access or OWM key, e.g. for benchmarks and regression tests.
+
+Each provider returns a pyowm Forecaster instance, so the forecast controller is agnostic of the data source.
+pyowm is imported when the first provider is created to keep the start up fast.
+
+Let yourself be dragged into the fascination of Catatumbo - Happy weather watching!
+
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import json
+import os
+import time
+
+from datetime import datetime
+from time import perf_counter
+from catatumbo.core.util.instrumentation import getCounter, getHistogram
+
+
+# metrics of the forecast requests, labeled by provider
+# the request latency is recorded independent of the instrumentation state as requests are rare
+_requests = getCounter('forecast.requests', 'forecast requests by provider')
+_errors   = getCounter('forecast.errors', 'failed forecast requests by provider')
+_latency  = getHistogram('forecast.request', 'latency of the forecast request to the OWM API')
+
+
+class ForecastUnavailableError(RuntimeError):
+    """
+        raised by forecast providers if no forecast could be retrieved temporarily, e.g. network not available
+    """
+    pass
+
+
+class ForecastProvider(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    PROVIDER_OWM    = 'OWM'
+    PROVIDER_FILE   = 'File'
+
+    ########################################
+    #            MEMBER METHODS            #
+    ########################################
+    """
+        returns the three hours forecast for the defined location
+        latitude/longitude are preferred over the city id
+
+        :param    lat: latitude of the location
+        :type     lat: float
+        :param    lon: longitude of the location
+        :type     lon: float
+        :param    cityID: OWM city id of the location
+        :type     cityID: int
+        :returns: pyowm Forecaster instance or None if no forecast is available for the location
+        :raises:  ForecastUnavailableError if the forecast temporarily cannot be retrieved
+    """
+    def getForecast(self, lat = None, lon = None, cityID = None):
+        raise NotImplementedError()
+
+    """
+        returns the locations for a city name and country, see pyowm CityIDRegistry.locations_for
+
+        :returns: list of tuples (id, name, lat, lon)
+    """
+    def getLocations(self, cityName, cityCountry):
+        return []
+
+    """
+        returns the city ids for a city name and country, see pyowm CityIDRegistry.ids_for
+
+        :returns: list of tuples (id, name, country)
+    """
+    def getIDs(self, cityName, cityCountry):
+        return []
+
+    """
+        defines whether the provider requires a location for requesting the forecast
+    """
+    def requiresLocation(self):
+        return True
+
+
+class OWMForecastProvider(ForecastProvider):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __owm = None
+    __registry = None
+    # directory in which each retrieved forecast is recorded for later replay
+    __recordDir = None
+
+    """
+        constructor
+
+        :param    apiKey: OpenWeatherMap API key
+        :type     apiKey: str
+        :param    recordDir: optional directory in which each retrieved forecast is stored as OWM payload
+        :type     recordDir: str
+    """
+    def __init__(self, apiKey, recordDir = None):
+        if apiKey is None:
+            raise RuntimeError('You need to define an Open Weather Map API key to run the forecast module!')
+
+        from pyowm import OWM
+        
+        self.__owm = OWM(apiKey)
+        self.__recordDir = recordDir
+
+    def getForecast(self, lat = None, lon = None, cityID = None):
+        from pyowm.exceptions.api_call_error import APIInvalidSSLCertificateError
+        
+        labels = {"provider" : ForecastProvider.PROVIDER_OWM}
+        _requests.increment(labels)
+        start = perf_counter()
+        
+        #request forecast
+        #https://pyowm.readthedocs.io/en/latest/usage-examples-v2/weather-api-usage-examples.html#getting-weather-forecasts
+        try:
+            if lat is not None and lon is not None:
+                forecast = self.__owm.three_hours_forecast_at_coords(float(lat),
+                                                                     float(lon))
+            else:
+                forecast = self.__owm.three_hours_forecast_at_id(cityID)
+        except (APIInvalidSSLCertificateError) as e:
+            _errors.increment(labels)
+            raise ForecastUnavailableError('Network error during OWM call') from e
+        except Exception:
+            _errors.increment(labels)
+            raise
+        finally:
+            _latency.record(perf_counter() - start)
+
+        if forecast is not None and self.__recordDir is not None:
+            recordForecast(forecast, self.__recordDir)
+
+        return forecast
+
+    def getLocations(self, cityName, cityCountry):
+        return self.__getRegistry().locations_for(cityName, cityCountry, matching='exact')
+
+    def getIDs(self, cityName, cityCountry):
+        return self.__getRegistry().ids_for(cityName, cityCountry, matching='exact')
+
+    def __getRegistry(self):
+        if self.__registry is None:
+            self.__registry = self.__owm.city_id_registry()
+        return self.__registry
+
+
+class FileForecastProvider(ForecastProvider):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    # recorded OWM payloads, replayed in alphabetical order of their file names
+    __payloads = None
+    __position = 0
+    # simulated network latency in seconds for each request
+    __latency = 0
+
+    """
+        constructor
+        all *.json files of the directory are read once and replayed in a loop
+
+        :param    replayDir: directory containing recorded OWM three hours forecast payloads
+        :type     replayDir: str
+        :param    latency: simulated latency in seconds for each forecast request
+        :type     latency: float
+    """
+    def __init__(self, replayDir, latency = 0):
+        self.__payloads = []
+        self.__position = 0
+        self.__latency = float(latency)
+
+        for fileName in sorted(os.listdir(replayDir)):
+            if fileName.endswith('.json'):
+                with open(os.path.join(replayDir, fileName), 'r') as payload:
+                    self.__payloads.append(payload.read())
+
+        if len(self.__payloads) == 0:
+            raise RuntimeError('No recorded forecast found in: {0}'.format(replayDir))
+
+    def getForecast(self, lat = None, lon = None, cityID = None):
+        _requests.increment({"provider" : ForecastProvider.PROVIDER_FILE})
+        payload = self.__payloads[self.__position]
+        self.__position = (self.__position + 1) % len(self.__payloads)
+
+        if self.__latency > 0:
+            time.sleep(self.__latency)
+
+        from pyowm.weatherapi25.forecaster import Forecaster
+        from pyowm.weatherapi25.parsers.forecastparser import ForecastParser
+        
+        forecast = ForecastParser().parse_JSON(payload)
+        if forecast is None:
+            return None
+        forecast.set_interval("3h")
+        return Forecaster(forecast)
+
+    def requiresLocation(self):
+        return False
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+"""
+    creates the forecast provider based on the configuration
+
+    :param    config: the Configurations instance
+    :type     config: Configurations
+    :returns: ForecastProvider instance
+"""
+def createForecastProvider(config):
+    if config.getForecastProvider() == ForecastProvider.PROVIDER_FILE:
+        return FileForecastProvider(config.getForecastReplayDir(),
+                                    config.getForecastReplayLatency())
+
+    return OWMForecastProvider(config.getOWMKey(),
+                               config.getForecastRecordDir())
+
+"""
+    stores a forecast as OWM three hours forecast payload, so that it can be replayed by FileForecastProvider
+
+    :param    forecast: the forecast to be recorded
+    :type     forecast: pyowm Forecaster
+    :param    recordDir: the target directory
+    :type     recordDir: str
+    :returns: path of the recorded file
+"""
+def recordForecast(forecast, recordDir):
+    location = forecast.get_forecast().get_location()
+    weathers = []
+
+    for weather in forecast.get_forecast():
+        temperature = weather.get_temperature()
+        pressure = weather.get_pressure()
+        weathers.append({"dt"       : weather.get_reference_time(),
+                         "main"     : {"temp"       : temperature.get('temp'),
+                                       "temp_min"   : temperature.get('temp_min'),
+                                       "temp_max"   : temperature.get('temp_max'),
+                                       "temp_kf"    : temperature.get('temp_kf'),
+                                       "pressure"   : pressure.get('press'),
+                                       "sea_level"  : pressure.get('sea_level'),
+                                       "humidity"   : weather.get_humidity()},
+                         "weather"  : [{"id"            : weather.get_weather_code(),
+                                        "main"          : weather.get_status(),
+                                        "description"   : weather.get_detailed_status(),
+                                        "icon"          : weather.get_weather_icon_name()}],
+                         "clouds"   : {"all" : weather.get_clouds()},
+                         "wind"     : weather.get_wind(),
+                         "rain"     : weather.get_rain(),
+                         "snow"     : weather.get_snow()})
+
+    payload = {"cod"    : "200",
+               "cnt"    : len(weathers),
+               "list"   : weathers,
+               "city"   : {"id"         : location.get_ID(),
+                           "name"       : location.get_name(),
+                           "coord"      : {"lat" : location.get_lat(),
+                                           "lon" : location.get_lon()},
+                           "country"    : location.get_country()}}
+
+    os.makedirs(recordDir, exist_ok = True)
+    fileName = os.path.join(recordDir, 'forecast-{0}.json'.format(datetime.now().strftime('%Y%m%d-%H%M%S')))
+    with open(fileName, 'w') as record:
+        json.dump(payload, record)
+
+    return fileName
@@ -41,15 +41,15 @@ class SingularForecastNeoPixelColors(NeoPixelColors):
     def __initDerivedColors__(self):
         super().__initDerivedColors__()
 
-        type(self).W_HITMP = SingularForecastNeoPixelColors.W_RED  # high temperature, no rain, no clouds
-        type(self).W_HITMP_RAINY = SingularForecastNeoPixelColors.W_CYAN  # high temperature, rainy
+        self.W_HITMP = self.W_RED  # high temperature, no rain, no clouds
+        self.W_HITMP_RAINY = self.W_CYAN  # high temperature, rainy
 
-        type(self).W_MIDTMP = SingularForecastNeoPixelColors.W_LIGHT_ORANGE # mid temperature, no rain, no clouds
-        type(self).W_MIDTMP_RAINY = SingularForecastNeoPixelColors.W_LIGHT_BLUE  # mid temperature, rainy
+        self.W_MIDTMP = self.W_LIGHT_ORANGE # mid temperature, no rain, no clouds
+        self.W_MIDTMP_RAINY = self.W_LIGHT_BLUE  # mid temperature, rainy
 
-        type(self).W_LOWTMP = SingularForecastNeoPixelColors.W_LIGHT_GREEN  # low temperature, no rain, no clouds
-        type(self).W_LOWTMP_RAINY = SingularForecastNeoPixelColors.W_BLUE  # low temperature, rainy
+        self.W_LOWTMP = self.W_LIGHT_GREEN  # low temperature, no rain, no clouds
+        self.W_LOWTMP_RAINY = self.W_BLUE  # low temperature, rainy
 
-        type(self).W_SNOW = SingularForecastNeoPixelColors.W_LIGHT_WHITE
-        type(self).W_STORM = SingularForecastNeoPixelColors.W_LIGHT_MAGENTA
+        self.W_SNOW = self.W_LIGHT_WHITE
+        self.W_STORM = self.W_LIGHT_MAGENTA
 
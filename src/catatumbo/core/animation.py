@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Animation engine for effects on top of the static frame of a controller, e.g. pulsing forecast slots indicating a
+storm. Effects are modulation arrays: a factor between 0.0 (off) and 1.0 (unchanged) per pixel of an animated slot.
+The animator draws the factors into an overlay layer multiplied onto the layer of the controller, see layer_stack.py,
+so the static frame is never drawn again and the composite only blends the overlay above the cached static frame.
+
+Transitions fade a layer out on the same frame clock, e.g. a layer holding the previous frame of the changed pixels
+crossfades into the new frame below it. Only the opacity of the layer changes per frame, the crossfade itself is done
+by the composite of the layers.
+
+The animator runs on a fixed frame clock. Each frame is scheduled for its deadline; frames missed by the deadline,
+e.g. while the render thread transferred a forecast, are dropped instead of delaying the following frames. Effects
+are functions of the time, so dropped frames do not slow the animation down. The animator thread only runs while
+effects or transitions are defined, static frames do not cost any CPU.
+
+Usage:
+    animator = Animator(overlay, present = controller.present, fps = 30)
+    animator.animate('storm', range(10, 20), Pulse(period = 1.0))
+    animator.play()
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import logging
+import threading
+import time
+import numpy as np
+
+from catatumbo.core.util.instrumentation import getCounter, startTimer, stopTimer
+
+
+_log = logging.getLogger(__name__)
+
+_frames  = getCounter('animation.frames', 'frames rendered by the animator')
+_dropped = getCounter('animation.dropped', 'frames dropped by the animator as their deadline had passed')
+
+
+########################################
+#               EFFECTS                #
+########################################
+class Effect(object):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    # seconds of one cycle of the effect
+    period  = 1.0
+    # factor of the pixels in the dark phase of the effect
+    minimum = 0.0
+
+    def __init__(self, period = 1.0, minimum = 0.0):
+        self.period = float(period)
+        self.minimum = min(max(float(minimum), 0.0), 1.0)
+
+    """
+        computes the modulation of the animated pixels at a point in time
+
+        :param    t: seconds since the animation started
+        :type     t: float
+        :param    positions: position of each pixel within its slot, 0.0 for the first and 1.0 for the last pixel
+        :type     positions: numpy array
+        :returns: factor per pixel or a single factor for all pixels between 0.0 and 1.0
+    """
+    def modulate(self, t, positions):
+        return 1.0
+
+    """
+        :returns: phase of the cycle at a point in time between 0.0 and 1.0
+    """
+    def phase(self, t):
+        return (t % self.period) / self.period
+
+
+class Blink(Effect):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    # share of the cycle the pixels are on
+    duty = 0.5
+
+    def __init__(self, period = 1.0, minimum = 0.0, duty = 0.5):
+        super().__init__(period, minimum)
+        self.duty = duty
+
+    def modulate(self, t, positions):
+        return 1.0 if self.phase(t) < self.duty else self.minimum
+
+
+class Pulse(Effect):
+
+    def __init__(self, period = 1.0, minimum = 0.2):
+        super().__init__(period, minimum)
+
+    def modulate(self, t, positions):
+        return self.minimum + (1.0 - self.minimum) * (0.5 + 0.5 * np.cos(2 * np.pi * self.phase(t)))
+
+
+class Chase(Effect):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    # length of the lit tail relative to the slot
+    width = 0.3
+
+    def __init__(self, period = 1.0, minimum = 0.2, width = 0.3):
+        super().__init__(period, minimum)
+        self.width = width
+
+    def modulate(self, t, positions):
+        # distance of each pixel behind the head running through the slot
+        distance = (self.phase(t) - positions) % 1.0
+        return self.minimum + (1.0 - self.minimum) * np.clip(1.0 - distance / self.width, 0.0, 1.0)
+
+
+########################################
+#               ANIMATOR               #
+########################################
+class Animator(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    DEFAULT_FPS = 30
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    # overlay layer multiplied onto the static frame, see layer_stack.BLEND_MULTIPLY
+    __layer     = None
+    # transfers the composited frame to the strips
+    __present   = None
+    __interval  = None
+    # animations by name: tuple (effect, pixel index per byte of the frame, position per byte)
+    __animations = None
+    # layers fading out: tuple (start time, duration) by layer
+    __transitions = None
+    # bytes of the overlay frame, 255 leaves the pixel unchanged
+    __frame     = None
+    __offsets   = None
+    __pixelOfByte = None
+    __lock      = None
+    # set while animations shall be shown, see play and pause
+    __playing   = False
+    __thread    = None
+    __stop      = None
+
+    """
+        constructor
+
+        :param    layer: overlay layer with multiply blend mode on top of the animated layer
+        :type     layer: Layer
+        :param    present: transfers the composited frame to the strips
+        :type     present: callable
+        :param    fps: frames per second of the frame clock
+        :type     fps: int
+    """
+    def __init__(self, layer, present, fps = DEFAULT_FPS):
+        self.__layer = layer
+        self.__present = present
+        self.__interval = 1.0 / fps
+        self.__animations = {}
+        self.__transitions = {}
+        self.__lock = threading.RLock()
+
+        # overlay pixels are opaque and neutral, only animated bytes are changed
+        self.__offsets = [0]
+        pixelOfByte = []
+        start = 0
+        for pixelnum, pixelorder in layer.getStrips():
+            pixelOfByte.append(np.repeat(np.arange(start, start + pixelnum), len(pixelorder)))
+            start += pixelnum
+            self.__offsets.append(self.__offsets[-1] + pixelnum * len(pixelorder))
+        self.__pixelOfByte = np.concatenate(pixelOfByte) if len(pixelOfByte) > 0 else np.zeros(0, dtype = int)
+        self.__frame = np.full(len(self.__pixelOfByte), 255, dtype = np.uint8)
+
+        layer.setVisible(False)
+
+    """
+        animates a slot of pixels, an animation of the same name is replaced
+
+        :param    name: name of the animation, e.g. the slot
+        :type     name: str
+        :param    pixels: indices of the animated pixels in order of the effect, e.g. a range
+        :type     pixels: iterable
+        :param    effect: modulation of the pixels, e.g. Blink, Pulse, Chase
+        :type     effect: Effect
+    """
+    def animate(self, name, pixels, effect):
+        pixels = np.asarray(list(pixels), dtype = int)
+        positionOfPixel = np.zeros(self.__layer.getNumPixels())
+        # pixels beyond the last strip are ignored
+        inside = (pixels >= 0) & (pixels < len(positionOfPixel))
+        if len(pixels) > 1:
+            positionOfPixel[pixels[inside]] = np.linspace(0.0, 1.0, len(pixels))[inside]
+
+        # bytes of the animated pixels and the position of their pixel within the slot
+        indices = np.flatnonzero(np.isin(self.__pixelOfByte, pixels[inside]))
+        position = positionOfPixel[self.__pixelOfByte[indices]]
+
+        with self.__lock:
+            if name in self.__animations:
+                # pixels of the replaced animation are unchanged again
+                self.__frame[self.__animations[name][1]] = 255
+            self.__animations[name] = (effect, indices, position)
+            self.__update()
+
+    """
+        replaces all animations, see animate
+
+        :param    animations: dictionary {<name> : (<pixels>, <effect>), ...}
+        :type     animations: dict
+    """
+    def setAnimations(self, animations):
+        with self.__lock:
+            self.__animations = {}
+            self.__frame[:] = 255
+            for name, (pixels, effect) in animations.items():
+                self.animate(name, pixels, effect)
+            self.__update()
+
+    """
+        removes all animations, the static frame is shown unchanged
+    """
+    def clear(self):
+        self.setAnimations({})
+
+    def hasAnimations(self):
+        return len(self.__animations) > 0
+
+    """
+        fades a layer out and hides it afterwards, a running fade of the layer is restarted
+
+        :param    layer: layer to be faded out, e.g. holding the previous frame of a crossfade
+        :type     layer: Layer
+        :param    duration: seconds of the fade
+        :type     duration: float
+    """
+    def fadeOut(self, layer, duration):
+        with self.__lock:
+            layer.setOpacity(1.0)
+            layer.setVisible(True)
+            self.__transitions[layer] = (time.monotonic(), float(duration))
+            self.__update()
+
+    """
+        shows the animations, the frame clock runs while animations or transitions are defined
+    """
+    def play(self):
+        with self.__lock:
+            self.__playing = True
+            self.__update()
+
+    """
+        stops the frame clock and hides the overlay, e.g. while the controller is suspended
+        the animations are kept for the next play, running transitions are completed immediately
+    """
+    def pause(self):
+        with self.__lock:
+            self.__playing = False
+            for layer in self.__transitions:
+                layer.setVisible(False)
+            self.__transitions = {}
+            self.__update()
+
+    def isPlaying(self):
+        return self.__playing
+
+    """
+        starts or stops the frame clock depending on the animations and transitions defined and the overlay visibility
+    """
+    def __update(self):
+        running = self.__thread is not None and self.__thread.is_alive()
+        animated = self.__playing and len(self.__animations) > 0
+        clocked = animated or (self.__playing and len(self.__transitions) > 0)
+
+        if clocked and not running:
+            self.__stop = threading.Event()
+            self.__thread = threading.Thread(target = self.__run, args = (self.__stop,), name = 'animator', daemon = True)
+            self.__thread.start()
+        elif not clocked and running:
+            self.__stop.set()
+            self.__thread = None
+
+        # static frame is shown without overlay by the next transfer
+        self.__layer.setVisible(animated)
+
+    ########################################
+    #             FRAME CLOCK              #
+    ########################################
+    def __run(self, stop):
+        start = time.monotonic()
+        deadline = start
+
+        while not stop.is_set():
+            try:
+                self.__renderFrame(deadline - start, stop)
+            except Exception:
+                _log.exception("Animation frame failed")
+
+            deadline += self.__interval
+            now = time.monotonic()
+            if now > deadline:
+                # frames missed by their deadline are dropped, the clock keeps its phase
+                missed = int((now - deadline) / self.__interval) + 1
+                deadline += missed * self.__interval
+                _dropped.increment(amount = missed)
+            stop.wait(deadline - now)
+
+    def __renderFrame(self, t, stop):
+        begin = startTimer()
+
+        with self.__lock:
+            if stop.is_set():
+                return
+            # only the bytes of animated pixels are modulated
+            if len(self.__animations) > 0:
+                for effect, indices, position in self.__animations.values():
+                    self.__frame[indices] = np.rint(np.broadcast_to(effect.modulate(t, position), indices.shape) * 255.0)
+
+                with self.__layer.drawing():
+                    for num in range(len(self.__offsets) - 1):
+                        self.__layer.setFrame(num, self.__frame[self.__offsets[num]:self.__offsets[num + 1]].tobytes())
+                    self.__layer.swap()
+
+            # transitions follow the time, independent of dropped frames
+            now = time.monotonic()
+            for layer, (start, duration) in list(self.__transitions.items()):
+                progress = (now - start) / duration if duration > 0 else 1.0
+                if progress >= 1.0:
+                    layer.setVisible(False)
+                    del self.__transitions[layer]
+                else:
+                    layer.setOpacity(1.0 - progress)
+            if len(self.__transitions) == 0:
+                # clock stops after presenting the completed transitions
+                self.__update()
+
+        self.__present()
+        _frames.increment()
+        stopTimer('animation.frame', begin)
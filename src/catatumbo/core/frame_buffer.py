@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Double buffered frame of a set of led strips. Renderers draw into the back buffer on their own thread, e.g. the
+scheduled forecast update, and publish the finished frame by swap. The swap replaces the front frame by an immutable
+copy of the back buffer in a single assignment, so the render actor transferring the front frame to the strips only
+ever sees complete frames and never waits for a renderer.
+
+The back buffer keeps its content after the swap, so renderers may change single pixels of the previous frame.
+Frame buffers of layers additionally carry an alpha value per pixel, see layer_stack.py. Pixels not drawn are
+transparent, drawn pixels are opaque unless stated otherwise.
+
+Frame buffers with palettes keep strips drawn by palette index, e.g. NeoPixelColors.W_RED, as one index byte per
+pixel instead of the bytes of the pixel. The indices are expanded to the bytes of the pixels by a single lookup in
+the palette of the strip when the frame is published, so replacing the palettes recolors the whole frame without
+drawing it again. Strips drawn with other colors, e.g. tuples or whole frames, keep the bytes of their pixels.
+
+Usage:
+    frame = FrameBuffer([(60, GRBW), (145, GRB)])
+    with frame.drawing():
+        frame.setPixel(0, color)
+        frame.swap()
+    generation, frames, alpha = frame.getFront()
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import numpy as np
+
+from bisect import bisect_right
+from threading import RLock
+from catatumbo.core.neopixel_backend import encodePixel
+from catatumbo.core.neopixel_colors import NeoPixelColors, PaletteColor
+
+
+class FrameBuffer(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    # colors of a palette addressed by one index byte per pixel
+    MAX_PALETTE = 256
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    # back buffer per strip in order of transmission, None while the strip is indexed
+    __back = None
+    # palette index per pixel of each strip, None while the strip holds bytes of pixels
+    __indices = None
+    __orders = None
+    __pixelnums = None
+    # compiled palette per strip resolving palette colors, see neopixel_colors.Palette
+    __palettes = None
+    # colors of each palette in order of transmission, one row per palette index
+    __paletteArrays = None
+    # bytes of each palette color per strip, written through a view of the back buffer
+    __palettePixels = None
+    __views = None
+    # first pixel index of each strip and total number of pixels
+    __starts = None
+    __numPixels = 0
+    # alpha value per pixel, None if the frame buffer has no alpha channel
+    __alpha = None
+    # tuple (generation, (frame bytes per strip, ...), alpha bytes) replaced as a whole by swap
+    __front = None
+    # serializes renderers, the front frame is read without locking
+    __lock = None
+
+    """
+        constructor
+
+        :param    strips: list of tuples (pixel number, pixel order) per strip
+        :type     strips: list
+        :param    frames: initial frames per strip, e.g. the frames currently shown
+        :type     frames: list
+        :param    alpha: frame buffer with alpha channel, all pixels are transparent initially
+        :type     alpha: boolean
+        :param    palettes: palette per strip, required for colors given by palette index, see setPalettes
+        :type     palettes: list
+    """
+    def __init__(self, strips, frames = None, alpha = False, palettes = None):
+        self.__orders = [tuple(pixelorder) for _, pixelorder in strips]
+        self.__pixelnums = [pixelnum for pixelnum, _ in strips]
+        self.__back = [bytearray(pixelnum * len(pixelorder)) for pixelnum, pixelorder in strips]
+        self.__views = [memoryview(back) for back in self.__back]
+        self.__indices = [None] * len(strips)
+        if frames is not None:
+            for back, frame in zip(self.__back, frames):
+                back[:] = frame
+
+        self.__starts = []
+        self.__numPixels = 0
+        for pixelnum, _ in strips:
+            self.__starts.append(self.__numPixels)
+            self.__numPixels += pixelnum
+
+        if alpha:
+            self.__alpha = bytearray(self.__numPixels)
+
+        self.__lock = RLock()
+        self.setPalettes(palettes)
+        if frames is None and palettes is not None:
+            for num in range(len(self.__orders)):
+                self.__index(num)
+        self.__front = (0, self.__publish(), self.__copyAlpha())
+
+    """
+        exclusive access to the back buffer for a renderer, drawing a frame and publishing it
+
+        :returns: context manager
+    """
+    def drawing(self):
+        return self.__lock
+
+    """
+        sets the color of a pixel in the back buffer, pixels beyond the last strip are ignored
+        single pixels are set without locking, renderers drawing a whole frame hold drawing
+
+        :param    index: index of the pixel across all strips
+        :type     index: int
+        :param    color: palette index, e.g. NeoPixelColors.W_RED, or color as int or tuple, see neopixel_backend.encodePixel
+        :type     color: PaletteColor, int or tuple
+        :param    alpha: opacity of the pixel between 0 (transparent) and 255 (opaque), requires an alpha channel
+        :type     alpha: int
+    """
+    def setPixel(self, index, color, alpha = 255):
+        if index < 0 or index >= self.__numPixels:
+            return
+
+        starts = self.__starts
+        num = bisect_right(starts, index) - 1
+        indices = self.__indices[num]
+
+        if isinstance(color, PaletteColor):
+            if indices is not None:
+                # resolved by the palette when the frame is published
+                indices[index - starts[num]] = color
+            else:
+                # one lookup in the palette of the strip
+                pixel = self.__palettePixels[num][color]
+                offset = (index - starts[num]) * len(pixel)
+                self.__views[num][offset:offset + len(pixel)] = pixel
+        else:
+            if indices is not None:
+                self.__expand(num)
+            encodePixel(self.__back[num], index - starts[num], color, self.__orders[num])
+        alphas = self.__alpha
+        if alphas is not None:
+            alphas[index] = alpha
+
+    """
+        replaces the back buffer of one strip
+
+        :param    num: index of the strip
+        :type     num: int
+        :param    frame: bytes in order of transmission
+        :type     frame: bytes-like
+        :param    alpha: alpha value per pixel of the strip, pixels of a replaced frame are opaque by default
+        :type     alpha: bytes-like
+    """
+    def setFrame(self, num, frame, alpha = None):
+        with self.__lock:
+            if self.__indices[num] is not None:
+                self.__expand(num)
+            self.__back[num][:] = frame
+            if self.__alpha is not None:
+                start = self.__starts[num]
+                pixelnum = len(frame) // len(self.__orders[num])
+                self.__alpha[start:start + pixelnum] = b'\xff' * pixelnum if alpha is None else alpha
+
+    """
+        turns all pixels of the back buffer off, pixels of a frame buffer with alpha channel become transparent
+        strips of a frame buffer with palettes are indexed again
+    """
+    def reset(self):
+        with self.__lock:
+            for num in range(len(self.__orders)):
+                if self.__palettes is not None:
+                    self.__index(num)
+                else:
+                    self.__back[num][:] = bytes(len(self.__back[num]))
+            if self.__alpha is not None:
+                self.__alpha[:] = bytes(len(self.__alpha))
+
+    """
+        publishes the back buffer as new front frame
+
+        :returns: generation of the published frame
+    """
+    def swap(self):
+        with self.__lock:
+            generation = self.__front[0] + 1
+            self.__front = (generation, self.__publish(), self.__copyAlpha())
+        return generation
+
+    """
+        :returns: tuple (generation, (frame bytes per strip, ...), alpha bytes or None) of the latest published frame
+    """
+    def getFront(self):
+        return self.__front
+
+    def getNumPixels(self):
+        return self.__numPixels
+
+    """
+        :returns: list of tuples (pixel number, pixel order) per strip
+    """
+    def getStrips(self):
+        return list(zip(self.__pixelnums, self.__orders))
+
+    """
+        :returns: list of palettes per strip or None
+    """
+    def getPalettes(self):
+        return self.__palettes
+
+    """
+        replaces the palettes, indexed strips show the colors of the new palettes with the next swap
+        e.g. to recolor a frame without drawing it again
+
+        :param    palettes: palette per strip in the pixel order of the strip, None for colors given by palette index
+                    not to be resolved anymore
+        :type     palettes: list
+        :raises:  ValueError if a palette does not match the pixel order of its strip or exceeds MAX_PALETTE colors
+    """
+    def setPalettes(self, palettes):
+        with self.__lock:
+            if palettes is None:
+                for num in range(len(self.__orders)):
+                    if self.__indices[num] is not None:
+                        self.__expand(num)
+                self.__palettes = self.__paletteArrays = self.__palettePixels = None
+                return
+
+            for palette, pixelorder in zip(palettes, self.__orders):
+                if tuple(palette.getPixelOrder()) != pixelorder or len(palette) > type(self).MAX_PALETTE:
+                    raise ValueError("Palette does not match pixel order {0} or exceeds {1} colors".format(
+                                     pixelorder, type(self).MAX_PALETTE))
+
+            self.__palettes = list(palettes)
+            self.__paletteArrays = [np.frombuffer(palette.getPixels(), dtype = np.uint8).reshape(len(palette), len(pixelorder))
+                                    for palette, pixelorder in zip(palettes, self.__orders)]
+            self.__palettePixels = [tuple(palette.getPixel(index) for index in range(len(palette))) for palette in palettes]
+
+    """
+        :returns: tuple of frame bytes per strip, indexed strips are expanded by a single lookup in their palette
+    """
+    def __publish(self):
+        frames = []
+        for num, indices in enumerate(self.__indices):
+            if indices is not None:
+                frames.append(self.__paletteArrays[num].take(np.frombuffer(indices, dtype = np.uint8), axis = 0).tobytes())
+            else:
+                frames.append(bytes(self.__back[num]))
+        return tuple(frames)
+
+    """
+        turns all pixels of a strip off and keeps them as palette indices
+    """
+    def __index(self, num):
+        self.__indices[num] = bytearray([NeoPixelColors.W_BLACK]) * self.__pixelnums[num]
+        self.__back[num] = self.__views[num] = None
+
+    """
+        converts an indexed strip to the bytes of its pixels, e.g. before a color outside of the palette is set
+    """
+    def __expand(self, num):
+        with self.__lock:
+            indices = self.__indices[num]
+            if indices is None:
+                return
+            self.__back[num] = bytearray(self.__paletteArrays[num].take(np.frombuffer(indices, dtype = np.uint8), axis = 0).tobytes())
+            self.__views[num] = memoryview(self.__back[num])
+            self.__indices[num] = None
+
+    def __copyAlpha(self):
+        return None if self.__alpha is None else bytes(self.__alpha)
@@ -29,19 +29,45 @@ limitations under the License.
 @deffield    created: March 2020
 @deffield    updated: Updated
 '''
-from flask import Flask, request
+from flask import Flask, request, Response
 from flask_cors import cross_origin
 from catatumbo.core.util.configurations import Configurations
+import json
 import json5
+import logging
 from catatumbo.starter import CatatumboStart
-from catatumbo.core.util.update_thread import fadeBrightness,\
-    stopConcurrentThreads
-from catatumbo.controller.forecast.adafruit_forecast import NeoPixelForecast
+from catatumbo.core.util.update_thread import fadeTo, stopConcurrentThreads
+from threading import Lock, Timer
+from catatumbo.core.util import instrumentation, metrics, events
+from catatumbo.core.neopixel_backend import orderName, encodeRLE
+from catatumbo.core.util.configuration_schema import applyBatch, ConfigurationValidationError
 
 server = Flask(__name__.split('.')[0])
 
+_log = logging.getLogger(__name__)
+
+# WSGI server of the production mode, see startServer
+_wsgiServer = None
+
+# brightness changes are persisted once no further change was requested for PERSIST_DELAY seconds
+PERSIST_DELAY = 2
+_persistTimer = None
+_persistLock = Lock()
+
+# event stream: seconds between keep-alive comments, seconds without events till an idle stream is closed
+# and milliseconds the client waits before reconnecting
+EVENT_KEEPALIVE     = 10
+EVENT_IDLE_TIMEOUT  = 30
+EVENT_RETRY         = 2000
+
 """
     start the server with listening to the defined port and hostname
+    blocks till the server is stopped, see stopServer
+    
+    in production mode (default), the waitress WSGI server serves requests by a bounded pool of worker threads,
+    limits the number of connections and closes keep-alive connections after being idle for the configured timeout.
+    as each event stream occupies a worker thread, at most half of the workers are available for event streams
+    development mode runs the Flask development server
     
     :param    host: the hostname to listen on. Defaults to ``'0.0.0.0'`` to listen externally as well.
     :type     host: str
@@ -49,7 +75,63 @@ server = Flask(__name__.split('.')[0])
     :type     host: int
 """ 
 def startServer(host = "0.0.0.0", port = 8080):
-    server.run(host, port)
+    global _wsgiServer
+    config = Configurations()
+    
+    if config.getServerMode().lower() == 'production':
+        try:
+            from waitress import create_server
+        except ImportError:
+            _log.warning("waitress not installed, falling back to development server")
+        else:
+            threads = config.getServerThreads()
+            events.setMaxSubscribers(threads // 2)
+            
+            _wsgiServer = create_server(server,
+                                        host                = host,
+                                        port                = port,
+                                        threads             = threads,
+                                        connection_limit    = config.getServerConnectionLimit(),
+                                        channel_timeout     = config.getServerTimeout(),
+                                        ident               = 'Catatumbo')
+            _log.info("Configuration service listening on %s:%s with %s threads", host, port, threads)
+            _wsgiServer.run()
+            return
+    
+    server.run(host, port, threaded = True)
+
+"""
+    stops the production server gracefully: no new connections are accepted, running requests and event streams
+    are finished within timeout and idle keep-alive connections are closed
+    
+    :param    timeout: seconds to wait for running requests
+    :type     timeout: float
+"""
+def stopServer(timeout = 5):
+    global _wsgiServer
+    wsgiServer = _wsgiServer
+    _wsgiServer = None
+    
+    # write pending configuration changes
+    flushConfiguration()
+    
+    # end running event streams
+    events.close()
+    
+    if wsgiServer is None:
+        # development server cannot be stopped from another thread
+        return
+    
+    # stop accepting connections, wait for running requests, then close listening socket and remaining connections
+    wsgiServer.accepting = False
+    wsgiServer.task_dispatcher.shutdown(cancel_pending = True, timeout = timeout)
+    
+    # sockets are closed by the server loop itself, closing them while the loop waits on them fails the loop
+    # closing the remaining connections ends the server loop, so run returns normally
+    def closeSockets():
+        wsgiServer.close()
+        wsgiServer.asyncore.close_all(wsgiServer._map)
+    wsgiServer.trigger.pull_trigger(closeSockets)
 
 ########################################
 #     LED CONFIGURATION SERVICES       #
@@ -99,32 +181,168 @@ def setBrightness():
     stopConcurrentThreads()
     
     # temporarily indicate defined brightness value on led strip
+    # a slider fires bursts of requests: a fade in flight is retargeted to the latest value instead of being restarted
     if bMax != config.getAutoBrightnessMax():
-        print("a")
         # fade to defined max value
-        __fadeBrightness(instance, 
-                         bMax,
-                         bMin is not None)
+        fadeTo(instance, 
+               bMax,
+               bMin is not None)
     elif bMin is not None and bMin != config.getAutoBrightnessMin():
-        print("b")
         # fade to defined min value
-        __fadeBrightness(instance, 
-                         bMin,
-                         bMin is not None)
+        fadeTo(instance, 
+               bMin,
+               bMin is not None)
     elif bMin is None:
-        print("c")
         # no sunset/sunrise fading turned on
         # fade to defined max value
-        __fadeBrightness(instance, 
-                         bMax,
-                         False)
+        fadeTo(instance, 
+               bMax,
+               False)
     
-    config.setAutoBrightnessMin(bMin)
-    config.setAutoBrightnessMax(bMax)
+    # change is applied in memory immediately, writing the configuration file is deferred till the slider settles
+    config.setAutoBrightnessMin(bMin, persist = False)
+    config.setAutoBrightnessMax(bMax, persist = False)
+    __schedulePersistence()
     
     return json5.dumps("OK", allow_nan = True)
 
 
+"""
+    changes several configuration values with a single write and a single reload of the active mode
+    the batch is validated against configuration_schema.SCHEMA, e.g.
+        {"autoBrightnessMin" : 0.15, "autoBrightnessMax" : 0.6, "winterMode" : true, "forecastMode" : "5"}
+    invalid batches are rejected as a whole with status 400 and an error message per key
+"""
+@server.route('/catatumbo/config/batch', methods=['POST'])
+@cross_origin(origin='*', headers=['Content-Type'])
+def setConfiguration():
+    try:
+        batch = json5.loads(request.data)
+    except ValueError:
+        return Response(json5.dumps({"errors" : {"" : "invalid JSON"}}), status = 400)
+    
+    try:
+        reload = applyBatch(batch)
+    except ConfigurationValidationError as e:
+        return Response(json5.dumps({"errors" : e.errors}), status = 400)
+    
+    if len(reload) > 0:
+        # pending brightness changes were written together with the batch
+        __cancelPersistence()
+    
+    CatatumboStart().reloadConfiguration(reload)
+    
+    return json5.dumps({"reload" : sorted(reload)}, allow_nan = True)
+
+@server.route('/catatumbo/config/instrumentation', methods=['GET', 'POST'])
+@cross_origin(origin='*', headers=['Content-Type'])
+def configureInstrumentation():
+    # switch instrumentation at runtime, e.g. {"enabled" : true}
+    if request.method == 'POST' and len(request.data) > 0:
+        data = json5.loads(request.data)
+        if "enabled" in data:
+            instrumentation.setEnabled(data["enabled"])
+        if data.get("reset", False):
+            instrumentation.resetHistograms()
+    
+    ret = {"enabled"    : instrumentation.isEnabled(),
+           "histograms" : instrumentation.getHistograms()}
+    
+    return json5.dumps(ret, allow_nan = True)
+
+@server.route('/catatumbo/metrics', methods=['GET'])
+def getMetrics():
+    # Prometheus text exposition format, see catatumbo.core.util.metrics
+    return Response(metrics.renderMetrics(), content_type = metrics.CONTENT_TYPE)
+
+
+########################################
+#        LIVE STATE SERVICES           #
+########################################
+"""
+    server-sent event stream of brightness, active mode and displayed weather condition
+    the first event 'state' contains the full state, subsequent events 'delta' only the changed values
+    idle streams are closed after EVENT_IDLE_TIMEOUT to release the server thread, clients reconnect
+    automatically and only receive the full state again if they missed an event (Last-Event-ID)
+"""
+@server.route('/catatumbo/events', methods=['GET'])
+@cross_origin(origin='*', headers=['Content-Type', 'Last-Event-ID'])
+def streamEvents():
+    try:
+        subscription = events.subscribe()
+    except events.SubscriberLimitError:
+        return Response('Too many subscribers', status = 503, headers = {'Retry-After' : str(EVENT_IDLE_TIMEOUT)})
+    
+    lastEventId = request.headers.get('Last-Event-ID')
+    
+    def stream():
+        try:
+            yield 'retry: {0}\n\n'.format(EVENT_RETRY)
+            
+            eventId, state = events.getState()
+            if lastEventId != str(eventId):
+                yield __formatEvent(eventId, 'state', state)
+            
+            idle = 0
+            while idle < EVENT_IDLE_TIMEOUT and not subscription.isClosed():
+                event = subscription.get(EVENT_KEEPALIVE)
+                if event is None:
+                    idle += EVENT_KEEPALIVE
+                    # comment line keeps connection open and detects disconnected clients
+                    yield ': keepalive\n\n'
+                    continue
+                
+                idle = 0
+                eventId, data, full = event
+                yield __formatEvent(eventId, 'state' if full else 'delta', data)
+        finally:
+            events.unsubscribe(subscription)
+    
+    return Response(stream(), 
+                    mimetype = 'text/event-stream',
+                    headers = {'Cache-Control' : 'no-cache', 'X-Accel-Buffering' : 'no'})
+
+
+"""
+    current frame of a led strip as raw bytes in order of transmission, not scaled by brightness
+    RGBW strips deriving their white channel serve the frame with the derived white channel, see OutputStage
+    served from the frame buffer without copying; ?encoding=rle returns the run-length encoded frame,
+    see neopixel_backend.encodeRLE
+    headers describe the frame: X-Catatumbo-Pixel-Order (e.g. GRBW), X-Catatumbo-Channels,
+    X-Catatumbo-Pixels, X-Catatumbo-Brightness, X-Catatumbo-Strips and X-Catatumbo-Encoding (raw or rle)
+"""
+@server.route('/catatumbo/frame', methods=['GET'])
+@server.route('/catatumbo/frame/<int:strip>', methods=['GET'])
+@cross_origin(origin='*', expose_headers=['X-Catatumbo-Pixel-Order', 'X-Catatumbo-Channels', 'X-Catatumbo-Pixels',
+                                          'X-Catatumbo-Brightness', 'X-Catatumbo-Strips', 'X-Catatumbo-Encoding'])
+def getFrame(strip = 0):
+    instance = CatatumboStart().getActivedInstance()
+    if instance is None:
+        return Response('No active mode', status = 503)
+    if strip < 0 or strip >= instance.countStrips():
+        return Response('Unknown strip', status = 404)
+    
+    frame = instance.getFrame(strip)
+    order = instance.getPixelOrder(strip)
+    headers = {'X-Catatumbo-Pixel-Order'    : orderName(order),
+               'X-Catatumbo-Channels'       : str(len(order)),
+               'X-Catatumbo-Pixels'         : str(len(frame) // len(order)),
+               'X-Catatumbo-Brightness'     : str(round(instance.getBrightness(), 3)),
+               'X-Catatumbo-Strips'         : str(instance.countStrips()),
+               'Cache-Control'              : 'no-cache'}
+    
+    if request.args.get('encoding') == 'rle':
+        frame = encodeRLE(frame, len(order))
+        headers['X-Catatumbo-Encoding'] = 'rle'
+    else:
+        headers['X-Catatumbo-Encoding'] = 'raw'
+    
+    headers['Content-Length'] = str(len(frame))
+    return Response([frame], 
+                    mimetype = 'application/octet-stream',
+                    headers = headers,
+                    direct_passthrough = True)
+
 ########################################
 #      FORECAST MODE SERVICES          #
 ########################################  
@@ -133,38 +351,57 @@ def setBrightness():
 def getWeatherConditions():
     # get current instance
     instance = CatatumboStart().getActivedInstance()
-    ret = None
+    snapshot = None
     
     # check whether right mode is active
-    if issubclass(type(instance), NeoPixelForecast):
-        ret = instance.getCurrentWeatherCondition()
+    if CatatumboStart().getActiveMode() == CatatumboStart.MODE_WEATHERFORECAST and instance is not None:
+        snapshot = instance.getCurrentWeatherConditionSnapshot()
     
-    return json5.dumps(ret, allow_nan = True)
+    if snapshot is None:
+        return json5.dumps(None, allow_nan = True)
+    
+    # serialized once per forecast update, polling clients sending If-None-Match receive 304 Not Modified
+    etag, body = snapshot
+    response = Response(body)
+    response.set_etag(etag)
+    return response.make_conditional(request)
     
 ########################################
 #          UTILITY METHOD              #
 ########################################
 
+def __formatEvent(eventId, eventType, data):
+    return 'id: {0}\nevent: {1}\ndata: {2}\n\n'.format(eventId, eventType, json.dumps(data, separators = (',', ':')))
+
+"""
+    (re)starts the deferred write of the configuration, so only the last change of a burst is persisted
+"""
+def __schedulePersistence():
+    global _persistTimer
+    with _persistLock:
+        if _persistTimer is not None:
+            _persistTimer.cancel()
+        _persistTimer = Timer(PERSIST_DELAY, flushConfiguration)
+        _persistTimer.start()
+
+def __cancelPersistence():
+    global _persistTimer
+    with _persistLock:
+        if _persistTimer is not None:
+            _persistTimer.cancel()
+            _persistTimer = None
+
 """
-    will fade from the current led brightness level to the changed value and then adapt fading level
-    based on sunset/sunrise fading mode at the very end if turned on
-    
-    :param    instance: the instance of the controller class representing the active mode (weather forecast, share price, ...)
-    :type     instance: class instance
-    :param    stopLevel: destination brightness value, value between 1.0 and 0.0
-    :type     stopLevel: float
-    :param    finalDayTimeAdaption: set final brightness dependent on current time and sunset/sunrise fading configuration 
-    :type     finalDayTimeAdaption: boolean
+    writes configuration changes deferred by setBrightness
 """
-def __fadeBrightness(instance, stop, finalDayTimeAdaption):
-    fadeBrightness(controller_instance = instance, 
-                   startLevel = instance.getBrightness(), 
-                   stopLevel = stop,
-                   waitTimeMainThread = 0.05,
-                   newMainThread = False,
-                   delta = 0.05, 
-                   waitTimeSubThread = 0.05,
-                   finalDayTimeAdaption = finalDayTimeAdaption)
+def flushConfiguration():
+    global _persistTimer
+    with _persistLock:
+        if _persistTimer is None:
+            return
+        _persistTimer.cancel()
+        _persistTimer = None
+        Configurations().writeConfiguration()
 
 
 
@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Stack of frame layers composited into the frame shown by the strips. Each controller draws into its own layer, e.g.
+the forecast at the bottom and an alarm overlay on top of it, without touching the frames of the other layers.
+Layers are ordered by priority, layers of the same priority by the time they were added. Every layer has an opacity,
+a blend mode and an alpha value per pixel, pixels not drawn by a layer are transparent.
+
+Layers are double buffered frame buffers, see frame_buffer.py. The composite only reads the published frames of the
+layers and keeps the intermediate result below each layer, so only the first changed layer and the layers above it
+are blended again. An alarm blinking on top of the forecast therefore never causes the forecast to be recomposited.
+Layers covered by an opaque layer are not blended at all, a single opaque layer is shown without any blending.
+
+Blending is done on the bytes in order of transmission, the pixel order of the strips does not matter for the
+supported blend modes.
+
+Usage:
+    stack = LayerStack([(60, GRBW), (145, GRB)])
+    forecast = stack.addLayer('forecast')
+    alarm = stack.addLayer('alarm', priority = 10, opacity = 0.5, blend = BLEND_SCREEN)
+    alarm.setPixel(0, color)
+    alarm.swap()
+    frames = stack.composite()
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import itertools
+import numpy as np
+
+from threading import Lock
+from catatumbo.core.frame_buffer import FrameBuffer
+
+"""
+BLEND MODES
+"""
+BLEND_NORMAL    = 'normal'
+BLEND_ADD       = 'add'
+BLEND_MULTIPLY  = 'multiply'
+BLEND_SCREEN    = 'screen'
+
+BLEND_MODES     = (BLEND_NORMAL, BLEND_ADD, BLEND_MULTIPLY, BLEND_SCREEN)
+
+
+class Layer(FrameBuffer):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __name      = None
+    __priority  = 0
+    # order of layers with the same priority
+    __sequence  = 0
+    # opacity of the whole layer between 0.0 and 1.0, applied on top of the alpha per pixel
+    __opacity   = 1.0
+    __blend     = BLEND_NORMAL
+    __visible   = True
+    # alpha of a completely drawn layer
+    __opaque    = None
+
+    """
+        constructor, layers are created by LayerStack.addLayer
+
+        :param    strips: list of tuples (pixel number, pixel order) per strip
+        :type     strips: list
+        :param    name: name of the layer, e.g. the controller drawing it
+        :type     name: str
+        :param    priority: layers of higher priority are composited on top
+        :type     priority: int
+        :param    opacity: opacity of the layer between 0.0 and 1.0
+        :type     opacity: float
+        :param    blend: blend mode, see BLEND_MODES
+        :type     blend: str
+        :param    sequence: order of layers with the same priority
+        :type     sequence: int
+        :param    palettes: palette per strip, see FrameBuffer
+        :type     palettes: list
+    """
+    def __init__(self, strips, name, priority = 0, opacity = 1.0, blend = BLEND_NORMAL, sequence = 0, palettes = None):
+        super().__init__(strips, alpha = True, palettes = palettes)
+        self.__opaque = b'\xff' * self.getNumPixels()
+
+        self.__name = name
+        self.__priority = priority
+        self.__sequence = sequence
+        self.setOpacity(opacity)
+        self.setBlend(blend)
+
+    def getName(self):
+        return self.__name
+
+    def getPriority(self):
+        return self.__priority
+
+    def getOpacity(self):
+        return self.__opacity
+
+    def setOpacity(self, opacity):
+        self.__opacity = min(max(float(opacity), 0.0), 1.0)
+
+    def getBlend(self):
+        return self.__blend
+
+    def setBlend(self, blend):
+        if blend not in BLEND_MODES:
+            raise ValueError("Unknown blend mode '{0}', supported: {1}".format(blend, ', '.join(BLEND_MODES)))
+        self.__blend = blend
+
+    def isVisible(self):
+        return self.__visible
+
+    """
+        hidden layers keep their frame but are left out of the composite, e.g. while their controller is suspended
+    """
+    def setVisible(self, visible):
+        self.__visible = bool(visible)
+
+    """
+        :returns: True if the published frame of the layer covers all layers below
+    """
+    def isOpaque(self):
+        return self.__visible and self.__blend == BLEND_NORMAL and self.__opacity == 1.0 and \
+               self.getFront()[2] == self.__opaque
+
+    """
+        :returns: sort key of the layer, bottom layer first
+    """
+    def getOrder(self):
+        return (self.__priority, self.__sequence)
+
+    """
+        :returns: state of the layer relevant for the composite, changes whenever the layer has to be blended again
+    """
+    def getState(self):
+        return (id(self), self.getFront()[0], self.__opacity, self.__blend, self.__visible)
+
+
+class LayerStack(object):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __strips    = None
+    # palette per strip passed to the layers, see FrameBuffer
+    __palettes  = None
+    __layers    = None
+    __sequence  = None
+    # guards the list of layers, the composite itself runs on a single thread, e.g. the render actor
+    __lock      = None
+    # index of the pixel for each byte of the frame, maps the alpha of the pixels to their bytes
+    __pixelOfByte = None
+    # byte offsets of the strips within the frame
+    __offsets   = None
+    # states of the layers composited last and the composite on top of each of them, None if not blended
+    __states    = None
+    __composites = None
+
+    """
+        constructor
+
+        :param    strips: list of tuples (pixel number, pixel order) per strip
+        :type     strips: list
+        :param    palettes: palette per strip resolving colors given by palette index, see FrameBuffer
+        :type     palettes: list
+    """
+    def __init__(self, strips, palettes = None):
+        self.__lock = Lock()
+        self.__layers = []
+        self.__sequence = itertools.count()
+        self.setStrips(strips, palettes)
+
+    """
+        changes the strips covered by the stack, the frames of all layers are cleared
+
+        :param    strips: list of tuples (pixel number, pixel order) per strip
+        :type     strips: list
+        :param    palettes: palette per strip
+        :type     palettes: list
+    """
+    def setStrips(self, strips, palettes = None):
+        with self.__lock:
+            self.__strips = [(pixelnum, tuple(pixelorder)) for pixelnum, pixelorder in strips]
+            self.__palettes = palettes
+
+            self.__offsets = [0]
+            pixelOfByte = []
+            start = 0
+            for pixelnum, pixelorder in self.__strips:
+                pixelOfByte.append(np.repeat(np.arange(start, start + pixelnum), len(pixelorder)))
+                start += pixelnum
+                self.__offsets.append(self.__offsets[-1] + pixelnum * len(pixelorder))
+            self.__pixelOfByte = np.concatenate(pixelOfByte) if len(pixelOfByte) > 0 else np.zeros(0, dtype = int)
+
+            self.__layers = [self.__createLayer(layer.getName(), layer.getPriority(), layer.getOpacity(),
+                                                layer.getBlend(), layer.getOrder()[1])
+                             for layer in self.__layers]
+            self.__states = []
+            self.__composites = None
+
+    """
+        adds a transparent layer to the stack
+
+        :param    name: name of the layer, e.g. the controller drawing it
+        :type     name: str
+        :param    priority: layers of higher priority are composited on top, the latest layer on top of equal ones
+        :type     priority: int
+        :param    opacity: opacity of the layer between 0.0 and 1.0
+        :type     opacity: float
+        :param    blend: blend mode, see BLEND_MODES
+        :type     blend: str
+        :returns: Layer
+    """
+    def addLayer(self, name, priority = 0, opacity = 1.0, blend = BLEND_NORMAL):
+        with self.__lock:
+            layer = self.__createLayer(name, priority, opacity, blend, next(self.__sequence))
+            self.__layers.append(layer)
+        return layer
+
+    def __createLayer(self, name, priority, opacity, blend, sequence):
+        return Layer(self.__strips, name, priority, opacity, blend, sequence, self.__palettes)
+
+    """
+        removes a layer, the frame is composited without it with the next composite
+    """
+    def removeLayer(self, layer):
+        with self.__lock:
+            if layer in self.__layers:
+                self.__layers.remove(layer)
+
+    """
+        :returns: first layer of the given name or None
+    """
+    def getLayer(self, name):
+        with self.__lock:
+            for layer in self.__layers:
+                if layer.getName() == name:
+                    return layer
+        return None
+
+    """
+        :returns: layers bottom to top
+    """
+    def getLayers(self):
+        with self.__lock:
+            return sorted(self.__layers, key = Layer.getOrder)
+
+    """
+        composites the published frames of all visible layers on a black background
+        only the first changed layer and the layers above it are blended again
+
+        :returns: tuple of frame bytes per strip, None if no layer changed since the last composite
+    """
+    def composite(self):
+        layers = self.getLayers()
+        states = [layer.getState() for layer in layers]
+
+        # first layer changed since the last composite
+        changed = 0
+        while changed < len(states) and changed < len(self.__states) and states[changed] == self.__states[changed]:
+            changed += 1
+        if changed == len(states) == len(self.__states) and self.__composites is not None:
+            return None
+
+        # top most opaque layer, the layers below are covered
+        bottom = len(layers) - 1
+        while bottom >= 0 and not layers[bottom].isOpaque():
+            bottom -= 1
+
+        self.__states = states
+        if bottom >= 0 and bottom == len(layers) - 1:
+            # nothing to blend, the composite is computed once a layer on top requires it
+            self.__composites = [None] * len(layers)
+            return layers[bottom].getFront()[1]
+
+        # blend from the first changed layer, covered layers are not blended
+        composites = (self.__composites or [])[:changed] + [None] * (bottom - changed)
+        start = len(composites)
+        # the composite below is required unless blending starts with the opaque layer
+        while start > 0 and start != bottom and composites[start - 1] is None:
+            start -= 1
+        del composites[start:]
+        if start == bottom:
+            frame = np.frombuffer(b''.join(layers[bottom].getFront()[1]), dtype = np.uint8).astype(np.float32)
+            composites.append(frame)
+            start += 1
+        else:
+            frame = composites[-1] if start > 0 else np.zeros(len(self.__pixelOfByte), dtype = np.float32)
+        for layer in layers[start:]:
+            frame = self.__blend(frame, layer)
+            composites.append(frame)
+        self.__composites = composites
+
+        output = np.rint(frame).astype(np.uint8).tobytes()
+        return tuple(output[self.__offsets[i]:self.__offsets[i + 1]] for i in range(len(self.__strips)))
+
+    """
+        blends a layer onto the frame composited below it
+
+        :returns: new composite, the frame below is kept unchanged
+    """
+    def __blend(self, below, layer):
+        if not layer.isVisible() or layer.getOpacity() == 0.0:
+            return below
+
+        _, frames, alpha = layer.getFront()
+        source = np.frombuffer(b''.join(frames), dtype = np.uint8).astype(np.float32)
+        # coverage of each byte by alpha of its pixel and opacity of the layer
+        coverage = np.frombuffer(alpha, dtype = np.uint8)[self.__pixelOfByte].astype(np.float32)
+        coverage *= layer.getOpacity() / 255.0
+
+        blend = layer.getBlend()
+        if blend == BLEND_ADD:
+            return np.minimum(below + source * coverage, 255.0)
+        if blend == BLEND_MULTIPLY:
+            target = below * source / 255.0
+        elif blend == BLEND_SCREEN:
+            target = 255.0 - (255.0 - below) * (255.0 - source) / 255.0
+        else:
+            target = source
+        return below + (target - below) * coverage
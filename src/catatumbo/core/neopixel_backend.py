@@ -0,0 +1,573 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Backends for driving a led strip. The neopixel backend writes to the GPIO of a Raspberry Pi by Adafruit neopixel lib,
+the virtual backend does not require any hardware and writes each shown frame to a memory-mapped ring file instead.
+Any process may tail the ring file via FrameRingReader, e.g. for visualizing the strip or measuring render throughput
+independently of the GPIO timing.
+
+Both backends share the semantics of neopixel.NeoPixel: fill, __setitem__, __getitem__, show and brightness.
+Hardware libs (neopixel, adafruit_blinka) are only imported if the neopixel backend is used.
+
+Ring file layout (little endian):
+    header  magic, version, number of slots, frame size, number of pixels, bytes per pixel, pixel order, latest frame index
+    slots   frame index, timestamp, length, frame bytes (brightness applied)
+
+The last shown frame of all strips is stored by LastFrameFile, so it can be replayed immediately on boot.
+
+@author:     MBizm
+
+@copyright:  2019 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+"""
+PIXEL ORDER - identical to the definitions of neopixel lib
+"""
+RGB     = (0, 1, 2)
+GRB     = (1, 0, 2)
+RGBW    = (0, 1, 2, 3)
+GRBW    = (1, 0, 2, 3)
+
+"""
+AVAILABLE BACKENDS
+"""
+BACKEND_NEOPIXEL    = 'neopixel'
+BACKEND_VIRTUAL     = 'virtual'
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+"""
+    maps the name of a pixel pin to the pin defined by adapted Adafruit_Blinka lib
+    maps to PCM/PWM/SPI capable GPIOs - https://forums.catatumbo.com/viewtopic.php?f=47&p=776283
+    pins are now adapted to defined pins in adapted Adafrui_Blinka lib, see https://github.com/MBizm/Adafruit_Blinka/blob/master/src/adafruit_blinka/microcontroller/bcm283x/neopixel.py
+
+    :param    pixelpin: pin defined either by neopixel attributes (board.D18, ...) or string
+    :type     pixelpin: str or neopixel attribute
+    :returns: pin as defined by neopixel attribute
+"""
+def mapPin(pixelpin):
+    if isinstance(pixelpin, str):
+        from adafruit_blinka.microcontroller.bcm283x import pin
+
+        if(pixelpin == 'D12'):
+            pixelpin = pin.D12
+        elif(pixelpin == 'D13'):
+            pixelpin = pin.D13
+        elif(pixelpin == 'D18'):
+            pixelpin = pin.D18
+        elif(pixelpin == 'D19'):
+            pixelpin = pin.D19
+        elif(pixelpin == 'D21'):
+            pixelpin = pin.D21
+
+    return pixelpin
+
+"""
+    maps the name of a pixel order to its definition
+
+    :param    pixelorder: order defined either by attributes of this module (GRB, ...) or string
+    :type     pixelorder: str or tuple
+    :returns: order as tuple
+"""
+def mapOrder(pixelorder):
+    if isinstance(pixelorder, str):
+        if(pixelorder == 'GRB'):
+            pixelorder = GRB
+        elif(pixelorder == 'RGB'):
+            pixelorder = RGB
+        elif(pixelorder == 'GRBW'):
+            pixelorder = GRBW
+        elif(pixelorder == 'RGBW'):
+            pixelorder = RGBW
+
+    return pixelorder
+
+"""
+    returns the name of a pixel order, e.g. 'GRBW' for GRBW
+
+    :param    pixelorder: order defined by attributes of this module
+    :type     pixelorder: tuple
+    :returns: channel names in the order of transmission
+"""
+def orderName(pixelorder):
+    name = [None] * len(pixelorder)
+    for channel, offset in enumerate(pixelorder):
+        name[offset] = 'RGBW'[channel]
+    return ''.join(name)
+
+"""
+    run-length encodes a frame: each run of identical pixels is stored as 16 bit little endian run length
+    followed by the pixel bytes in the order of the frame
+
+    :param    frame: pixel bytes, e.g. the buffer of a strip
+    :type     frame: bytes-like
+    :param    bpp: bytes per pixel
+    :type     bpp: int
+    :returns: encoded frame
+"""
+def encodeRLE(frame, bpp):
+    import numpy as np
+
+    pixels = np.frombuffer(frame, dtype = np.uint8).reshape(-1, bpp)
+    if len(pixels) == 0:
+        return b''
+
+    # first pixel of each run
+    starts = np.flatnonzero(np.concatenate(([True], np.any(pixels[1:] != pixels[:-1], axis = 1))))
+    runs = np.empty(len(starts), dtype = [('length', '<u2'), ('pixel', np.uint8, (bpp,))])
+    runs['length'] = np.diff(np.append(starts, len(pixels)))
+    runs['pixel'] = pixels[starts]
+    return runs.tobytes()
+
+"""
+    writes a color to a frame buffer in order of transmission, with the same color conversion as neopixel lib:
+    an int color is split into r, g, b and a gray int color is shown by the white led of RGBW strips
+
+    :param    buf: frame buffer
+    :type     buf: bytearray
+    :param    index: index of the pixel
+    :type     index: int
+    :param    color: color as int or tuple (r, g, b) or (r, g, b, w)
+    :type     color: int or tuple
+    :param    pixelorder: RGB, GRB, RGBW, GRBW
+    :type     pixelorder: tuple
+"""
+def encodePixel(buf, index, color, pixelorder):
+    bpp = len(pixelorder)
+    w = 0
+    if isinstance(color, int):
+        r = color >> 16
+        g = (color >> 8) & 0xff
+        b = color & 0xff
+        if bpp == 4 and r == g == b:
+            w = r
+            r = g = b = 0
+    elif len(color) == bpp or (len(color) == 3 and bpp == 4):
+        if len(color) == 3:
+            r, g, b = color
+        else:
+            r, g, b, w = color
+    else:
+        raise ValueError("Color tuple size does not match pixel_order.")
+
+    offset = index * bpp
+    buf[offset + pixelorder[0]] = r
+    buf[offset + pixelorder[1]] = g
+    buf[offset + pixelorder[2]] = b
+    if bpp == 4:
+        buf[offset + pixelorder[3]] = w
+
+"""
+    creates the strip instance for the selected backend
+
+    :param    pixelpin: pin the strip is connected to
+    :type     pixelpin: str or neopixel attribute
+    :param    pixelnum: number of pixels
+    :type     pixelnum: int
+    :param    pixelorder: type of the strip, RGB, GRB, RGBW, GRBW
+    :type     pixelorder: tuple
+    :param    brightness: initial brightness
+    :type     brightness: float
+    :param    backend: BACKEND_NEOPIXEL (default) or BACKEND_VIRTUAL
+    :type     backend: str
+    :param    framefile: ring file the virtual backend writes its frames to, defaults to a file per pin in the temp directory
+    :type     framefile: str
+    :returns: strip instance providing neopixel.NeoPixel semantics
+"""
+def createStrip(pixelpin, pixelnum, pixelorder, brightness, backend = None, framefile = None):
+    if backend == BACKEND_VIRTUAL:
+        if framefile is None:
+            framefile = os.path.join(tempfile.gettempdir(),
+                                     'catatumbo',
+                                     'strip-{0}.frames'.format(pixelpin))
+        return VirtualNeoPixel(framefile,
+                               int(pixelnum),
+                               brightness = brightness,
+                               pixel_order = pixelorder)
+
+    import neopixel
+    return neopixel.NeoPixel(mapPin(pixelpin),
+                             int(pixelnum),
+                             brightness = brightness,
+                             auto_write = False,
+                             pixel_order = pixelorder)
+
+
+########################################
+#           VIRTUAL BACKEND            #
+########################################
+class VirtualNeoPixel(object):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    n = 0
+    bpp = 0
+    order = None
+    buf = None
+    auto_write = False
+    # number of frames shown since initialization
+    frames = 0
+
+    __brightness = 1.0
+    __ringfile = None
+
+    """
+        constructor
+
+        :param    framefile: path of the memory-mapped ring file receiving the shown frames
+        :type     framefile: str
+        :param    n: number of pixels
+        :type     n: int
+        :param    brightness: brightness between 0.0 and 1.0
+        :type     brightness: float
+        :param    auto_write: show frame with each change of pixel or brightness
+        :type     auto_write: boolean
+        :param    pixel_order: RGB, GRB, RGBW, GRBW
+        :type     pixel_order: tuple
+        :param    slots: number of frames kept in the ring file
+        :type     slots: int
+    """
+    def __init__(self, framefile, n, brightness = 1.0, auto_write = False, pixel_order = GRBW, slots = 64):
+        self.n = n
+        self.order = pixel_order
+        self.bpp = len(pixel_order)
+        self.buf = bytearray(self.n * self.bpp)
+        self.frames = 0
+        self.__ringfile = FrameRingFile(framefile, self.n, self.order, slots)
+
+        self.auto_write = False
+        self.brightness = brightness
+        self.auto_write = auto_write
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, index, color):
+        if isinstance(index, slice):
+            for i, c in zip(range(*index.indices(self.n)), color):
+                self.__setPixel(i, c)
+        else:
+            self.__setPixel(index, color)
+
+        if self.auto_write:
+            self.show()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.n))]
+        if index < 0:
+            index += self.n
+        if index >= self.n or index < 0:
+            raise IndexError
+        offset = index * self.bpp
+        return tuple(self.buf[offset + self.order[i]] for i in range(self.bpp))
+
+    def __setPixel(self, index, color):
+        if index < 0:
+            index += self.n
+        if index >= self.n or index < 0:
+            raise IndexError
+
+        encodePixel(self.buf, index, color, self.order)
+
+    @property
+    def brightness(self):
+        return self.__brightness
+
+    @brightness.setter
+    def brightness(self, brightness):
+        self.__brightness = min(max(brightness, 0.0), 1.0)
+        if self.auto_write:
+            self.show()
+
+    def fill(self, color):
+        auto_write = self.auto_write
+        self.auto_write = False
+        for i in range(self.n):
+            self[i] = color
+        self.auto_write = auto_write
+        if auto_write:
+            self.show()
+
+    def show(self):
+        # apply brightness the same way as neopixel lib does before transmission
+        if self.__brightness > 0.99:
+            self.__ringfile.write(self.buf)
+        else:
+            self.__ringfile.write(bytearray([int(i * self.__brightness) for i in self.buf]))
+        self.frames += 1
+
+    def deinit(self):
+        for i in range(len(self.buf)):
+            self.buf[i] = 0
+        self.show()
+        self.__ringfile.close()
+
+
+########################################
+#             RING FILE                #
+########################################
+class FrameRingFile(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    MAGIC       = b'CATAFRM1'
+    VERSION     = 1
+    # magic, version, slots, frame size, pixels, bytes per pixel, pixel order, latest frame index
+    HEADER      = struct.Struct('<8sIIIII4sQ')
+    HEADER_SIZE = 64
+    # frame index, timestamp, length
+    SLOT        = struct.Struct('<QdI4x')
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __file = None
+    __map = None
+    __slots = 0
+    __framesize = 0
+    __frameindex = 0
+
+    """
+        constructor - creates or truncates the ring file
+
+        :param    path: path of the ring file
+        :type     path: str
+        :param    pixelnum: number of pixels per frame
+        :type     pixelnum: int
+        :param    pixelorder: pixel order of the frames
+        :type     pixelorder: tuple
+        :param    slots: number of frames kept in the ring
+        :type     slots: int
+    """
+    def __init__(self, path, pixelnum, pixelorder, slots = 64):
+        self.__slots = slots
+        self.__framesize = pixelnum * len(pixelorder)
+        self.__frameindex = 0
+
+        directory = os.path.dirname(path)
+        if directory != '':
+            os.makedirs(directory, exist_ok = True)
+
+        size = type(self).HEADER_SIZE + slots * (type(self).SLOT.size + self.__framesize)
+        self.__file = open(path, 'w+b')
+        self.__file.truncate(size)
+        self.__map = mmap.mmap(self.__file.fileno(), size)
+
+        type(self).HEADER.pack_into(self.__map, 0,
+                                    type(self).MAGIC,
+                                    type(self).VERSION,
+                                    slots,
+                                    self.__framesize,
+                                    pixelnum,
+                                    len(pixelorder),
+                                    bytes(pixelorder) + b'\xff' * (4 - len(pixelorder)),
+                                    0)
+
+    """
+        appends a frame to the ring
+        the slot is invalidated while being written, the latest frame index in the header is updated last
+
+        :param    frame: wire bytes of the frame
+        :type     frame: bytes-like
+    """
+    def write(self, frame):
+        self.__frameindex += 1
+        slotsize = type(self).SLOT.size + self.__framesize
+        offset = type(self).HEADER_SIZE + ((self.__frameindex - 1) % self.__slots) * slotsize
+        length = min(len(frame), self.__framesize)
+
+        type(self).SLOT.pack_into(self.__map, offset, 0, 0.0, 0)
+        self.__map[offset + type(self).SLOT.size:offset + type(self).SLOT.size + length] = frame[:length]
+        type(self).SLOT.pack_into(self.__map, offset, self.__frameindex, time.time(), length)
+        struct.pack_into('<Q', self.__map, type(self).HEADER.size - 8, self.__frameindex)
+
+    def close(self):
+        self.__map.close()
+        self.__file.close()
+
+
+class FrameRingReader(object):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    numPixels = 0
+    bpp = 0
+    order = None
+
+    __file = None
+    __map = None
+    __slots = 0
+    __framesize = 0
+
+    """
+        constructor - opens an existing ring file written by a virtual strip
+
+        :param    path: path of the ring file
+        :type     path: str
+    """
+    def __init__(self, path):
+        self.__file = open(path, 'rb')
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, _, self.__slots, self.__framesize, self.numPixels, self.bpp, order, _ = \
+            FrameRingFile.HEADER.unpack_from(self.__map, 0)
+        if magic != FrameRingFile.MAGIC:
+            raise ValueError('{0} is not a frame ring file'.format(path))
+        self.order = tuple(order[:self.bpp])
+
+    """
+        returns the index of the latest frame written, 0 if no frame was written yet
+    """
+    def latestIndex(self):
+        return struct.unpack_from('<Q', self.__map, FrameRingFile.HEADER.size - 8)[0]
+
+    """
+        returns a frame by its index
+
+        :param    frameindex: index of the frame
+        :type     frameindex: int
+        :returns: tuple (frame index, timestamp, frame bytes) or None if the frame is not available (anymore)
+    """
+    def read(self, frameindex):
+        if frameindex < 1:
+            return None
+
+        slotsize = FrameRingFile.SLOT.size + self.__framesize
+        offset = FrameRingFile.HEADER_SIZE + ((frameindex - 1) % self.__slots) * slotsize
+
+        index, timestamp, length = FrameRingFile.SLOT.unpack_from(self.__map, offset)
+        frame = self.__map[offset + FrameRingFile.SLOT.size:offset + FrameRingFile.SLOT.size + length]
+
+        # ensure the slot was not overwritten while copying
+        if index != frameindex or FrameRingFile.SLOT.unpack_from(self.__map, offset)[0] != frameindex:
+            return None
+        return (index, timestamp, frame)
+
+    """
+        follows the ring file and yields each new frame
+        frames overwritten before being read are skipped
+
+        :param    interval: polling interval in seconds
+        :type     interval: float
+    """
+    def tail(self, interval = 0.01):
+        last = self.latestIndex()
+        while True:
+            latest = self.latestIndex()
+            if latest == last:
+                time.sleep(interval)
+                continue
+
+            for frameindex in range(max(last + 1, latest - self.__slots + 1), latest + 1):
+                frame = self.read(frameindex)
+                if frame is not None:
+                    yield frame
+            last = latest
+
+    def close(self):
+        self.__map.close()
+        self.__file.close()
+
+
+########################################
+#            LAST FRAME                #
+########################################
+class LastFrameFile(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    MAGIC       = b'CATALST1'
+    VERSION     = 1
+    # magic, version, brightness, number of strips
+    HEADER      = struct.Struct('<8sIdI')
+    # bytes per pixel, pixel order, frame size
+    STRIP       = struct.Struct('<I4sI')
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    path = None
+
+    """
+        constructor
+
+        :param    path: path of the file storing the last shown frame
+        :type     path: str
+    """
+    def __init__(self, path):
+        self.path = path
+
+    """
+        stores the frames of all strips and the brightness
+        the file is replaced atomically, so a power loss while writing keeps the previous frame
+
+        :param    brightness: brightness of the strips
+        :type     brightness: float
+        :param    frames: list of tuples (pixel order, frame bytes) per strip, see NeoPixelBase.getFrame
+        :type     frames: list
+    """
+    def save(self, brightness, frames):
+        directory = os.path.dirname(self.path)
+        if directory != '':
+            os.makedirs(directory, exist_ok = True)
+
+        temp = self.path + '.tmp'
+        with open(temp, 'wb') as lastframe:
+            lastframe.write(type(self).HEADER.pack(type(self).MAGIC,
+                                                   type(self).VERSION,
+                                                   float(brightness),
+                                                   len(frames)))
+            for pixelorder, frame in frames:
+                lastframe.write(type(self).STRIP.pack(len(pixelorder),
+                                                      bytes(pixelorder) + b'\xff' * (4 - len(pixelorder)),
+                                                      len(frame)))
+                lastframe.write(frame)
+        os.replace(temp, self.path)
+
+    """
+        reads the frames stored by save
+
+        :returns: tuple (brightness, [(pixel order, frame bytes), ...]) or None if no valid frame was stored
+    """
+    def load(self):
+        try:
+            with open(self.path, 'rb') as lastframe:
+                data = lastframe.read()
+        except OSError:
+            return None
+
+        try:
+            magic, version, brightness, count = type(self).HEADER.unpack_from(data, 0)
+            if magic != type(self).MAGIC or version != type(self).VERSION:
+                return None
+
+            frames = []
+            offset = type(self).HEADER.size
+            for _ in range(count):
+                bpp, order, length = type(self).STRIP.unpack_from(data, offset)
+                offset += type(self).STRIP.size
+                if offset + length > len(data):
+                    return None
+                frames.append((tuple(order[:bpp]), data[offset:offset + length]))
+                offset += length
+        except struct.error:
+            return None
+
+        return (brightness, frames)
@@ -14,9 +14,14 @@ TODO
 @deffield    updated: Updated
 '''
 
-import neopixel
-from catatumbo.core.neopixel_colors import NeoPixelColors
-from adafruit_blinka.microcontroller.bcm283x import pin
+from catatumbo.core.neopixel_colors import NeoPixelColors, PaletteColor
+from catatumbo.core.neopixel_backend import createStrip, mapPin, mapOrder, encodePixel, RGBW
+from catatumbo.core.output_stage import OutputStage
+from catatumbo.core.util.instrumentation import timed, getCounter
+
+
+# frames transferred to the strips, labeled by pixel pin
+_frames = getCounter('render.frames', 'frames pushed to the strip')
 
 class NeoPixelBase(object):
     
@@ -32,37 +37,63 @@ class NeoPixelBase(object):
     OBJECT ATTRIBUTES
     """
     __strip = None
+    # metrics label identifying the strip
+    __labels = None
+    __order = None
+    # frame of the strip as drawn, converted by the output stage on show
+    __frame = None
+    # gamma, white balance and brightness applied to the transmitted frame
+    __output = None
     
     """
         contructor
         
-        :param    pixelorder: defines the LED strip type. use NeoPixel class attributes RGB, GRB, RGBW, GRBW
-        :type     pixelorder: int
+        :param    pixelorder: defines the LED strip type. use neopixel_backend attributes RGB, GRB, RGBW, GRBW
+        :type     pixelorder: tuple
+        :param    backend: defines the backend driving the strip, see neopixel_backend BACKEND_NEOPIXEL (default), BACKEND_VIRTUAL
+        :type     backend: str
+        :param    framefile: ring file receiving the frames of the virtual backend
+        :type     framefile: str
+        :param    gamma: exponent of the gamma correction of the transmitted colors, see OutputStage
+        :type     gamma: float
+        :param    whitebalance: factor per channel in order (r, g, b) or (r, g, b, w), see OutputStage
+        :type     whitebalance: tuple
+        :param    whitetemperature: color temperature of the white LEDs in Kelvin, RGBW strips derive their white channel
+                    from the RGB colors, see OutputStage
+        :type     whitetemperature: float
         TODO
     """  
     def __init__(self, 
-                 pixelpin       = pin.D18, 
+                 pixelpin       = 'D18', 
                  pixelnum       = 0, 
-                 pixelorder     = neopixel.RGBW,
+                 pixelorder     = RGBW,
                  color_schema   = NeoPixelColors,
-                 brightness     = 0.2):
-        
-        # check if mapping of pin is required
-        pixelpin = self.__map_Pin__(pixelpin)
+                 brightness     = 0.2,
+                 backend        = None,
+                 framefile      = None,
+                 gamma          = 1.0,
+                 whitebalance   = None,
+                 whitetemperature = None):
         
         # check if mapping of pixelorder is required
         pixelorder = self.__map_Order__(pixelorder)
+        self.__order = pixelorder
                 
         #initializing color schema
         #this will dependent whether its a RGB or RGBW strip define the predefined color values
         self.__schema = color_schema(pixelorder)
         
-        # init strip
-        self.__strip = neopixel.NeoPixel(pixelpin, 
-                                         int(pixelnum), 
-                                         brightness=brightness, 
-                                         auto_write=False,
-                                         pixel_order=pixelorder)
+        # init strip - pin mapping is done by the backend as only required for hardware
+        # brightness is applied by the output stage, the strip transmits the converted frame unscaled
+        self.__strip = createStrip(pixelpin, 
+                                   pixelnum, 
+                                   pixelorder, 
+                                   1.0,
+                                   backend,
+                                   framefile)
+        self.__frame = bytearray(len(self.__strip.buf))
+        self.__output = OutputStage(pixelorder, gamma, whitebalance, brightness, whitetemperature)
+        self.__labels = {"strip" : str(pixelpin)}
 
     ########################################
     #            UTILITY METHODS           #
@@ -77,41 +108,17 @@ class NeoPixelBase(object):
         :returns: pin as defined by neopixel attribute
     """
     def __map_Pin__(self, pixelpin):
-        
-        if isinstance(pixelpin, str):
-            if(pixelpin == 'D12'):
-                pixelpin = pin.D12
-            elif(pixelpin == 'D13'):
-                pixelpin = pin.D13
-            elif(pixelpin == 'D18'):
-                pixelpin = pin.D18
-            elif(pixelpin == 'D19'):
-                pixelpin = pin.D19
-            elif(pixelpin == 'D21'):
-                pixelpin = pin.D21
-        
-        return pixelpin
+        return mapPin(pixelpin)
     
     """
         checks if pixelorder parameter was provided as instance or string (in case of command line configuration)
         
-        :param    pixelorder: order defined either by neopixel attributes (neopixel.GRB, ...) or string
+        :param    pixelorder: order defined either by neopixel_backend attributes (GRB, ...) or string
         :type     pixelorder: str or neopixel attribute
         :returns: order as defined by neopixel attribute
     """
     def __map_Order__(self, pixelorder):
-        # check if pixelorder parameter was provided as instance or string (in case of command line configuration)
-        if isinstance(pixelorder, str):
-            if(pixelorder == 'GRB'):
-                pixelorder = neopixel.GRB
-            elif(pixelorder == 'RGB'):
-                pixelorder = neopixel.RGB
-            elif(pixelorder == 'GRBW'):
-                pixelorder = neopixel.GRBW
-            elif(pixelorder == 'RGBW'):
-                pixelorder = neopixel.RGBW
-        
-        return pixelorder
+        return mapOrder(pixelorder)
 
     ########################################
     #            MEMBER METHODS            #
@@ -121,10 +128,13 @@ class NeoPixelBase(object):
         
         :param    num: brightness of the LED strip
         :type     num: float
+        :param    show: transfers the frame with the new brightness, otherwise it is applied by the next show
+        :type     show: boolean
     """
-    def setBrightness(self, brightness):
-        self.__strip.brightness = float(brightness)
-        self.__strip.show()
+    def setBrightness(self, brightness, show = True):
+        self.__output.setBrightness(brightness)
+        if show:
+            self.show()
         #print('brightness level: ' + str(brightness))
         
     """
@@ -134,7 +144,7 @@ class NeoPixelBase(object):
         :type        float
     """
     def getBrightness(self):
-        return self.__strip.brightness
+        return self.__output.getBrightness()
 
     """
         return the numer of led pixels defined for the current instance
@@ -148,13 +158,18 @@ class NeoPixelBase(object):
         turns all led pixels off
     """
     def reset(self):
-        self.__strip.fill(self.__schema.W_BLACK)
+        self.__frame[:] = bytes(len(self.__frame))
     
     """
         set the color at the corresponding index
+        colors given by palette index, e.g. NeoPixelColors.W_RED, are resolved by the palette of the strip
     """        
     def setPixel(self, index, color):
-        self.__strip[index] = color
+        if isinstance(color, PaletteColor):
+            color = self.__schema.getPalette().getColor(color)
+        if index < 0:
+            index += self.getNumPixels()
+        encodePixel(self.__frame, index, color, self.__order)
         
     """
         fills the strips according to a list of color values
@@ -162,6 +177,7 @@ class NeoPixelBase(object):
         :param    sampleboard: list of color values defining the section, the section size depends on the number of pixels available in total
         :type     sampleboard: list
     """      
+    @timed('render.setPixelBySampleboard', 'rendering of a sampleboard including transfer to the strips')
     def setPixelBySampleboard(self, sampleboard):
         
         # do nothing if sampleboard is empty
@@ -184,9 +200,50 @@ class NeoPixelBase(object):
         # update color values if not done automatically
         self.show() 
     
+    """
+        returns the frame buffer of the strip without copying it
+        the bytes are in order of transmission (see getPixelOrder) and not scaled by brightness
+        RGBW strips deriving their white channel return a copy with the white channel shown, see OutputStage.extractWhite
+        
+        :returns: memoryview of the frame buffer, not to be changed by the caller, see setFrame
+    """
+    def getFrame(self):
+        return memoryview(self.__output.extractWhite(self.__frame))
+    
+    """
+        replaces the frame buffer of the strip, e.g. by a stored frame
+        the frame is transferred to the strip with the next show
+        
+        :param    frame: bytes in order of transmission, see getFrame
+        :type     frame: bytes-like
+    """
+    def setFrame(self, frame):
+        self.__frame[:] = frame
+    
+    """
+        :returns: pixel order of the strip, see neopixel_backend RGB, GRB, RGBW, GRBW
+    """
+    def getPixelOrder(self):
+        return self.__order
+    
+    """
+        :returns: palette of the color schema compiled for the pixel order of the strip, see neopixel_colors.Palette
+    """
+    def getPalette(self):
+        return self.__schema.getPalette()
+    
     """
         update the strip with the defined color values
+        the frame is converted by a single lookup of the output stage, see OutputStage
     """        
     def show(self):
+        self.__strip.buf[:] = self.__output.apply(self.__frame)
         self.__strip.show()
+        _frames.increment(self.__labels)
+    
+    """
+        turns the strip off and releases the hardware
+    """
+    def deinit(self):
+        self.__strip.deinit()
         
\ No newline at end of file
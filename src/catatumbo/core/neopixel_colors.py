@@ -6,6 +6,11 @@ The neopixel driver does not allow an accurate mapping of RGB/HSV color values.
 
 Available colors depend on the type of the neopixel LED strip and can be seen from the respective init-methods. 
 
+Each strip compiles its own palette of the color schema for its pixel order, see Palette. The color attributes of the
+class (W_RED, ...) are the palette indices shared by all strips, the color values are only defined per instance,
+so strips of different types in one chain never overwrite the colors of each other.
+Renderers set pixels by palette index, the index is resolved by the palette of the strip showing the pixel.
+
 @author:     MBizm
 
 @copyright:  2019 organization_name. All rights reserved.
@@ -15,13 +20,89 @@ Available colors depend on the type of the neopixel LED strip and can be seen fr
 @deffield    created: November 2019
 @deffield    updated: Updated
 '''
-import neopixel
+from catatumbo.core.neopixel_backend import RGB, GRB, RGBW, GRBW, encodePixel
+
+
+class PaletteColor(int):
+    """
+        index of a color in the palettes of a color schema, e.g. NeoPixelColors.W_RED
+        
+        :param    index: index of the color in the palette
+        :type     index: int
+        :param    name: name of the color attribute
+        :type     name: str
+    """
+    def __new__(cls, index, name):
+        color = super().__new__(cls, index)
+        color.name = name
+        return color
+    
+    def __repr__(self):
+        return self.name
+
+
+class Palette(object):
+    
+    """
+    OBJECT ATTRIBUTES
+    """
+    __pixelorder = None
+    # color values as defined by the color schema, tuple per palette index
+    __colors = None
+    # bytes of all colors in order of transmission, one pixel per palette index
+    __pixels = None
+    
+    """
+        compiles the colors of a schema for one pixel order, the palette can not be changed afterwards
+        
+        :param    pixelorder: pixel order of the strip, see neopixel_backend
+        :type     pixelorder: tuple
+        :param    colors: color tuples in order of the palette indices
+        :type     colors: list
+    """
+    def __init__(self, pixelorder, colors):
+        self.__pixelorder = tuple(pixelorder)
+        self.__colors = tuple(tuple(color) for color in colors)
+        
+        pixels = bytearray(len(self.__colors) * len(self.__pixelorder))
+        for index, color in enumerate(self.__colors):
+            encodePixel(pixels, index, color, self.__pixelorder)
+        self.__pixels = bytes(pixels)
+    
+    def getPixelOrder(self):
+        return self.__pixelorder
+    
+    """
+        :returns: color tuple of a palette index as defined by the color schema
+    """
+    def getColor(self, index):
+        return self.__colors[index]
+    
+    """
+        :returns: bytes of a palette index in order of transmission
+    """
+    def getPixel(self, index):
+        bpp = len(self.__pixelorder)
+        return self.__pixels[index * bpp:(index + 1) * bpp]
+    
+    """
+        :returns: bytes of all colors in order of transmission, one pixel per palette index
+    """
+    def getPixels(self):
+        return self.__pixels
+    
+    def __len__(self):
+        return len(self.__colors)
+
 
 class NeoPixelColors(object):
 
     """
     STATIC CLASS ATTRIBUTES
     """
+    # names of the colors in order of their palette index, extended by derived classes, see _numberColors
+    COLORS             = ()
+    
     W_RED              = None
     
     W_WARM_ORANGE      = None
@@ -58,61 +139,88 @@ class NeoPixelColors(object):
     
     W_BLACK            = None
     
+    """
+    OBJECT ATTRIBUTES
+    """
+    __palette          = None
     
     """
         contructor
         
-        :param    pixelorder: defines the LED strip type. use NeoPixel class attributes RGB, GRB, RGBW, GRBW
-        :type     pixelorder: int
+        :param    pixelorder: defines the LED strip type. use neopixel_backend attributes RGB, GRB, RGBW, GRBW
+        :type     pixelorder: tuple
     """  
     def __init__(self, pixelorder):
-        if pixelorder == neopixel.GRB or pixelorder == neopixel.RGB:
+        if pixelorder == GRB or pixelorder == RGB:
             self.__initRGB__()
-        elif pixelorder == neopixel.GRBW or pixelorder == neopixel.RGBW:
+        elif pixelorder == GRBW or pixelorder == RGBW:
             self.__initRGBW__()
 
         self.__initDerivedColors__()
+        
+        colors = []
+        for name in type(self).COLORS:
+            color = getattr(self, name)
+            if isinstance(color, PaletteColor):
+                raise ValueError("Color {0} is not defined for pixel order {1}".format(name, pixelorder))
+            colors.append(color)
+        self.__palette = Palette(pixelorder, colors)
+    
+    """
+        numbers the colors declared by derived color schemas
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _numberColors(cls)
+    
+    """
+        returns the palette compiled for the pixel order of this instance
+        
+        :returns: Palette
+    """
+    def getPalette(self):
+        return self.__palette
 
     """
         initializer for RGBW LED strip
     """     
     def __initRGBW__(self):
    
-        type(self).W_RED              = (255,0,0,0)
+        self.W_RED              = (255,0,0,0)
         
-        type(self).W_WARM_ORANGE      = (255,20,0,0)
-        type(self).W_LIGHT_ORANGE     = (255,60,0,0)
+        self.W_WARM_ORANGE      = (255,20,0,0)
+        self.W_LIGHT_ORANGE     = (255,60,0,0)
         
-        type(self).W_WARM_YELLOW      = (255,100,0,0)     #yellow with a redish nuance
-        type(self).W_YELLOW           = (255,150,1,0)
-        type(self).W_LIGHT_YELLOW     = (255,210,3,0)     #brighter yellow with a greenish accent
+        self.W_WARM_YELLOW      = (255,100,0,0)     #yellow with a redish nuance
+        self.W_YELLOW           = (255,150,1,0)
+        self.W_LIGHT_YELLOW     = (255,210,3,0)     #brighter yellow with a greenish accent
         
-        type(self).W_WARM_MAGENTA     = (255,0,3,0)       #magenta with a redish nuance
-        type(self).W_MAGENTA          = (255,0,6,0)
-        type(self).W_LIGHT_MAGENTA    = (255,0,17,30)      #brighter magenta with more blueish accent
+        self.W_WARM_MAGENTA     = (255,0,3,0)       #magenta with a redish nuance
+        self.W_MAGENTA          = (255,0,6,0)
+        self.W_LIGHT_MAGENTA    = (255,0,17,30)      #brighter magenta with more blueish accent
         
-        type(self).W_LIGHT_SALMON     = (255,60,7,0)
+        self.W_LIGHT_SALMON     = (255,60,7,0)
         
-        type(self).W_LAVENDERBLUSH    = (255,80,15,0)     #very bright version of rose
+        self.W_LAVENDERBLUSH    = (255,80,15,0)     #very bright version of rose
         
-        type(self).W_LIGHT_GREEN      = (0,63,0,0)        #green with a tendency to limegreen
-        type(self).W_LIGHT_MINTH      = (0,255,0,255)     #light green with bright white
-        type(self).W_LIGHT_SEAGREEN   = (0,63,15,0)
+        self.W_LIGHT_GREEN      = (0,63,0,0)        #green with a tendency to limegreen
+        self.W_LIGHT_MINTH      = (0,255,0,255)     #light green with bright white
+        self.W_LIGHT_SEAGREEN   = (0,63,15,0)
         
-        type(self).W_CYAN             = (50,150,127,0)    #light turkis
+        self.W_CYAN             = (50,150,127,0)    #light turkis
         
-        type(self).W_AQUAMARINE       = (50,180,60,0)     #light turkis with greenish accent
+        self.W_AQUAMARINE       = (50,180,60,0)     #light turkis with greenish accent
         
-        type(self).W_LIGHT_BLUE       = (0,70,255,10)     #brighter blue with a nuance white
-        type(self).W_BLUE             = (0,0,255,0)
-        type(self).W_CORNFLOWERBLUE   = (70,0,255,0)      #purple with blueish accent
+        self.W_LIGHT_BLUE       = (0,70,255,10)     #brighter blue with a nuance white
+        self.W_BLUE             = (0,0,255,0)
+        self.W_CORNFLOWERBLUE   = (70,0,255,0)      #purple with blueish accent
         
-        type(self).W_LIGHT_PURPLE     = (140,0,255,0)     #brighter purple with a redish nuance 
+        self.W_LIGHT_PURPLE     = (140,0,255,0)     #brighter purple with a redish nuance 
         
-        type(self).W_LIGHT_WHITE      = (255,255,255,123) #brighter white
-        type(self).W_WHITE            = (255,255,255,0)
+        self.W_LIGHT_WHITE      = (255,255,255,123) #brighter white
+        self.W_WHITE            = (255,255,255,0)
         
-        type(self).W_BLACK            = (0,0,0,0)
+        self.W_BLACK            = (0,0,0,0)
         
     
     """
@@ -120,45 +228,67 @@ class NeoPixelColors(object):
     """ 
     def __initRGB__(self):
         
-        type(self).W_RED              = (255,0,0)
+        self.W_RED              = (255,0,0)
         
-        type(self).W_WARM_ORANGE      = (255,20,0)
-        type(self).W_LIGHT_ORANGE     = (255,60,0)
+        self.W_WARM_ORANGE      = (255,20,0)
+        self.W_LIGHT_ORANGE     = (255,60,0)
         
-        type(self).W_WARM_YELLOW      = (255,100,0)       #yellow with a redish nuance
-        type(self).W_YELLOW           = (255,150,1)
-        type(self).W_LIGHT_YELLOW     = (255,210,3)       #brighter yellow with a greenish accent
+        self.W_WARM_YELLOW      = (255,100,0)       #yellow with a redish nuance
+        self.W_YELLOW           = (255,150,1)
+        self.W_LIGHT_YELLOW     = (255,210,3)       #brighter yellow with a greenish accent
         
-        type(self).W_WARM_MAGENTA     = (255,0,3)         #magenta with a redish nuance
-        type(self).W_MAGENTA          = (255,0,6)
-        type(self).W_LIGHT_MAGENTA    = (255,0,17)        #brighter magenta with more blueish accent
+        self.W_WARM_MAGENTA     = (255,0,3)         #magenta with a redish nuance
+        self.W_MAGENTA          = (255,0,6)
+        self.W_LIGHT_MAGENTA    = (255,0,17)        #brighter magenta with more blueish accent
         
-        type(self).W_LIGHT_SALMON     = (255,60,7)
+        self.W_LIGHT_SALMON     = (255,60,7)
         
-        type(self).W_LAVENDERBLUSH    = (255,80,15)       #very bright version of rose
+        self.W_LAVENDERBLUSH    = (255,80,15)       #very bright version of rose
         
-        type(self).W_LIGHT_GREEN      = (0,63,0)          #green with a tendency to limegreen
-        type(self).W_LIGHT_MINTH      = (0,255,10)        #light green with bright white
-        type(self).W_LIGHT_SEAGREEN   = (0,63,15)
+        self.W_LIGHT_GREEN      = (0,63,0)          #green with a tendency to limegreen
+        self.W_LIGHT_MINTH      = (0,255,10)        #light green with bright white
+        self.W_LIGHT_SEAGREEN   = (0,63,15)
         
-        type(self).W_CYAN             = (50,150,127)      #light turkis
+        self.W_CYAN             = (50,150,127)      #light turkis
         
-        type(self).W_AQUAMARINE       = (50,180,60)       #light turkis with greenish accent
+        self.W_AQUAMARINE       = (50,180,60)       #light turkis with greenish accent
         
-        type(self).W_LIGHT_BLUE       = (0,70,255)        #brighter blue with a nuance white
-        type(self).W_BLUE             = (0,0,255)
-        type(self).W_CORNFLOWERBLUE   = (70,0,255)        #purple with blueish accent
+        self.W_LIGHT_BLUE       = (0,70,255)        #brighter blue with a nuance white
+        self.W_BLUE             = (0,0,255)
+        self.W_CORNFLOWERBLUE   = (70,0,255)        #purple with blueish accent
         
-        type(self).W_LIGHT_PURPLE     = (140,0,255)       #brighter purple with a redish nuance 
+        self.W_LIGHT_PURPLE     = (140,0,255)       #brighter purple with a redish nuance 
         
-        type(self).W_LIGHT_WHITE      = (233,233,255)     #brighter white
-        type(self).W_WHITE            = (255,255,255)
+        self.W_LIGHT_WHITE      = (233,233,255)     #brighter white
+        self.W_WHITE            = (255,255,255)
           
         
-        type(self).W_BLACK            = (0,0,0)
+        self.W_BLACK            = (0,0,0)
         
     """
         empty implementation for derived classes to define own color definitions on base colors
     """ 
     def __initDerivedColors__(self):
-        pass
\ No newline at end of file
+        pass
+
+
+"""
+    replaces the color attributes declared by a color schema class, e.g. W_RED = None, by their palette index
+    colors inherited from the base classes keep their index
+    
+    :param    cls: color schema class
+    :type     cls: class
+"""
+def _numberColors(cls):
+    names = list(cls.COLORS)
+    for name, value in list(vars(cls).items()):
+        if name.startswith('W_') and value is None:
+            if name in names:
+                index = names.index(name)
+            else:
+                index = len(names)
+                names.append(name)
+            setattr(cls, name, PaletteColor(index, name))
+    cls.COLORS = tuple(names)
+
+_numberColors(NeoPixelColors)
@@ -13,33 +13,72 @@ TODO
 @deffield    created: December 2019
 @deffield    updated: Updated
 '''
-import neopixel
-import ipinfo
+import logging
 import os
 import datetime
+import threading
+import numpy as np
 
 from catatumbo.core.util.utility import getExternalIPAddress
-from ipinfo.exceptions import RequestQuotaExceededError
 from catatumbo.core.neopixel_colors import NeoPixelColors
 from catatumbo.core.neopixel_base import NeoPixelBase
+from catatumbo.core.neopixel_backend import RGBW, LastFrameFile
+from catatumbo.core.render_actor import RenderActor
+from catatumbo.core.layer_stack import LayerStack, BLEND_MULTIPLY
+from catatumbo.core.animation import Animator
 from catatumbo.core.util.configurations import Configurations
-from astral import Location
 from catatumbo.core.util.update_thread import fadeBrightness
-from adafruit_blinka.microcontroller.bcm283x import pin
+from catatumbo.core.util.instrumentation import timed
+from catatumbo.core.util import events
 from datetime import timedelta
 
 
+_log = logging.getLogger(__name__)
+
+
 class NeoPixelMultiBase(NeoPixelBase):
     
     """
     STATIC CLASS ATTRIBUTES
     """
+    # seconds the last frame is stored after a change, so fading steps cause a single write
+    LASTFRAME_DELAY = 1
+    
+    # priority of the layer drawn by the controller, overlays like alarms use a higher priority, see layer_stack
+    LAYER_PRIORITY  = 0
+    
+    # hardware handle shared by all controller instances, the strips are initialized once per process
+    __sharedStrips  = None
+    __sharedActor   = None
+    __sharedLayers  = None
+    __sharedLock    = threading.Lock()
     
     """
     OBJECT ATTRIBUTES
     """
     # the set of led strip represented by NeoPixelBase classes
     __stripList     = None
+    # serializes all changes of the strips, see render
+    __actor         = None
+    # layers of all controllers composited into the frame of the strips
+    __layers        = None
+    # layer drawn by this controller and published by show, see draw
+    __layer         = None
+    # animations on top of the layer, created on first use, see getAnimator
+    __animator      = None
+    # previous colors of the pixels changed by show, faded out on top of the layer, see __crossfade
+    __transition    = None
+    # frame and brightness last transferred per strip, see __showStrips
+    __shown         = None
+    __shownBrightness = None
+    
+    # last shown frame, replayed on boot
+    __lastFrame     = None
+    __lastFrameTimer = None
+    __lastFrameLock = None
+    
+    # suspended controllers do not run scheduled work, see suspend
+    __suspended     = False
     
     # brightness adaption location resolved by external IP resolution
     localCity       = None
@@ -62,11 +101,20 @@ class NeoPixelMultiBase(NeoPixelBase):
         
                 [GeneralConfiguration]
                 Brightness=0.3
+                # optional - drive the strips without hardware, frames are written to ring files in FrameDir
+                Backend=virtual
+                FrameDir=/tmp/catatumbo
+                # optional - gamma correction of the transmitted colors
+                Gamma=2.2
                 
                 [Strip1]
                 PixelPin1=D18
                 PixelNum1=60
                 PixelOrder1=GRBW
+                # optional - white balance per channel
+                WhiteBalance1=1.0,0.85,0.7,1.0
+                # optional - color temperature of the white LEDs, the white channel is derived from the RGB colors
+                WhiteTemperature1=4500
                 
                 [Strip2]
                 PixelPin2=D21
@@ -78,18 +126,63 @@ class NeoPixelMultiBase(NeoPixelBase):
                 PixelNum3=145
                 PixelOrder3=GRB
         
+        the strips are initialized by the first instance and shared by all further instances, e.g. the controllers of different modes.
+        the last shown frame is replayed right after the strip initialization, so the strips are lit during the start up.
+        
         :param    color_schema: the color schema class which defined the color values, e.g. NeoPixelColors or derived classes
         :type     color_schema: class
+        :param    resolve_location: resolves the location and adapts the brightness, otherwise resolveLocation
+                    and adaptBrightnessToLocalDaytime are to be called by the derived class, e.g. in the background
+        :type     resolve_location: boolean
     """  
-    def __init__(self, color_schema):
+    def __init__(self, color_schema, resolve_location = True):
         
         # no initialization of super constructor to avoid led strip initialization
         
-        # the set of led strip represented by NeoPixelBase classes
-        self.__stripList = []
+        self.__lastFrameLock = threading.Lock()
         
         config = Configurations()
+        self.__lastFrame = LastFrameFile(config.getLastFrameFile())
+        
+        with NeoPixelMultiBase.__sharedLock:
+            if NeoPixelMultiBase.__sharedStrips is None:
+                # the set of led strip represented by NeoPixelBase classes
+                self.__stripList = []
+                self.__initStrips(config, color_schema)
+                self.__layers = LayerStack(self.__getStripLayout(), self.__getStripPalettes())
+                self.__layer = self.__addLayer()
+                self.setColorSchema(color_schema)
+                self.__actor = RenderActor(self.__showStrips)
+                self.__actor.start()
+                NeoPixelMultiBase.__sharedStrips = self.__stripList
+                NeoPixelMultiBase.__sharedActor = self.__actor
+                NeoPixelMultiBase.__sharedLayers = self.__layers
+                
+                # show last frame till the controller has rendered its first one
+                self.restoreFrame()
+            else:
+                self.__stripList = NeoPixelMultiBase.__sharedStrips
+                self.__actor = NeoPixelMultiBase.__sharedActor
+                self.__layers = NeoPixelMultiBase.__sharedLayers
+                self.__layer = self.__addLayer()
+                self.setColorSchema(color_schema)
         
+        if resolve_location:
+            self.resolveLocation()
+            
+            # set brightness of strip based on local sunset / sunrise
+            self.adaptBrightnessToLocalDaytime()
+    
+    ########################################
+    #            UTILITY METHODS           #
+    ########################################   
+    """
+        initializes the led strips defined by the configuration
+    """
+    def __initStrips(self, config, color_schema):
+        # backend driving the strips, neopixel hardware by default
+        backend = config.getBackend()
+        frameDir = config.getFrameDir()
 
         # loop all individual led strip configurations
         counter = 1
@@ -105,18 +198,54 @@ class NeoPixelMultiBase(NeoPixelBase):
             pp = config.getConfigProperty(section, "PixelPin")
             pn = config.getConfigProperty(section, "PixelNum")
             po = config.getConfigProperty(section, "PixelOrder")
+            wb = config.getWhiteBalance(section)
+            wt = config.getWhiteTemperature(section)
 
             strip = NeoPixelMultiBase.__Config__(pixelpin       = pp,
                                                  pixelnum       = pn,
                                                  pixelorder     = po,
-                                                 color_schema   = color_schema)
+                                                 color_schema   = color_schema,
+                                                 backend        = backend,
+                                                 framefile      = None if frameDir is None else
+                                                                  os.path.join(frameDir, section.lower() + '.frames'),
+                                                 gamma          = config.getGamma(),
+                                                 whitebalance   = wb,
+                                                 whitetemperature = wt)
             self.addStrip(strip)
             
             counter = counter + 1
+    
+    """
+        turns off and releases the shared led strips, the next instance initializes the strips again
+        e.g. on shutdown or after the strip configuration was changed
+    """
+    @staticmethod
+    def releaseStrips():
+        with NeoPixelMultiBase.__sharedLock:
+            strips = NeoPixelMultiBase.__sharedStrips
+            actor = NeoPixelMultiBase.__sharedActor
+            NeoPixelMultiBase.__sharedStrips = None
+            NeoPixelMultiBase.__sharedActor = None
+            NeoPixelMultiBase.__sharedLayers = None
+        
+        if actor is not None:
+            actor.stop()
+        for strip in strips or []:
+            strip.deinit()
+    
+    """
+        determines the location for brightness adaption by the external IP, requires an IPInfo key
+    """
+    def resolveLocation(self):
+        config = Configurations()
         
         # get current location for brightness adaption
         ipInfoKey = config.getIPInfoKey()
         if ipInfoKey is not None:            
+            # imported on first use to keep the start up fast
+            import ipinfo
+            from ipinfo.exceptions import RequestQuotaExceededError
+            
             try:
                 # determine location by external IP
                 ipInfo = ipinfo.getHandler(ipInfoKey)
@@ -129,13 +258,7 @@ class NeoPixelMultiBase(NeoPixelBase):
                 self.localTimeZone  = ipDetails.timezone
             except (RequestQuotaExceededError, AttributeError):
                 pass
-            
-        # set brightness of strip based on local sunset / sunrise
-        self.adaptBrightnessToLocalDaytime()
     
-    ########################################
-    #            UTILITY METHODS           #
-    ########################################   
     """
         adds a new led strip to the configuration
         a reset of the color values and brightness is required by the calling application to include the new strip
@@ -145,10 +268,97 @@ class NeoPixelMultiBase(NeoPixelBase):
     """   
     def addStrip(self, config = None):
         if config is not None:
-            self.__stripList.append(NeoPixelBase(config.getPixelPin(), 
-                                                 config.getPixelNum(), 
-                                                 config.getPixelOrder(), 
-                                                 config.getColorSchema()))
+            self.__stripList.append(NeoPixelBase(pixelpin       = config.getPixelPin(), 
+                                                 pixelnum       = config.getPixelNum(), 
+                                                 pixelorder     = config.getPixelOrder(), 
+                                                 color_schema   = config.getColorSchema(),
+                                                 backend        = config.getBackend(),
+                                                 framefile      = config.getFrameFile(),
+                                                 gamma          = config.getGamma(),
+                                                 whitebalance   = config.getWhiteBalance(),
+                                                 whitetemperature = config.getWhiteTemperature()))
+            
+            # layers covering the added strip, shared by all controllers
+            if self.__layers is not None:
+                self.__layers.setStrips(self.__getStripLayout(), self.__getStripPalettes())
+    
+    """
+        :returns: list of tuples (pixel number, pixel order) per strip, see LayerStack
+    """
+    def __getStripLayout(self):
+        return [(self.__getStrip(i).getNumPixels(), self.getPixelOrder(i)) for i in range(self.countStrips())]
+    
+    """
+        returns the palettes of the color schema of this controller compiled for each strip,
+        colors given by palette index are resolved by them
+        
+        :returns: list of Palette per strip
+    """
+    def getPalettes(self):
+        return self.__layer.getPalettes()
+    
+    """
+        replaces the color schema of this controller, the frame shown is recolored by the next show without drawing it again
+        pixels drawn by palette index are kept as index by the layer and expanded by the palettes of the new schema
+        
+        :param    color_schema: the color schema class which defined the color values, e.g. NeoPixelColors or derived classes
+        :type     color_schema: class
+    """
+    def setColorSchema(self, color_schema):
+        palettes = [color_schema(self.getPixelOrder(i)).getPalette() for i in range(self.countStrips())]
+        self.draw(self.__layer.setPalettes, palettes)
+    
+    """
+        :returns: list of the palettes compiled by the strips, the default of layers of the shared layer stack
+    """
+    def __getStripPalettes(self):
+        palettes = []
+        for i in range(self.countStrips()):
+            strip = self.__getStrip(i)
+            
+            # cast
+            strip.__class__ = NeoPixelBase
+            
+            palettes.append(strip.getPalette())
+        return palettes
+    
+    """
+        adds the layer drawn by this controller to the shared layer stack
+    """
+    def __addLayer(self):
+        return self.__layers.addLayer(type(self).__name__, priority = type(self).LAYER_PRIORITY)
+    
+    """
+        returns the layer drawn by this controller, e.g. to change its opacity or blend mode
+        
+        :returns: Layer
+    """
+    def getLayer(self):
+        return self.__layer
+    
+    """
+        returns the animator of this controller, e.g. for blinking or pulsing slots of the frame
+        the animations are multiplied onto the layer of the controller by an overlay layer on top of it
+        
+        :returns: Animator
+    """
+    def getAnimator(self):
+        if self.__animator is None:
+            overlay = self.__layers.addLayer(type(self).__name__ + '.animation',
+                                             priority   = type(self).LAYER_PRIORITY,
+                                             blend      = BLEND_MULTIPLY)
+            self.__animator = Animator(overlay, self.__presentAnimation, Configurations().getAnimationFPS())
+            if not self.__suspended:
+                self.__animator.play()
+        return self.__animator
+    
+    """
+        returns the layers of all controllers, e.g. to add further overlays
+        
+        :returns: LayerStack
+    """
+    def getLayerStack(self):
+        return self.__layers
 
     """
         returns the NeoPixelBase representation of one particular led strip for a given index
@@ -167,6 +377,119 @@ class NeoPixelMultiBase(NeoPixelBase):
     """ 
     def countStrips(self):
         return len(self.__stripList) 
+    
+    """
+        returns the frame buffer of one particular led strip without copying it, see NeoPixelBase.getFrame
+        
+        :param    num: index of led strip
+        :type     num: int
+        :returns: memoryview of the frame buffer, not to be changed by the caller
+    """
+    def getFrame(self, num = 0):
+        strip = self.__getStrip(num)
+        
+        # cast
+        strip.__class__ = NeoPixelBase
+        
+        return strip.getFrame()
+    
+    """
+        :param    num: index of led strip
+        :type     num: int
+        :returns: pixel order of one particular led strip
+    """
+    def getPixelOrder(self, num = 0):
+        strip = self.__getStrip(num)
+        
+        # cast
+        strip.__class__ = NeoPixelBase
+        
+        return strip.getPixelOrder()
+    
+    ########################################
+    #              LIFECYCLE               #
+    ########################################
+    """
+        pauses the controller, e.g. if another mode is activated
+        scheduled updates and fading steps of a suspended controller do not run, the strips keep their state
+        the layer of the controller keeps its frame but is hidden with the next frame shown by another controller
+    """
+    def suspend(self):
+        self.__suspended = True
+        self.__layer.setVisible(False)
+        if self.__animator is not None:
+            self.__animator.pause()
+    
+    """
+        continues a suspended controller and shows its last frame again
+    """
+    def resume(self):
+        self.__suspended = False
+        self.__layer.setVisible(True)
+        if self.__animator is not None:
+            self.__animator.play()
+        self.present()
+    
+    def isSuspended(self):
+        return self.__suspended
+    
+    ########################################
+    #              LAST FRAME              #
+    ########################################
+    """
+        shows the frame and brightness stored by storeFrame
+        the stored frame is only replayed if the strip configuration did not change meanwhile
+        
+        :returns: True if the last frame was shown
+    """
+    def restoreFrame(self):
+        state = self.__lastFrame.load()
+        if state is None:
+            return False
+        
+        brightness, frames = state
+        if len(frames) != self.countStrips():
+            return False
+        for i, (pixelorder, frame) in enumerate(frames):
+            if pixelorder != tuple(self.getPixelOrder(i)) or len(frame) != len(self.getFrame(i)):
+                return False
+        
+        with self.__layer.drawing():
+            for i, (pixelorder, frame) in enumerate(frames):
+                self.__layer.setFrame(i, frame)
+            self.__layer.swap()
+        
+        # transfers the frame to the strips
+        self.setBrightness(brightness)
+        
+        _log.info("Last frame restored from %s", self.__lastFrame.path)
+        return True
+    
+    """
+        stores the current frame and brightness after LASTFRAME_DELAY, later changes within the delay are included
+    """
+    def storeFrame(self):
+        with self.__lastFrameLock:
+            if self.__lastFrameTimer is not None:
+                return
+            self.__lastFrameTimer = threading.Timer(type(self).LASTFRAME_DELAY, self.flushFrame)
+            self.__lastFrameTimer.daemon = True
+            self.__lastFrameTimer.start()
+    
+    """
+        stores the current frame and brightness immediately, e.g. on shutdown
+    """
+    def flushFrame(self):
+        with self.__lastFrameLock:
+            if self.__lastFrameTimer is not None:
+                self.__lastFrameTimer.cancel()
+                self.__lastFrameTimer = None
+        
+        try:
+            self.__lastFrame.save(self.getBrightness(),
+                                  [(self.getPixelOrder(i), bytes(self.getFrame(i))) for i in range(self.countStrips())])
+        except OSError as e:
+            _log.warning("Last frame could not be stored: %s", e)
 
     ########################################
     #        OVERRIDEN MEMBER METHODS      #
@@ -177,14 +500,14 @@ class NeoPixelMultiBase(NeoPixelBase):
         :param    num: brightness of LED strips
         :type     num: float
     """
+    @timed('render.setBrightness', 'brightness change including transfer to the strips, e.g. fading steps')
     def setBrightness(self, brightness):
-        for i in range(self.countStrips()):
-            strip = self.__getStrip(i)
-            
-            # cast
-            strip.__class__ = NeoPixelBase
-            
-            strip.setBrightness(brightness)
+        self.render(self.__setStripBrightness, brightness)
+        
+        self.storeFrame()
+        
+        # notify live state subscribers, e.g. during fading
+        events.publish(brightness = round(self.getBrightness(), 2))
         
     """
         returns the current brightness based on the actual value of the first strip
@@ -217,47 +540,175 @@ class NeoPixelMultiBase(NeoPixelBase):
         turns all led pixels off
     """
     def reset(self):
-        for i in range(self.countStrips()):
-            strip = self.__getStrip(i)
-            
-            # cast
-            strip.__class__ = NeoPixelBase
-            
-            strip.fill(strip.__schema.W_BLACK)
+        self.__layer.reset()
     
     """
         set the color at the corresponding index
-        #### TODO abstraction required - not all may use the same color schema ####
+        the pixel is drawn into the back buffer of the layer and shown by the next show
+        colors given by palette index, e.g. NeoPixelColors.W_RED, are resolved by the palette of the strip
     """        
     def setPixel(self, index, color):
-        count = 0
+        self.__layer.setPixel(index, color)
+    
+    """
+        replaces all pixels of one strip, e.g. by a frame rendered at once
+        the frame is drawn into the back buffer of the layer and shown by the next show
         
+        :param    num: index of led strip
+        :type     num: int
+        :param    frame: bytes in order of transmission
+        :type     frame: bytes-like
+    """
+    def setStripFrame(self, num, frame):
+        self.__layer.setFrame(num, frame)
+    
+    """
+        fills the strips according to a list of color values, see NeoPixelBase
+    """
+    def setPixelBySampleboard(self, sampleboard):
+        self.draw(super().setPixelBySampleboard, sampleboard)
+        
+    """
+        update the strip with the defined color values
+        the layer drawn so far is published as a whole and transferred by the render actor,
+        shows requested together are transferred once
+    """        
+    @timed('render.show', 'transfer of the frame to all strips')
+    def show(self):
+        previous = self.__layer.getFront()
+        self.__layer.swap()
+        self.__crossfade(previous)
+        
+        self.present()
+    
+    """
+        fades from the previous frame of the layer to the frame just published within TransitionDuration
+        the previous colors of the changed pixels are kept by a transition layer on top of the layer, which is faded out
+        
+        :param    previous: front frame of the layer before the swap, see FrameBuffer.getFront
+        :type     previous: tuple
+    """
+    def __crossfade(self, previous):
+        generation, frames, alpha = self.__layer.getFront()
+        # the first frame and frames of suspended controllers are shown immediately
+        if previous[0] == 0 or self.__suspended or (previous[1] == frames and previous[2] == alpha):
+            return
+        
+        duration = Configurations().getTransitionDuration()
+        if duration <= 0:
+            return
+        
+        # changed pixels keep their previous color and alpha on the transition layer, unchanged ones are transparent
+        changed = False
+        transitionAlpha = []
+        start = 0
+        for num, (pixelnum, pixelorder) in enumerate(self.__layer.getStrips()):
+            before = np.frombuffer(previous[1][num], dtype = np.uint8).reshape(pixelnum, len(pixelorder))
+            after = np.frombuffer(frames[num], dtype = np.uint8).reshape(pixelnum, len(pixelorder))
+            alphaBefore = np.frombuffer(previous[2], dtype = np.uint8)[start:start + pixelnum]
+            alphaAfter = np.frombuffer(alpha, dtype = np.uint8)[start:start + pixelnum]
+            
+            pixels = (before != after).any(axis = 1) | (alphaBefore != alphaAfter)
+            changed = changed or pixels.any()
+            transitionAlpha.append(np.where(pixels, alphaBefore, 0).astype(np.uint8).tobytes())
+            start += pixelnum
+        
+        if not changed:
+            return
+        
+        animator = self.getAnimator()
+        if self.__transition is None:
+            # on top of the animations of the layer
+            self.__transition = self.__layers.addLayer(type(self).__name__ + '.transition',
+                                                       priority = type(self).LAYER_PRIORITY)
+        
+        with self.__transition.drawing():
+            for num in range(len(transitionAlpha)):
+                self.__transition.setFrame(num, previous[1][num], transitionAlpha[num])
+            self.__transition.swap()
+        animator.fadeOut(self.__transition, duration)
+    
+    """
+        composites the published layers of all controllers and transfers the frame to the strips
+        e.g. after an overlay layer was drawn or its opacity was changed
+    """
+    def present(self):
+        self.__actor.flush()
+        
+        self.storeFrame()
+    
+    """
+        transfers an animation frame, animation frames do not cause the last frame to be stored
+    """
+    def __presentAnimation(self):
+        if self.__actor is not NeoPixelMultiBase.__sharedActor:
+            # strips were released meanwhile
+            self.__animator.pause()
+            return
+        self.__actor.flush()
+    
+    """
+        draws a frame with exclusive access to the back buffer of the layer, so concurrent renderers do not mix their frames
+        the drawing runs on the calling thread, the render actor keeps transferring the last published frame meanwhile
+        
+        :param    command: function drawing the frame by setPixel and publishing it by show
+        :type     command: callable
+        :param    args: arguments of the command
+        :returns: result of the command
+    """
+    def draw(self, command, *args):
+        with self.__layer.drawing():
+            return command(*args)
+    
+    """
+        runs a command changing the strips on the render actor and waits till the frame was transferred
+        
+        :param    command: function changing the strips, e.g. their brightness
+        :type     command: callable
+        :param    args: arguments of the command
+        :returns: result of the command
+    """
+    def render(self, command, *args):
+        return self.__actor.call(command, *args)
+    
+    ########################################
+    #        RENDER ACTOR COMMANDS         #
+    ########################################
+    def __setStripBrightness(self, brightness):
         for i in range(self.countStrips()):
             strip = self.__getStrip(i)
             
             # cast
             strip.__class__ = NeoPixelBase
             
-            # set color value to matching pixel
-            if((count + strip.getNumPixels()) > index):
-                strip.setPixel(index = (index - count),
-                               color = color)
-                # corresponding pixel found
-                return
-            
-            count += strip.getNumPixels()       
-        
+            # transferred at the end of the tick
+            strip.setBrightness(brightness, show = False)
+    
     """
-        update the strip with the defined color values
-    """        
-    def show(self):
+        transfers the latest published layers to all strips, called by the render actor once per tick
+        the layers are only composited again if one of them changed,
+        only strips with a changed frame or brightness are transmitted, e.g. during animations of single slots
+    """
+    def __showStrips(self):
+        frames = self.__layers.composite()
+        
+        if self.__shown is None or len(self.__shown) != self.countStrips():
+            self.__shown = [None] * self.countStrips()
+            self.__shownBrightness = [None] * self.countStrips()
+        
         for i in range(self.countStrips()):
             strip = self.__getStrip(i)
             
             # cast
             strip.__class__ = NeoPixelBase
             
-            strip.show()
+            changed = frames is not None and frames[i] != self.__shown[i]
+            if changed:
+                strip.setFrame(frames[i])
+                self.__shown[i] = frames[i]
+            if changed or strip.getBrightness() != self.__shownBrightness[i]:
+                strip.show()
+                self.__shownBrightness[i] = strip.getBrightness()
     
     
     ########################################
@@ -278,6 +729,8 @@ class NeoPixelMultiBase(NeoPixelBase):
             self.localLat is not None and \
             self.localLon is not None:
             
+            from astral import Location
+            
             # create Astral Location object for sunset/sunrise calculation
             # https://astral.readthedocs.io/en/stable/index.html
             astralLoc = Location((self.localCity,
@@ -298,7 +751,7 @@ class NeoPixelMultiBase(NeoPixelBase):
             sunset  = astralLoc.sunset()
             now     = datetime.datetime.now(sunrise.tzinfo)
             
-            print("Daytime brightness adaption started - now: {0}, sunrise: {1}, sunset: {2}, current brightness: {3}".format(now, sunrise, sunset, self.getBrightness()))
+            _log.info("Daytime brightness adaption started - now: %s, sunrise: %s, sunset: %s, current brightness: %s", now, sunrise, sunset, self.getBrightness())
 
             # check if night time
             if now < sunrise or now > sunset:
@@ -319,7 +772,7 @@ class NeoPixelMultiBase(NeoPixelBase):
         elif config.getAutoBrightnessMin() is not None:
             now = datetime.datetime.now().time()
             
-            print("Daytime brightness adaption started - now: {0}, static, current brightness: {1}".format(now, self.getBrightness()))
+            _log.info("Daytime brightness adaption started - now: %s, static, current brightness: %s", now, self.getBrightness())
             
             if now > datetime.time(21, 0, 0) or now < datetime.time(6, 0, 0):
                 # sleep mode in dark hours
@@ -342,15 +795,26 @@ class NeoPixelMultiBase(NeoPixelBase):
     class __Config__(object):
         
         def __init__(self, 
-                     pixelpin       = pin.D18, 
+                     pixelpin       = 'D18', 
                      pixelnum       = 0, 
-                     pixelorder     = neopixel.RGBW,
-                     color_schema   = NeoPixelColors):
+                     pixelorder     = RGBW,
+                     color_schema   = NeoPixelColors,
+                     backend        = None,
+                     framefile      = None,
+                     gamma          = 1.0,
+                     whitebalance   = None,
+                     whitetemperature = None):
             
-            self.__pixelpin     = NeoPixelBase.__map_Pin__(self, pixelpin = pixelpin)
+            # pin mapping is done by the backend
+            self.__pixelpin     = pixelpin
             self.__pixelnum     = pixelnum
             self.__pixelorder   = NeoPixelBase.__map_Order__(self, pixelorder = pixelorder)
             self.__colorschema  = color_schema
+            self.__backend      = backend
+            self.__framefile    = framefile
+            self.__gamma        = gamma
+            self.__whitebalance = whitebalance
+            self.__whitetemperature = whitetemperature
             
         ########################################
         #            GETTER METHODS            #
@@ -366,4 +830,19 @@ class NeoPixelMultiBase(NeoPixelBase):
             return self.__pixelorder
         
         def getColorSchema(self):
-            return self.__colorschema
\ No newline at end of file
+            return self.__colorschema
+        
+        def getBackend(self):
+            return self.__backend
+        
+        def getFrameFile(self):
+            return self.__framefile
+        
+        def getGamma(self):
+            return self.__gamma
+        
+        def getWhiteBalance(self):
+            return self.__whitebalance
+        
+        def getWhiteTemperature(self):
+            return self.__whitetemperature
\ No newline at end of file
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Output stage of a led strip, converting the frame of the strip into the bytes transmitted. Gamma correction, the white
+balance of the strip and the brightness are combined into one lookup table of 256 entries per channel, so a frame is
+converted by a single lookup of all its bytes instead of scaling each byte by the brightness in Python.
+
+RGBW strips may derive their white channel from the RGB colors of the frame, so frames rendered in RGB, e.g. by the
+continuous color map, use the white LEDs as well. The white share of each pixel is extracted by the minimum of its
+RGB channels, compensated by the color temperature of the white LEDs: a warm white LED only replaces the share of
+a color matching its own tint. The extraction is computed for all pixels of the frame at once, white already set in
+the frame, e.g. by the RGBW colors of a color schema, is kept.
+
+The table is only rebuilt when the brightness changes, e.g. once per step of the daytime fading. The values are
+rounded instead of truncated, so dim colors do not collapse to off early at low brightness levels.
+
+Usage:
+    output = OutputStage(GRBW, gamma = 2.2, whitebalance = (1.0, 0.85, 0.7, 1.0), whitetemperature = 4500)
+    output.setBrightness(0.3)
+    strip.buf[:] = output.apply(frame)
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import numpy as np
+
+
+class OutputStage(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    # entries of the lookup table per channel
+    LUT_SIZE = 256
+    # color temperatures in Kelvin covered by the approximation of the white LED color
+    MIN_TEMPERATURE = 1000
+    MAX_TEMPERATURE = 40000
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __order         = None
+    __gamma         = 1.0
+    # factor per byte of a pixel in order of transmission
+    __whitebalance  = None
+    __brightness    = None
+    # lookup tables of all channels in order of transmission, one after the other
+    __lut           = None
+    # index of the lookup table per byte of a frame by frame length
+    __offsets       = None
+    # color of the white LEDs as RGB factors, None if the white channel is not derived from the RGB colors
+    __white         = None
+
+    """
+        constructor
+
+        :param    pixelorder: pixel order of the strip, see neopixel_backend RGB, GRB, RGBW, GRBW
+        :type     pixelorder: tuple
+        :param    gamma: exponent of the gamma correction, 1.0 keeps the colors linear
+        :type     gamma: float
+        :param    whitebalance: factor per channel in order (r, g, b) or (r, g, b, w) between 0.0 and 1.0, None for no correction
+        :type     whitebalance: tuple
+        :param    brightness: brightness between 0.0 and 1.0
+        :type     brightness: float
+        :param    whitetemperature: color temperature of the white LEDs in Kelvin deriving the white channel of RGBW strips
+                    from the RGB colors, None keeps the frame unchanged
+        :type     whitetemperature: float
+    """
+    def __init__(self, pixelorder, gamma = 1.0, whitebalance = None, brightness = 1.0, whitetemperature = None):
+        self.__order = tuple(pixelorder)
+        self.__gamma = float(gamma)
+        self.__offsets = {}
+
+        factors = [1.0] * len(self.__order)
+        if whitebalance is not None:
+            if len(whitebalance) not in (3, len(self.__order)):
+                raise ValueError("White balance size does not match pixel_order.")
+            for channel, factor in enumerate(whitebalance):
+                factors[self.__order[channel]] = min(max(float(factor), 0.0), 1.0)
+        self.__whitebalance = np.asarray(factors)
+
+        if whitetemperature is not None and len(self.__order) == 4:
+            # channels without share in the white LED color do not limit the extraction
+            self.__white = np.maximum(self.toRGB(whitetemperature), 1.0 / 255).astype(np.float32)
+
+        self.setBrightness(brightness)
+
+    """
+        sets the brightness, the lookup table is only rebuilt if the brightness changed
+
+        :param    brightness: brightness between 0.0 and 1.0
+        :type     brightness: float
+    """
+    def setBrightness(self, brightness):
+        brightness = min(max(float(brightness), 0.0), 1.0)
+        if brightness == self.__brightness:
+            return
+
+        values = (np.arange(type(self).LUT_SIZE) / (type(self).LUT_SIZE - 1)) ** self.__gamma
+        lut = np.outer(self.__whitebalance * brightness, values) * 255.0
+        self.__lut = np.rint(lut).astype(np.uint8).ravel()
+        self.__brightness = brightness
+
+    def getBrightness(self):
+        return self.__brightness
+
+    """
+        converts a frame into the bytes transmitted to the strip
+
+        :param    frame: bytes in order of transmission
+        :type     frame: bytes-like
+        :returns: converted frame bytes
+    """
+    def apply(self, frame):
+        values = np.frombuffer(frame, dtype = np.uint8)
+        if self.__white is not None:
+            values = self.__extractWhite(values)
+        offsets = self.__offsets.get(len(values))
+        if offsets is None:
+            bpp = len(self.__order)
+            offsets = np.tile(np.arange(bpp, dtype = np.intp) * type(self).LUT_SIZE, len(values) // bpp)
+            self.__offsets[len(values)] = offsets
+        return self.__lut.take(offsets + values).tobytes()
+
+    """
+        derives the white channel of a frame as shown by the strip, before gamma, white balance and brightness
+
+        :param    frame: bytes in order of transmission
+        :type     frame: bytes-like
+        :returns: frame with derived white channel, the frame itself if the white channel is not derived
+    """
+    def extractWhite(self, frame):
+        if self.__white is None:
+            return frame
+        return self.__extractWhite(np.frombuffer(frame, dtype = np.uint8)).tobytes()
+
+    """
+        moves the white share of the RGB colors of all pixels to the white channel
+
+        :param    values: bytes of an RGBW frame in order of transmission
+        :type     values: numpy array
+        :returns: bytes of the frame with derived white channel
+    """
+    def __extractWhite(self, values):
+        pixels = values.reshape(-1, 4).astype(np.float32)
+        rgb = list(self.__order[:3])
+        colors = pixels[:, rgb]
+
+        # largest share of the white LED color contained in each pixel
+        white = np.min(colors / self.__white, axis = 1)
+        pixels[:, rgb] = colors - white[:, None] * self.__white
+        pixels[:, self.__order[3]] += white
+        return np.rint(np.clip(pixels, 0.0, 255.0)).astype(np.uint8).ravel()
+
+    """
+        approximates the color of a white light source of a color temperature by the curve fit of Tanner Helland
+
+        :param    temperature: color temperature in Kelvin
+        :type     temperature: float
+        :returns: RGB factors between 0.0 and 1.0, the strongest channel is 1.0
+    """
+    @classmethod
+    def toRGB(cls, temperature):
+        t = min(max(float(temperature), cls.MIN_TEMPERATURE), cls.MAX_TEMPERATURE) / 100.0
+
+        if t <= 66:
+            r = 255.0
+            g = 99.4708025861 * np.log(t) - 161.1195681661
+            b = 0.0 if t <= 19 else 138.5177312231 * np.log(t - 10) - 305.0447927307
+        else:
+            r = 329.698727446 * (t - 60) ** -0.1332047592
+            g = 288.1221695283 * (t - 60) ** -0.0755148492
+            b = 255.0
+
+        color = np.clip([r, g, b], 0.0, 255.0)
+        return color / color.max()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Serializes all access to the led strips. Scheduled forecast updates, fading threads and requests of the configuration
+service submit their strip mutations as commands to a single render thread instead of changing the strips directly.
+
+The render thread works in ticks: it takes all commands queued at that point in time, executes them in order and
+transfers the frame to the strips by a single show if any of them changed the frame. Commands submitted together,
+e.g. a rendered forecast followed by a brightness change, therefore never interleave and cause only one transfer.
+Commands submitted by a running command are executed immediately within the same tick.
+
+Usage:
+    actor = RenderActor(flush = strips.show)
+    actor.start()
+    actor.call(strips.setPixel, 0, color)
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import logging
+import queue
+import threading
+
+from concurrent.futures import Future
+from catatumbo.core.util.instrumentation import getCounter, startTimer, stopTimer
+
+
+_log = logging.getLogger(__name__)
+
+_commands = getCounter('render.commands', 'strip commands executed by the render actor')
+_ticks    = getCounter('render.ticks', 'ticks of the render actor, labeled by whether the frame was transferred')
+
+
+def _unchanged():
+    pass
+
+
+class RenderActor(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    # marks the end of the command queue, see stop
+    __STOP = object()
+    # seconds to wait for the render thread to execute the commands queued before the stop
+    STOP_TIMEOUT = 5
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __queue = None
+    __thread = None
+    # transfers the frame to the strips
+    __flush = None
+    # set by a command of the current tick that changed the frame
+    __dirty = False
+    # set by stop, commands submitted afterwards are executed by the submitting thread
+    __stopped = False
+    # orders queueing commands and the stop, so no command is queued behind the end of the queue
+    __lock = None
+
+    """
+        constructor
+
+        :param    flush: transfers the frame to the strips, called once per tick if the frame was changed
+        :type     flush: callable
+        :param    name: name of the render thread
+        :type     name: str
+    """
+    def __init__(self, flush, name = 'render'):
+        self.__queue = queue.Queue()
+        self.__flush = flush
+        self.__dirty = False
+        self.__stopped = False
+        self.__lock = threading.Lock()
+        self.__thread = threading.Thread(target = self.__run, name = name, daemon = True)
+
+    def start(self):
+        self.__thread.start()
+
+    """
+        stops the render thread after all commands submitted so far have been executed
+
+        :param    timeout: seconds to wait for the render thread
+        :type     timeout: float
+    """
+    def stop(self, timeout = STOP_TIMEOUT):
+        with self.__lock:
+            if self.__stopped:
+                return
+            self.__stopped = True
+            if not self.__thread.is_alive():
+                return
+            self.__queue.put(type(self).__STOP)
+
+        if not self.isRenderThread():
+            self.__thread.join(timeout)
+
+    """
+        :returns: True if called by a command running on the render thread
+    """
+    def isRenderThread(self):
+        return threading.current_thread() is self.__thread
+
+    """
+        submits a command to the render thread
+        if called by a running command, the command is executed immediately as part of the same tick
+
+        :param    command: function changing the strips
+        :type     command: callable
+        :param    args: arguments of the command
+        :type     args: tuple
+        :param    show: the command changes the frame, so it has to be transferred at the end of the tick
+        :type     show: boolean
+        :returns: Future resolved with the result of the command after the tick has been transferred
+    """
+    def submit(self, command, args = (), show = True):
+        future = Future()
+
+        if self.isRenderThread():
+            # nested command, transferred with the current tick
+            self.__resolve(future, *self.__execute(future, command, args, show))
+        elif not self.__enqueue((future, command, args, show)):
+            # no render thread running, e.g. after stop
+            succeeded, result = self.__execute(future, command, args, show)
+            self.__transfer()
+            self.__resolve(future, succeeded, result)
+        return future
+
+    """
+        submits a command without waiting for or tracking its result, e.g. for changes of single pixels
+        commands failing are logged, see submit for the parameters
+    """
+    def post(self, command, args = (), show = True):
+        if self.isRenderThread() or not self.__enqueue((None, command, args, show)):
+            self.submit(command, args, show)
+
+    """
+        submits a command and waits for its result, see submit
+    """
+    def call(self, command, *args, show = True):
+        return self.submit(command, args, show).result()
+
+    """
+        transfers the frame with the next tick and waits for it
+    """
+    def flush(self):
+        self.call(_unchanged)
+
+    """
+        queues a command for the render thread
+
+        :returns: False if the actor was stopped or not started, the command has to be executed by the caller
+    """
+    def __enqueue(self, item):
+        with self.__lock:
+            if self.__stopped or not self.__thread.is_alive():
+                stopped = self.__stopped
+            else:
+                self.__queue.put(item)
+                return True
+
+        if stopped and self.__thread.is_alive():
+            # the commands queued before the stop are executed first
+            self.__thread.join(type(self).STOP_TIMEOUT)
+        return False
+
+    ########################################
+    #            RENDER THREAD             #
+    ########################################
+    def __run(self):
+        stop = False
+        while True:
+            # block till the next command, then take all commands queued meanwhile
+            batch = [self.__queue.get()]
+            try:
+                while True:
+                    batch.append(self.__queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            start = startTimer()
+            done = []
+            for item in batch:
+                if item is type(self).__STOP:
+                    stop = True
+                    continue
+                future, command, args, show = item
+                if future is None:
+                    self.__post(command, args, show)
+                else:
+                    done.append((future,) + self.__execute(future, command, args, show))
+
+            self.__transfer()
+            stopTimer('render.tick', start)
+
+            # results are published after the transfer, so callers see the frame on the strips
+            for future, succeeded, result in done:
+                self.__resolve(future, succeeded, result)
+
+            # commands queued behind the stop are executed before the thread ends
+            if stop and self.__queue.empty():
+                return
+
+    """
+        runs a command, exceptions are passed to the submitter
+
+        :returns: tuple (<command succeeded>, <result>) to be resolved after the transfer, see __resolve
+    """
+    def __execute(self, future, command, args, show):
+        if not future.set_running_or_notify_cancel():
+            return (False, None)
+
+        try:
+            result = command(*args)
+        except Exception as e:
+            future.set_exception(e)
+            return (False, None)
+
+        _commands.increment()
+        if show:
+            self.__dirty = True
+        return (True, result)
+
+    def __post(self, command, args, show):
+        try:
+            command(*args)
+        except Exception:
+            _log.exception("Render command failed")
+            return
+
+        _commands.increment()
+        if show:
+            self.__dirty = True
+
+    @staticmethod
+    def __resolve(future, succeeded, result):
+        if succeeded:
+            future.set_result(result)
+
+    def __transfer(self):
+        transfer = self.__dirty
+        self.__dirty = False
+
+        if transfer:
+            try:
+                self.__flush()
+            except Exception:
+                _log.exception("Transfer of the frame failed")
+        _ticks.increment({"transferred" : transfer})
@@ -0,0 +1,205 @@
+'''
+Typed schema for changing several configuration values at once, e.g. by the batch configuration service.
+A batch is validated as a whole against the schema - if any value is invalid, nothing is changed.
+Valid batches are applied to the configuration in memory and persisted with a single write.
+The result names the parts of the active controller that need to be reloaded.
+
+Example batch:
+    {"autoBrightnessMax" : 0.6, "winterMode" : true, "latitude" : 52.52, "longitude" : 13.40, "forecastMode" : "5"}
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import math
+
+from catatumbo.core.util.configurations import Configurations
+
+
+# parts of the controller to be reloaded after a change
+RELOAD_BRIGHTNESS   = 'brightness'
+RELOAD_LOCATION     = 'location'
+RELOAD_FORECAST     = 'forecast'
+
+
+class ConfigurationValidationError(ValueError):
+    """
+        raised if a batch does not match the schema
+
+        :param    errors: error message by key of the batch
+        :type     errors: dict
+    """
+    def __init__(self, errors):
+        super().__init__('Invalid configuration: {0}'.format(errors))
+        self.errors = errors
+
+
+class ConfigurationField(object):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    section = None
+    attribute = None
+    valueType = None
+    minimum = None
+    maximum = None
+    choices = None
+    nullable = False
+    reload = None
+
+    """
+        constructor
+
+        :param    section: section in config file
+        :type     section: str
+        :param    attribute: attribute in config file
+        :type     attribute: str
+        :param    valueType: expected type - bool, int, float or str
+        :type     valueType: type
+        :param    reload: part of the controller to be reloaded, see RELOAD_BRIGHTNESS, RELOAD_LOCATION, RELOAD_FORECAST
+        :type     reload: str
+        :param    nullable: None removes the value from the configuration
+        :type     nullable: boolean
+    """
+    def __init__(self, section, attribute, valueType, reload, minimum = None, maximum = None, choices = None, nullable = False):
+        self.section = section
+        self.attribute = attribute
+        self.valueType = valueType
+        self.reload = reload
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.nullable = nullable
+
+    """
+        validates and normalizes a value
+
+        :returns: value as defined by valueType
+        :raises:  ValueError if the value is not valid
+    """
+    def validate(self, value):
+        if value is None:
+            if not self.nullable:
+                raise ValueError('value required')
+            return None
+
+        # booleans are ints in python, but not in the schema
+        if isinstance(value, bool) != (self.valueType is bool):
+            raise ValueError('{0} expected'.format(self.valueType.__name__))
+        if self.valueType is float and isinstance(value, int):
+            value = float(value)
+        if not isinstance(value, self.valueType):
+            raise ValueError('{0} expected'.format(self.valueType.__name__))
+        # NaN and infinity pass any range check
+        if self.valueType is float and not math.isfinite(value):
+            raise ValueError('finite number expected')
+
+        if self.minimum is not None and value < self.minimum:
+            raise ValueError('minimum is {0}'.format(self.minimum))
+        if self.maximum is not None and value > self.maximum:
+            raise ValueError('maximum is {0}'.format(self.maximum))
+        if self.choices is not None and value not in self.choices:
+            raise ValueError('one of {0} expected'.format(', '.join(self.choices)))
+        return value
+
+    """
+        returns the value as stored in the config file
+    """
+    def format(self, value):
+        if value is None:
+            return None
+        return str(value)
+
+
+SCHEMA = {
+    'autoBrightnessMin' : ConfigurationField('GeneralConfiguration', 'AutoBrightnessMIN', float, RELOAD_BRIGHTNESS, 0.0, 1.0, nullable = True),
+    'autoBrightnessMax' : ConfigurationField('GeneralConfiguration', 'AutoBrightnessMAX', float, RELOAD_BRIGHTNESS, 0.0, 1.0),
+    'winterMode'        : ConfigurationField('Forecast-ApplicationData', 'WinterMode', bool, RELOAD_FORECAST),
+    'forecastMode'      : ConfigurationField('Forecast-ApplicationData', 'ForecastMode', str, RELOAD_FORECAST,
+                                             choices = ('1', '2', '3', '4', '5', '6', '7', '8')),
+    'colorMap'          : ConfigurationField('Forecast-ApplicationData', 'ColorMap', str, RELOAD_FORECAST,
+                                             choices = ('discrete', 'continuous')),
+    'latitude'          : ConfigurationField('Forecast-ApplicationData', 'Latitude', float, RELOAD_LOCATION, -90.0, 90.0, nullable = True),
+    'longitude'         : ConfigurationField('Forecast-ApplicationData', 'Longitude', float, RELOAD_LOCATION, -180.0, 180.0, nullable = True),
+    'cityID'            : ConfigurationField('Forecast-ApplicationData', 'CityID', int, RELOAD_LOCATION, 0, nullable = True),
+    'cityName'          : ConfigurationField('Forecast-ApplicationData', 'CityName', str, RELOAD_LOCATION, nullable = True),
+    'country'           : ConfigurationField('Forecast-ApplicationData', 'Country', str, RELOAD_LOCATION, nullable = True),
+}
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+"""
+    validates a batch of configuration changes against SCHEMA
+
+    :param    batch: new values by key of SCHEMA
+    :type     batch: dict
+    :returns: validated values by key
+    :raises:  ConfigurationValidationError listing all invalid or unknown keys
+"""
+def validateBatch(batch):
+    if not isinstance(batch, dict):
+        raise ConfigurationValidationError({'' : 'object expected'})
+
+    values = {}
+    errors = {}
+    for key, value in batch.items():
+        field = SCHEMA.get(key)
+        if field is None:
+            errors[key] = 'unknown key'
+            continue
+        try:
+            values[key] = field.validate(value)
+        except ValueError as e:
+            errors[key] = str(e)
+
+    if len(errors) > 0:
+        raise ConfigurationValidationError(errors)
+    return values
+
+"""
+    validates and applies a batch of configuration changes with a single write of the configuration file
+    unchanged values are ignored
+
+    :param    batch: new values by key of SCHEMA
+    :type     batch: dict
+    :returns: set of controller parts to be reloaded, see RELOAD_BRIGHTNESS, RELOAD_LOCATION, RELOAD_FORECAST
+    :raises:  ConfigurationValidationError listing all invalid or unknown keys
+"""
+def applyBatch(batch):
+    values = validateBatch(batch)
+    config = Configurations()
+
+    reload = set()
+    for key, value in values.items():
+        field = SCHEMA[key]
+        stored = field.format(value)
+        if config.getConfigProperty(field.section, field.attribute) == stored:
+            continue
+        config.setConfigProperty(field.section, field.attribute, stored)
+        reload.add(field.reload)
+
+    if len(reload) > 0:
+        config.writeConfiguration()
+    return reload
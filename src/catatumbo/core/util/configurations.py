@@ -30,9 +30,19 @@ limitations under the License.
 @deffield    updated: Updated
 '''
 import configparser
+import logging
 
 from configparser import NoOptionError, NoSectionError
-from os import path
+from os import path, stat
+from catatumbo.core.util.instrumentation import getCounter
+
+
+# metrics of the configuration file access
+_reads  = getCounter('config.reads', 'configuration file reads')
+_writes = getCounter('config.writes', 'configuration file writes')
+_cache  = getCounter('cache.requests', 'cache requests by cache and result')
+
+_log = logging.getLogger(__name__)
 
 class Configurations(object):
     
@@ -54,6 +64,9 @@ class Configurations(object):
     """    
     __instance = None
     __config_parser = None
+    # file and (mtime, size) the current configuration was read from
+    __loaded_file = None
+    __loaded_stamp = None
     
     """
         static class constructor for singleton
@@ -70,15 +83,13 @@ class Configurations(object):
         - default configuration file which provides the template and comments for the configuration; for usage of services additional configuration is required (e.g. OWM API key)
         - runtime configuration file is created the first time the user changes a configuration and is based on the values defined in the default configuration file
         If runtime configuration file exists, this will be the leading one irrespective of the values defined in default configuration file
+        The configuration file is only parsed again if it was changed since it was read last
         TODO define proper default configuration file
         
         :param    config_file: the location of the properties file, relative to runtime execution path
         :type     config_file: str
     """    
     def __init__(self, config_file = None):
-        # read config for led strips
-        self.__config_parser = configparser.ConfigParser() 
-        
         # check if custom configuration file defined
         if config_file is None:
             # check if runtime configuration file was already created
@@ -88,9 +99,23 @@ class Configurations(object):
             else:
                 config_file = type(self).DEFAULT_CONFIG
         
-        self.__config_parser.read(config_file)    
+        # singleton constructor is called on each access - skip reading an unchanged file
+        stamp = self.__stamp(config_file)
+        if self.__config_parser is not None and config_file == self.__loaded_file and stamp == self.__loaded_stamp:
+            _cache.increment({"cache" : "config", "result" : "hit"})
+            return
+        _cache.increment({"cache" : "config", "result" : "miss"})
+        
+        # read config for led strips
+        parser = configparser.ConfigParser() 
+        parser.read(config_file)    
+        _reads.increment()
         # configparser does not offer any flush method, so no destruction required?
         
+        self.__config_parser = parser
+        self.__loaded_file = config_file
+        self.__loaded_stamp = stamp
+        
     
     ########################################
     #      GETTER/SETTER Methods           #
@@ -104,7 +129,27 @@ class Configurations(object):
     
     def getOWMKey(self):
         return self.getConfigProperty('Forecast-OWMData', 'APIKey')
-    
+
+    #
+    #    forecast provider configuration
+    #
+    def getForecastProvider(self):
+        return self.getConfigProperty('Forecast-ProviderData', 'Provider')
+
+    def getForecastReplayDir(self):
+        return self.getConfigProperty('Forecast-ProviderData', 'ReplayDir')
+
+    def getForecastReplayLatency(self):
+        latency = self.getConfigProperty('Forecast-ProviderData', 'ReplayLatency')
+        if latency is not None:
+            latency = float(latency)
+        else:
+            latency = 0
+        return latency
+
+    def getForecastRecordDir(self):
+        return self.getConfigProperty('Forecast-ProviderData', 'RecordDir')
+
     
     #
     #    technical LED strip configuration
@@ -119,10 +164,15 @@ class Configurations(object):
             bmax = 0.7
         return bmax
 
-    def setAutoBrightnessMax(self, brightness):
+    """
+        :param    persist: if False, the change is kept in memory till the next writeConfiguration call
+        :type     persist: boolean
+    """
+    def setAutoBrightnessMax(self, brightness, persist = True):
         if float(brightness) >= 0 and float(brightness) <= 1.0:
             self.setConfigProperty("GeneralConfiguration", "AutoBrightnessMAX", str(brightness))
-        self.writeConfiguration()
+        if persist:
+            self.writeConfiguration()
     
     def getAutoBrightnessMin(self):
         bmin = self.getConfigProperty("GeneralConfiguration", "AutoBrightnessMIN")
@@ -130,14 +180,131 @@ class Configurations(object):
             bmin = float(bmin)
         return bmin
     
-    def setAutoBrightnessMin(self, brightness):
+    def setAutoBrightnessMin(self, brightness, persist = True):
         if brightness is None:
             # minBrightness may be None in case sunset/sunrise fading mode is turned on
             # ensure to delete AutoBrightnessMIN from config
             self.setConfigProperty("GeneralConfiguration", "AutoBrightnessMIN", None)
         elif (float(brightness) >= 0 and float(brightness) <= 1.0):
             self.setConfigProperty("GeneralConfiguration", "AutoBrightnessMIN", str(brightness))
-        self.writeConfiguration()
+        if persist:
+            self.writeConfiguration()
+    
+    def getBackend(self):
+        return self.getConfigProperty("GeneralConfiguration", "Backend")
+    
+    def getFrameDir(self):
+        return self.getConfigProperty("GeneralConfiguration", "FrameDir")
+    
+    """
+        returns the file storing the last shown frame, defaults to LASTFRAME.bin next to the runtime configuration
+    """
+    def getLastFrameFile(self):
+        lastFrame = self.getConfigProperty("GeneralConfiguration", "LastFrameFile")
+        if lastFrame is None:
+            lastFrame = path.join(path.dirname(type(self).RUNTIME_CONFIG), 'LASTFRAME.bin')
+        return lastFrame
+    
+    """
+        returns the frames per second of animations, e.g. pulsing storm indication, default 30
+    """
+    def getAnimationFPS(self):
+        fps = self.getConfigProperty("GeneralConfiguration", "AnimationFPS")
+        if fps is not None:
+            fps = int(fps)
+        else:
+            fps = 30
+        return fps
+    
+    """
+        returns the seconds of the crossfade between successive frames of a controller, e.g. forecasts, 0 disables it
+    """
+    def getTransitionDuration(self):
+        duration = self.getConfigProperty("GeneralConfiguration", "TransitionDuration")
+        if duration is not None:
+            duration = float(duration)
+        else:
+            duration = 1.5
+        return duration
+    
+    """
+        returns the exponent of the gamma correction of the colors transmitted to the strips, default 1.0 (no correction)
+    """
+    def getGamma(self):
+        gamma = self.getConfigProperty("GeneralConfiguration", "Gamma")
+        if gamma is not None:
+            gamma = float(gamma)
+        else:
+            gamma = 1.0
+        return gamma
+    
+    """
+        returns the white balance of a strip as factor per channel (r, g, b) or (r, g, b, w), None if not defined
+        
+        :param    section: section of the strip, e.g. Strip1
+        :type     section: str
+    """
+    def getWhiteBalance(self, section):
+        whitebalance = self.getConfigProperty(section, "WhiteBalance")
+        if whitebalance is not None:
+            whitebalance = tuple(float(factor) for factor in whitebalance.split(','))
+        return whitebalance
+    
+    """
+        returns the color temperature of the white LEDs of a strip in Kelvin, None if the white channel is not derived
+        from the RGB colors
+        
+        :param    section: section of the strip, e.g. Strip1
+        :type     section: str
+    """
+    def getWhiteTemperature(self, section):
+        temperature = self.getConfigProperty(section, "WhiteTemperature")
+        if temperature is not None:
+            temperature = float(temperature)
+        return temperature
+    
+    def getLogLevel(self):
+        level = self.getConfigProperty("GeneralConfiguration", "LogLevel")
+        if level is None:
+            level = 'INFO'
+        return level
+    
+    def isInstrumentationEnabled(self):
+        ie = self.getConfigProperty("GeneralConfiguration", "Instrumentation")
+        return ie is not None and ie.lower() == 'true'
+    
+    #
+    #    configuration service
+    #
+    def getServerMode(self):
+        mode = self.getConfigProperty("ServerConfiguration", "Mode")
+        if mode is None:
+            mode = 'production'
+        return mode
+    
+    def getServerThreads(self):
+        threads = self.getConfigProperty("ServerConfiguration", "Threads")
+        if threads is not None:
+            threads = int(threads)
+        else:
+            threads = 4
+        return threads
+    
+    def getServerConnectionLimit(self):
+        limit = self.getConfigProperty("ServerConfiguration", "ConnectionLimit")
+        if limit is not None:
+            limit = int(limit)
+        else:
+            limit = 32
+        return limit
+    
+    def getServerTimeout(self):
+        timeout = self.getConfigProperty("ServerConfiguration", "Timeout")
+        if timeout is not None:
+            timeout = int(timeout)
+        else:
+            timeout = 30
+        return timeout
     
     #
     #    location information
@@ -171,10 +338,18 @@ class Configurations(object):
     #
     
     def isWinterMode(self):
-        wc = bool(self.getConfigProperty('Forecast-ApplicationData', 'WinterMode'))
-        if wc is None:            
-            wc = False
-        return wc
+        wc = self.getConfigProperty('Forecast-ApplicationData', 'WinterMode')
+        # bool() of any non-empty string is True, so 'False' needs to be compared explicitly
+        return wc is not None and wc.lower() == 'true'
+    
+    def getForecastMode(self):
+        return self.getConfigProperty('Forecast-ApplicationData', 'ForecastMode')
+    
+    def getColorMap(self):
+        cm = self.getConfigProperty('Forecast-ApplicationData', 'ColorMap')
+        if cm is None:
+            cm = 'discrete'
+        return cm.lower()
     
     ########################################
     #         UTILITY Methods              #
@@ -215,7 +390,7 @@ class Configurations(object):
             else:
                 self.__config_parser.remove_option(section, attribute)
         except (NoOptionError, NoSectionError):
-            print('Error in setting configuration')
+            _log.warning("Error in setting configuration %s/%s", section, attribute)
 
     def hasSection(self, section):
         return self.__config_parser.has_section(section)
@@ -228,3 +403,19 @@ class Configurations(object):
     def writeConfiguration(self):
         with open(type(self).RUNTIME_CONFIG, 'w') as configfile:
             self.__config_parser.write(configfile, True)
+        _writes.increment()
+        
+        # the written file reflects the current configuration, no need to read it again
+        self.__loaded_file = type(self).RUNTIME_CONFIG
+        self.__loaded_stamp = self.__stamp(type(self).RUNTIME_CONFIG)
+    
+    """
+        returns modification time and size of a configuration file or None if it does not exist
+    """
+    @staticmethod
+    def __stamp(config_file):
+        try:
+            st = stat(config_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
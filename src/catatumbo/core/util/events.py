@@ -0,0 +1,257 @@
+'''
+Publishes changes of the live state of Catatumbo - brightness, active mode and displayed weather condition - to
+subscribers, e.g. the server-sent event stream of the configuration service.
+
+Each publication is reduced to a delta against the last published state; for dictionaries, e.g. the sampleboard,
+only the changed entries are part of the delta. Fan-out is bounded: the number of subscribers is limited and each
+subscriber owns a bounded queue. A subscriber that cannot keep up, e.g. during fast brightness fades, loses its
+queued deltas and receives the full state with its next event instead.
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import queue
+
+from threading import Lock
+from catatumbo.core.util.instrumentation import getCounter
+
+
+# state keys published by Catatumbo
+BRIGHTNESS  = 'brightness'
+MODE        = 'mode'
+CONDITIONS  = 'conditions'
+
+_published = getCounter('events.published', 'state changes published to subscribers')
+_resyncs   = getCounter('events.resyncs', 'subscribers falling behind and receiving the full state')
+
+# marker for an unchanged value
+_UNCHANGED = object()
+
+
+class SubscriberLimitError(RuntimeError):
+    """
+        raised if the maximum number of subscribers is reached
+    """
+    pass
+
+
+class Subscription(object):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __broker = None
+    __queue = None
+    # set if queued events were dropped, next event will be the full state
+    __resync = False
+    # set if the broker was closed, e.g. on shutdown
+    __closed = False
+
+    def __init__(self, broker, size):
+        self.__broker = broker
+        self.__queue = queue.Queue(size)
+        self.__resync = False
+        self.__closed = False
+
+    """
+        called by the broker with the publishing lock held
+    """
+    def _offer(self, event):
+        try:
+            self.__queue.put_nowait(event)
+        except queue.Full:
+            # drop the backlog, the full state supersedes all queued deltas
+            self.__resync = True
+            _resyncs.increment()
+            with self.__queue.mutex:
+                self.__queue.queue.clear()
+
+    """
+        marks the subscription closed and wakes up a waiting subscriber
+    """
+    def _close(self):
+        self.__closed = True
+        try:
+            self.__queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def isClosed(self):
+        return self.__closed
+
+    """
+        waits for the next event
+
+        :param    timeout: seconds to wait for an event
+        :type     timeout: float
+        :returns: tuple (<event id>, <delta or full state>, <true if full state>) or None if no event occurred within timeout
+    """
+    def get(self, timeout = None):
+        try:
+            event = self.__queue.get(timeout = timeout)
+        except queue.Empty:
+            event = None
+
+        if self.__closed:
+            return None
+
+        if self.__resync:
+            self.__resync = False
+            eventId, state = self.__broker.getState()
+            return (eventId, state, True)
+
+        if event is None:
+            return None
+        return (event[0], event[1], False)
+
+
+class StateBroker(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    MAX_SUBSCRIBERS = 8
+    # events queued per subscriber
+    QUEUE_SIZE      = 64
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    __lock = None
+    __state = None
+    __eventId = 0
+    __subscribers = None
+    __maxSubscribers = MAX_SUBSCRIBERS
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__state = {}
+        self.__eventId = 0
+        self.__subscribers = []
+        self.__maxSubscribers = type(self).MAX_SUBSCRIBERS
+
+    """
+        limits the number of concurrent subscribers, e.g. to the number of server threads available for streaming
+    """
+    def setMaxSubscribers(self, maxSubscribers):
+        self.__maxSubscribers = max(1, int(maxSubscribers))
+
+    """
+        publishes changed state values, unchanged values are ignored
+
+        :param    changes: state values by key, see BRIGHTNESS, MODE, CONDITIONS
+        :type     changes: dict
+    """
+    def publish(self, **changes):
+        with self.__lock:
+            delta = {}
+            for key, value in changes.items():
+                d = _delta(self.__state.get(key, _UNCHANGED), value)
+                if d is not _UNCHANGED:
+                    delta[key] = d
+                    self.__state[key] = value
+
+            if len(delta) == 0:
+                return
+
+            self.__eventId += 1
+            event = (self.__eventId, delta)
+            for subscriber in self.__subscribers:
+                subscriber._offer(event)
+        _published.increment()
+
+    """
+        returns the current state
+
+        :returns: tuple (<id of last event>, <state by key>)
+    """
+    def getState(self):
+        with self.__lock:
+            return (self.__eventId, dict(self.__state))
+
+    """
+        :raises:  SubscriberLimitError if the maximum number of subscribers is reached
+    """
+    def subscribe(self):
+        with self.__lock:
+            if len(self.__subscribers) >= self.__maxSubscribers:
+                raise SubscriberLimitError('Maximum number of subscribers reached')
+            subscription = Subscription(self, type(self).QUEUE_SIZE)
+            self.__subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.__lock:
+            if subscription in self.__subscribers:
+                self.__subscribers.remove(subscription)
+
+    def countSubscribers(self):
+        return len(self.__subscribers)
+
+    """
+        closes all subscriptions, e.g. on shutdown to end running event streams
+    """
+    def close(self):
+        with self.__lock:
+            subscribers = self.__subscribers
+            self.__subscribers = []
+        for subscription in subscribers:
+            subscription._close()
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+def _delta(old, new):
+    if old is _UNCHANGED:
+        return new
+    if isinstance(old, dict) and isinstance(new, dict):
+        delta = {k : v for k, v in new.items() if k not in old or old[k] != v}
+        # removed entries are indicated by None
+        delta.update({k : None for k in old if k not in new})
+        return delta if len(delta) > 0 else _UNCHANGED
+    return _UNCHANGED if old == new else new
+
+# broker shared by all publishers and subscribers of the process
+_broker = StateBroker()
+
+def publish(**changes):
+    _broker.publish(**changes)
+
+def getState():
+    return _broker.getState()
+
+def subscribe():
+    return _broker.subscribe()
+
+def unsubscribe(subscription):
+    _broker.unsubscribe(subscription)
+
+def countSubscribers():
+    return _broker.countSubscribers()
+
+def setMaxSubscribers(maxSubscribers):
+    _broker.setMaxSubscribers(maxSubscribers)
+
+def close():
+    _broker.close()
@@ -0,0 +1,294 @@
+'''
+Lightweight instrumentation of the hot paths - fetching and classifying forecasts, rendering, transferring frames
+to the strips, fading brightness and the scheduler tick. Durations are collected in in-process histograms that provide
+count, sum, max and the p50/p95/p99 percentiles over a sliding window of the most recent samples.
+Additionally, counters track events like frames pushed per strip or forecast requests.
+
+Instrumentation can be switched on and off at runtime. If switched off, an instrumented method costs a single
+check of a module flag, so the instrumentation points can remain in the production code.
+
+Usage:
+    @timed('render.show')
+    def show(self):
+        ...
+
+    start = startTimer()
+    ...
+    stopTimer('forecast.fetch', start)
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import functools
+
+from collections import deque
+from threading import Lock
+from time import perf_counter
+
+
+# instrumentation is switched off by default, see setEnabled
+_enabled = False
+
+# all histograms and counters by name
+_histograms = {}
+_counters = {}
+_registryLock = Lock()
+
+
+class Histogram(object):
+
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    # number of most recent samples the percentiles are calculated on
+    WINDOW_SIZE = 1024
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    name = None
+    description = None
+    count = 0
+    sum = 0.0
+    max = 0.0
+
+    __samples = None
+    __lock = None
+
+    def __init__(self, name, description = None, window = WINDOW_SIZE):
+        self.name = name
+        self.description = description
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.__samples = deque(maxlen = window)
+        self.__lock = Lock()
+
+    """
+        records a sample
+
+        :param    value: duration in seconds
+        :type     value: float
+    """
+    def record(self, value):
+        with self.__lock:
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+            self.__samples.append(value)
+
+    """
+        returns the current state of the histogram
+        percentiles are calculated on the sliding window of the most recent samples, count, sum and max since start
+
+        :returns: dictionary consisting of {"count", "sum", "max", "p50", "p95", "p99"}
+    """
+    def snapshot(self):
+        with self.__lock:
+            samples = sorted(self.__samples)
+            ret = {"count"  : self.count,
+                   "sum"    : self.sum,
+                   "max"    : self.max}
+
+        ret.update({"p50" : _percentile(samples, 0.50),
+                    "p95" : _percentile(samples, 0.95),
+                    "p99" : _percentile(samples, 0.99)})
+        return ret
+
+    def reset(self):
+        with self.__lock:
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+            self.__samples.clear()
+
+
+class Counter(object):
+
+    """
+    OBJECT ATTRIBUTES
+    """
+    name = None
+    description = None
+
+    # counter values by label set, e.g. {(("strip", "0"),) : 42}
+    __values = None
+    __lock = None
+
+    def __init__(self, name, description = None):
+        self.name = name
+        self.description = description
+        self.__values = {}
+        self.__lock = Lock()
+
+    """
+        increments the counter - counters are always active, independent of the instrumentation state
+
+        :param    labels: optional labels to distinguish values, e.g. {"strip" : 0}
+        :type     labels: dict
+        :param    amount: value to be added
+        :type     amount: int
+    """
+    def increment(self, labels = None, amount = 1):
+        key = () if labels is None else tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self.__lock:
+            self.__values[key] = self.__values.get(key, 0) + amount
+
+    """
+        returns the counter values by label set
+
+        :returns: dictionary consisting of {((<label>, <value>), ...) : <count>, ...}
+    """
+    def snapshot(self):
+        with self.__lock:
+            return dict(self.__values)
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+def _percentile(samples, quantile):
+    if len(samples) == 0:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * quantile))]
+
+"""
+    switches instrumentation on or off at runtime
+
+    :param    enabled: instrumentation state
+    :type     enabled: boolean
+"""
+def setEnabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+def isEnabled():
+    return _enabled
+
+"""
+    returns the histogram for a name, the histogram is created on first access
+
+    :param    name: name of the histogram, e.g. 'render.show'
+    :type     name: str
+    :param    description: description of the measured value
+    :type     description: str
+    :returns: Histogram instance
+"""
+def getHistogram(name, description = None):
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _registryLock:
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = Histogram(name, description)
+                _histograms[name] = histogram
+    return histogram
+
+"""
+    returns the state of all histograms
+
+    :returns: dictionary consisting of {<name> : {"count", "sum", "max", "p50", "p95", "p99"}, ...}
+"""
+def getHistograms():
+    return {name : histogram.snapshot() for name, histogram in list(_histograms.items())}
+
+"""
+    returns the counter for a name, the counter is created on first access
+
+    :param    name: name of the counter, e.g. 'render.frames'
+    :type     name: str
+    :param    description: description of the counted value
+    :type     description: str
+    :returns: Counter instance
+"""
+def getCounter(name, description = None):
+    counter = _counters.get(name)
+    if counter is None:
+        with _registryLock:
+            counter = _counters.get(name)
+            if counter is None:
+                counter = Counter(name, description)
+                _counters[name] = counter
+    return counter
+
+def getCounters():
+    return list(_counters.values())
+
+"""
+    returns all histogram instances
+"""
+def getHistogramInstances():
+    return list(_histograms.values())
+
+def resetHistograms():
+    for histogram in list(_histograms.values()):
+        histogram.reset()
+
+"""
+    decorator measuring the duration of each call of a function
+
+    :param    name: name of the histogram
+    :type     name: str
+    :param    description: description of the measured value
+    :type     description: str
+"""
+def timed(name, description = None):
+    def decorator(func):
+        histogram = getHistogram(name, description)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(perf_counter() - start)
+
+        return wrapper
+    return decorator
+
+"""
+    starts a measurement within a function
+
+    :returns: start time or None if instrumentation is switched off
+"""
+def startTimer():
+    if not _enabled:
+        return None
+    return perf_counter()
+
+"""
+    stops a measurement started by startTimer and records its duration
+
+    :param    name: name of the histogram
+    :type     name: str
+    :param    start: return value of startTimer
+    :type     start: float
+"""
+def stopTimer(name, start):
+    if start is not None:
+        getHistogram(name).record(perf_counter() - start)
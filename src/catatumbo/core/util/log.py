@@ -0,0 +1,144 @@
+'''
+Leveled, non-blocking logging for the Catatumbo modules.
+
+All modules log via the standard logging module, e.g. _log = logging.getLogger(__name__), with lazy message
+arguments - _log.debug("sampleboard: %s", sampleboard) - so debug strings are only built if debug output is enabled.
+configureLogging attaches a queue based handler to the 'catatumbo' logger: the calling thread only enqueues
+the record, formatting and writing, e.g. to journald via stdout, is done by a separate listener thread.
+If the queue is full, records are dropped and counted instead of blocking the render and update threads.
+
+Records are written in a structured key=value format. Additional fields can be provided via
+_log.info("weather information updated", extra = {"fields" : {"slots" : 40}}).
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import atexit
+import logging
+import queue
+import sys
+
+from logging.handlers import QueueHandler, QueueListener
+from catatumbo.core.util.instrumentation import getCounter
+
+
+# root logger of all Catatumbo modules
+ROOT_LOGGER     = 'catatumbo'
+DEFAULT_LEVEL   = 'INFO'
+# maximum number of records waiting for the listener thread
+QUEUE_SIZE      = 1024
+
+_dropped = getCounter('log.dropped', 'log records dropped due to a full log queue')
+
+_handler = None
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+
+    """
+        formats a record as key=value pairs, e.g.
+        time=2026-10-19T10:00:00 level=INFO logger=catatumbo.starter msg="weather information updated" slots=40
+    """
+    def format(self, record):
+        line = 'time={0} level={1} logger={2} msg={3}'.format(self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+                                                              record.levelname,
+                                                              record.name,
+                                                              _quote(record.getMessage()))
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ''.join(' {0}={1}'.format(key, _quote(value)) for key, value in fields.items())
+        if record.exc_info:
+            line += ' exc=' + _quote(self.formatException(record.exc_info))
+        return line
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+
+    """
+        enqueues the unformatted record - message arguments are merged by the listener thread
+        arguments passed to the logger therefore must not be changed after logging
+    """
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped.increment()
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+def _quote(value):
+    value = str(value)
+    if value == '' or any(c in value for c in ' ="\n'):
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+    return value
+
+"""
+    sets up non-blocking logging for all Catatumbo modules, may be called again to change the level
+
+    :param    level: log level name, e.g. 'DEBUG', 'INFO', 'WARNING'
+    :type     level: str
+    :param    stream: target of the log records, stdout by default
+    :type     stream: file object
+"""
+def configureLogging(level = None, stream = None):
+    global _handler
+    global _listener
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(logging.getLevelName((level or DEFAULT_LEVEL).upper()))
+
+    if _listener is not None:
+        return
+
+    target = logging.StreamHandler(stream or sys.stdout)
+    target.setFormatter(StructuredFormatter())
+
+    records = queue.Queue(QUEUE_SIZE)
+    _handler = _NonBlockingQueueHandler(records)
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+    _listener = QueueListener(records, target)
+    _listener.start()
+    atexit.register(stopLogging)
+
+"""
+    flushes the pending log records and stops the listener thread
+"""
+def stopLogging():
+    global _handler
+    global _listener
+
+    if _listener is not None:
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.removeHandler(_handler)
+        logger.propagate = True
+        _listener.stop()
+        _handler = None
+        _listener = None
@@ -0,0 +1,147 @@
+'''
+Exports the instrumentation histograms, the event counters and the process state in the Prometheus text
+exposition format (version 0.0.4), e.g. for scraping the Catatumbo controller by a Prometheus server.
+
+Histograms are exported as summaries with p50/p95/p99 quantiles, counters as counters and the state of the
+process - live threads, scheduled timers, resident memory and cache hit ratios - as gauges.
+All metric names are prefixed by 'catatumbo_', e.g. histogram 'render.show' is exported as 'catatumbo_render_show_seconds'.
+
+Copyright MBizm [https://github.com/MBizm]
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import os
+import threading
+
+from catatumbo.core.util import instrumentation
+
+
+# content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+PREFIX = 'catatumbo_'
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+def _metricName(name, suffix = ''):
+    return PREFIX + name.replace('.', '_').replace('-', '_') + suffix
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    if len(labels) == 0:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(k, _escape(v)) for k, v in labels) + '}'
+
+def _header(lines, name, metricType, description):
+    if description is not None:
+        lines.append('# HELP {0} {1}'.format(name, _escape(description)))
+    lines.append('# TYPE {0} {1}'.format(name, metricType))
+
+def _value(value):
+    return repr(float(value))
+
+"""
+    returns the resident set size of the current process in bytes
+    falls back to the peak resident set size on systems without /proc
+"""
+def getResidentMemory():
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        pass
+
+    try:
+        import resource
+        # ru_maxrss is reported in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+"""
+    returns the number of scheduled timers, e.g. forecast updates and brightness fading steps
+"""
+def getScheduledTimers():
+    return len([t for t in threading.enumerate() if isinstance(t, threading.Timer)])
+
+"""
+    returns the hit ratio for each cache based on counter 'cache.requests'
+
+    :returns: dictionary consisting of {<cache> : <hit ratio>, ...}
+"""
+def getCacheHitRatios():
+    requests = {}
+    for labels, count in instrumentation.getCounter('cache.requests').snapshot().items():
+        labels = dict(labels)
+        total = requests.setdefault(labels.get("cache"), [0, 0])
+        total[1] += count
+        if labels.get("result") == "hit":
+            total[0] += count
+
+    return {cache : (hits / count if count > 0 else 0.0) for cache, (hits, count) in requests.items()}
+
+"""
+    renders all metrics in the Prometheus text exposition format
+
+    :returns: metrics as text
+"""
+def renderMetrics():
+    lines = []
+
+    # instrumentation histograms as summaries
+    for histogram in sorted(instrumentation.getHistogramInstances(), key = lambda h : h.name):
+        name = _metricName(histogram.name, '_seconds')
+        snapshot = histogram.snapshot()
+        _header(lines, name, 'summary', histogram.description)
+        for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+            lines.append('{0}{{quantile="{1}"}} {2}'.format(name, quantile, _value(snapshot[key])))
+        lines.append('{0}_sum {1}'.format(name, _value(snapshot["sum"])))
+        lines.append('{0}_count {1}'.format(name, snapshot["count"]))
+        _header(lines, name + '_max', 'gauge', None)
+        lines.append('{0}_max {1}'.format(name, _value(snapshot["max"])))
+
+    # event counters
+    for counter in sorted(instrumentation.getCounters(), key = lambda c : c.name):
+        name = _metricName(counter.name, '_total')
+        _header(lines, name, 'counter', counter.description)
+        for labels, count in sorted(counter.snapshot().items()):
+            lines.append('{0}{1} {2}'.format(name, _labels(labels), count))
+
+    # process and cache state
+    name = _metricName('cache.hit_ratio')
+    _header(lines, name, 'gauge', 'ratio of cache hits to cache requests by cache')
+    for cache, ratio in sorted(getCacheHitRatios().items()):
+        lines.append('{0}{1} {2}'.format(name, _labels((("cache", cache),)), _value(ratio)))
+
+    for metric, description, value in (('threads', 'number of live threads', threading.active_count()),
+                                       ('scheduler.timers', 'number of scheduled update and fading timers', getScheduledTimers()),
+                                       ('process.resident_memory_bytes', 'resident memory size of the process in bytes', getResidentMemory()),
+                                       ('instrumentation.enabled', 'state of the timing instrumentation', int(instrumentation.isEnabled()))):
+        name = _metricName(metric)
+        _header(lines, name, 'gauge', description)
+        lines.append('{0} {1}'.format(name, value))
+
+    return '\n'.join(lines) + '\n'
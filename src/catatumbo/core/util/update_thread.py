@@ -24,14 +24,109 @@ limitations under the License.
 @deffield    created: April 2020
 @deffield    updated: Updated
 '''
+import logging
 
-from threading import Timer
-from datetime import datetime
+from math import copysign
+from threading import Lock, Timer
+from catatumbo.core.util.instrumentation import timed
 
 
+_log = logging.getLogger(__name__)
+
 
 activeMainThread = None
+# guards replacing the scheduled regular update, so only one update cycle is running
+_mainThreadLock = Lock()
 activeFadingThread = None
+# main iteration of a fading process, see fadeBrightness
+activeFadingMainThread = None
+
+
+class BrightnessFader(object):
+    
+    """
+    STATIC CLASS ATTRIBUTES
+    """
+    # brightness change per step and seconds between steps
+    STEP_SIZE       = 0.05
+    STEP_INTERVAL   = 0.05
+    
+    """
+    OBJECT ATTRIBUTES
+    """
+    __lock = None
+    # step of the fade in flight, None if no fade is running
+    __timer = None
+    __instance = None
+    __target = None
+    __finalDayTimeAdaption = False
+    
+    def __init__(self):
+        self.__lock = Lock()
+    
+    """
+        fades from the current brightness to stopLevel
+        if a fade is already in flight, it is retargeted and continues from its current brightness
+        so bursts of requests, e.g. by a slider, only apply the latest target
+        
+        :param    controller_instance: the instance of the controller class representing the active mode
+        :type     controller_instance: class instance
+        :param    stopLevel: destination brightness value, value between 1.0 and 0.0
+        :type     stopLevel: float
+        :param    finalDayTimeAdaption: set final brightness dependent on current time and sunset/sunrise fading configuration 
+        :type     finalDayTimeAdaption: boolean
+    """
+    def fadeTo(self, controller_instance, stopLevel, finalDayTimeAdaption = False):
+        with self.__lock:
+            self.__instance = controller_instance
+            self.__target = float(stopLevel)
+            self.__finalDayTimeAdaption = finalDayTimeAdaption
+            
+            if self.__timer is None:
+                self.__timer = Timer(0, self.__step)
+                self.__timer.start()
+    
+    def cancel(self):
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+    
+    def isFading(self):
+        return self.__timer is not None
+    
+    def __step(self):
+        with self.__lock:
+            if self.__timer is None:
+                # cancelled
+                return
+            instance = self.__instance
+            target = self.__target
+        
+        current = instance.getBrightness()
+        if abs(target - current) <= type(self).STEP_SIZE:
+            level = target
+        else:
+            level = round(current + copysign(type(self).STEP_SIZE, target - current), 2)
+        instance.setBrightness(level)
+        
+        with self.__lock:
+            if self.__timer is None:
+                return
+            # target may have been changed in the meantime
+            if level != self.__target:
+                self.__timer = Timer(type(self).STEP_INTERVAL, self.__step)
+                self.__timer.start()
+                return
+            self.__timer = None
+            finalDayTimeAdaption = self.__finalDayTimeAdaption
+        
+        # check if brightness shall be faded based on local sunrise/sunset fading configuration
+        if finalDayTimeAdaption:
+            instance.adaptBrightnessToLocalDaytime()
+
+# fader shared by all brightness requests, see fadeTo
+_fader = BrightnessFader()
 
 
 ########################################
@@ -45,15 +140,23 @@ activeFadingThread = None
     :param    color_mode: selected forecast mode; see MODE_TODAY, MODE_TOMORROW_DAYTIME, MODE_ALL
     :type     color_mode: str
 """      
+@timed('scheduler.tick', 'regular update of the active mode including brightness adaption')
 def queueUpdate(controller_instance, color_mode):
     global activeMainThread
     
+    # update scheduled before the controller was suspended
+    if controller_instance.isSuspended():
+        return
+    
     # stop concurrent fading threads
     stopConcurrentThreads()
     
-    # next run - update every half an hour
-    activeMainThread = Timer(controller_instance.UpdateFrequency, queueUpdate, (controller_instance, color_mode))
-    activeMainThread.start()
+    # next run - update every half an hour, replacing a next run scheduled by a concurrent cycle
+    with _mainThreadLock:
+        if activeMainThread is not None:
+            activeMainThread.cancel()
+        activeMainThread = Timer(controller_instance.UpdateFrequency, queueUpdate, (controller_instance, color_mode))
+        activeMainThread.start()
     
     #the tasks...
     # update color scale
@@ -68,7 +171,7 @@ def stopConcurrentThreads():
     global activeMainThread
     global activeFadingThread
     
-    print("#### " + str(datetime.now()) + " Stopping concurrent threads")
+    _log.debug("Stopping concurrent threads")
     
     # to be safe... stop concurrent threads
     # TODO only pause main thread if we suspend forecast mode
@@ -77,6 +180,30 @@ def stopConcurrentThreads():
     if activeFadingThread is not None:
         activeFadingThread.cancel()
         activeFadingThread = None
+
+"""
+    will stop all scheduled threads including the regular update, e.g. on shutdown
+"""
+def cancelThreads():
+    global activeMainThread
+    global activeFadingMainThread
+    
+    stopConcurrentThreads()
+    
+    with _mainThreadLock:
+        for thread in (activeMainThread, activeFadingMainThread):
+            if thread is not None:
+                thread.cancel()
+        activeMainThread = None
+        activeFadingMainThread = None
+    
+    _fader.cancel()
+
+"""
+    fades from the current brightness to stopLevel, retargeting a fade in flight, see BrightnessFader.fadeTo
+"""
+def fadeTo(controller_instance, stopLevel, finalDayTimeAdaption = False):
+    _fader.fadeTo(controller_instance, stopLevel, finalDayTimeAdaption)
     
 """
     utility method for separate thread that fades the brightness level in increasing velocity
@@ -109,6 +236,11 @@ def stopConcurrentThreads():
 def fadeBrightness(controller_instance, startLevel, stopLevel, waitTimeMainThread, newMainThread, delta = 0, waitTimeSubThread = 6, finalDayTimeAdaption = False):
     intermediateStepSize = 0.01
     global activeFadingThread
+    global activeFadingMainThread
+    
+    # fading step scheduled before the controller was suspended
+    if controller_instance.isSuspended():
+        return
     
     # define stop criteria
     if abs(startLevel - stopLevel) < intermediateStepSize:
@@ -137,7 +269,7 @@ def fadeBrightness(controller_instance, startLevel, stopLevel, waitTimeMainThrea
     
     # set current brightness
     controller_instance.setBrightness(round(startLevel + delta, 2))
-    #print("{0} - current brightness: {1}".format(datetime.now().strftime("%A, %d. %B %Y %I:%M%p"), round(startLevel + delta, 2)))
+    #_log.debug("current brightness: %s", round(startLevel + delta, 2))
     
     # start intermediate decrease with constant 0.01 step size every 6 seconds
     if startLevel > stopLevel:
@@ -181,7 +313,7 @@ def fadeBrightness(controller_instance, startLevel, stopLevel, waitTimeMainThrea
     if newMainThread == True:
         if startLevel > stopLevel:
             # fading out - decrease brightness by half the distance between current startLevel and stopLevel and cut time by half
-            activeMainThread = Timer(waitTimeMainThread, 
+            activeFadingMainThread = Timer(waitTimeMainThread, 
                                   fadeBrightness,
                                   # parameter list
                                   (controller_instance, 
@@ -193,12 +325,12 @@ def fadeBrightness(controller_instance, startLevel, stopLevel, waitTimeMainThrea
                                    waitTimeSubThread,
                                    finalDayTimeAdaption)
                                   )
-            activeMainThread.start()
+            activeFadingMainThread.start()
             # for testing purpose without threading
             #controller_instance.fadeBrightness(startLevel - ((startLevel - stopLevel) / 2), stopLevel, waitTimeMainThread / 2, True)
         elif startLevel < stopLevel:
             # fading in - decrease brightness by half the distance between current startLevel and stopLevel and cut time by half
-            activeMainThread = Timer(waitTimeMainThread, 
+            activeFadingMainThread = Timer(waitTimeMainThread, 
                                   fadeBrightness,
                                   # parameter list
                                   (controller_instance, 
@@ -209,6 +341,6 @@ def fadeBrightness(controller_instance, startLevel, stopLevel, waitTimeMainThrea
                                    waitTimeSubThread,
                                    finalDayTimeAdaption)
                                   )
-            activeMainThread.start()
+            activeFadingMainThread.start()
             # for testing purpose without threading
             #np.fadeBrightness(startLevel + ((stopLevel - startLevel) / 2), stopLevel, waitTime / 2, True)
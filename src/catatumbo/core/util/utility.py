@@ -3,9 +3,8 @@ Created on 28.12.2019
 
 @author: D040447
 '''
+import os
 import re
-import requests
-import pytz
 
 from datetime import datetime
 
@@ -28,18 +27,28 @@ def numberToBase(n, b):
     https://stackoverflow.com/questions/2311510/getting-a-machines-external-ip-address-with-python
 """
 def getExternalIPAddress():
+    # imported on first use to keep the start up fast
+    import requests
+    
     site = requests.get("http://checkip.dyndns.org/")
     grab = re.findall('([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)', site.text)
     return grab[0]
 
 """
     returns whether a given date is in daylight saving time
+    falls back to the local timezone of the machine if no timezone is defined, e.g. location could not be resolved
     
     https://stackoverflow.com/questions/2881025/python-daylight-savings-time
 """
 def is_dst(dt=None, timezone="UTC"):
+    import pytz
+    
     if dt is None:
         dt = datetime.utcnow()
+    if timezone is None:
+        # see https://stackoverflow.com/questions/2720319/python-figure-out-local-timezone
+        timezone = '/'.join(os.path.realpath('/etc/localtime').split('/')[-2:])
     timezone = pytz.timezone(timezone)
     timezone_aware_date = timezone.localize(dt, is_dst=None)
-    return timezone_aware_date.tzinfo._dst.seconds != 0
\ No newline at end of file
+    # static timezones, e.g. UTC, do not provide dst information via tzinfo._dst
+    return timezone_aware_date.dst().seconds != 0
\ No newline at end of file
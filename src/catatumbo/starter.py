@@ -30,15 +30,21 @@ limitations under the License.
 @deffield    updated: Updated
 '''
 from catatumbo.core.util.cmd_functions import cmd_options
-from catatumbo.controller.forecast.adafruit_forecast import NeoPixelForecast
-from catatumbo.controller.forecast.forecast_colors import ForecastNeoPixelColors
-from catatumbo.core.util.update_thread import queueUpdate
-import catatumbo.core.interceptor.server.configuration_service
+from catatumbo.core.util.update_thread import queueUpdate, cancelThreads, stopConcurrentThreads
+from catatumbo.core.util.configuration_schema import RELOAD_BRIGHTNESS, RELOAD_LOCATION, RELOAD_FORECAST
 
+import logging
+import signal
 import threading
 from catatumbo.core.util.configurations import Configurations
 from catatumbo.core.neopixel_colors import NeoPixelColors
-import neopixel
+from catatumbo.core.util.instrumentation import setEnabled
+from catatumbo.core.util.log import configureLogging, stopLogging
+from catatumbo.core.util import events
+
+
+_log = logging.getLogger(__name__)
+
 
 class CatatumboStart():
     
@@ -53,6 +59,10 @@ class CatatumboStart():
     MODE_SHAREPRICE         = 20
     MODE_ALARM              = 99
     
+    # seconds till a failed initialization of a mode is retried, doubled per failure up to INIT_RETRY_MAX
+    INIT_RETRY_DELAY        = 10
+    INIT_RETRY_MAX          = 300
+    
     """
     OBJECT ATTRIBUTES
     """    
@@ -65,6 +75,15 @@ class CatatumboStart():
     __forecastInstance = None
     __sharepriceInstance = None
     __alarmInstance = None
+    # completes the deferred initialization of the forecast instance
+    __forecastInitThread = None
+    # set once the deferred initialization of the forecast instance succeeded
+    __forecastInitialized = False
+    
+    # set by requestShutdown, e.g. on SIGTERM
+    __shutdownEvent = None
+    # thread running the configuration service
+    __serverThread = None
     
 
     """
@@ -85,11 +104,15 @@ class CatatumboStart():
     def __init__(self, opts = None):
         if opts is not None:
             self.__options = opts
+        if self.__shutdownEvent is None:
+            self.__shutdownEvent = threading.Event()
         
     
     ########################################
     #         WEATHER INSTANCIATION        #
     ########################################
+    # controllers of the modes and the configuration service are imported on first use
+    # so the start up does not wait for dependencies of modes that are never activated
     """
         TODO
     """
@@ -102,11 +125,67 @@ class CatatumboStart():
     def __startWeatherForecastMode(self):
         # create __forecastInstance instance
         if self.__forecastInstance is None:
-            self.__forecastInstance = NeoPixelForecast(color_schema  = ForecastNeoPixelColors)
+            from catatumbo.controller.forecast.adafruit_forecast import NeoPixelForecast
+            from catatumbo.controller.forecast.forecast_colors import ForecastNeoPixelColors
+            
+            # strips show the last frame immediately, location and forecast are resolved in the background
+            self.__forecastInstance = NeoPixelForecast(color_schema  = ForecastNeoPixelColors,
+                                                       deferred      = True)
+            self.__forecastInitThread = threading.Thread(target = self.__initWeatherForecastMode,
+                                                         args   = (self.__forecastInstance,),
+                                                         name   = 'forecast-init',
+                                                         daemon = True)
+            self.__forecastInitThread.start()
+            return
         
+        # warm instance shows its last forecast immediately
+        self.__forecastInstance.resume()
+        
+        # the initialization starts the regular update once it succeeded
+        if self.__forecastInitialized:
+            # start regular update of weather data and brightness adaption if configured
+            threading.Timer(0, queueUpdate, (self.__forecastInstance, self.__getForecastMode())).start()
+    
+    """
+        completes the deferred initialization of the forecast instance and renders the first forecast
+        a failed initialization is retried with increasing delay till it succeeds or shutdown is requested,
+        e.g. if the network is not up yet after booting
+        
+        :param    instance: forecast instance created deferred
+        :type     instance: NeoPixelForecast
+        :param    delay: seconds till the next retry if the initialization fails
+        :type     delay: float
+    """
+    def __initWeatherForecastMode(self, instance, delay = INIT_RETRY_DELAY):
+        if self.__shutdownEvent.is_set():
+            return
+        
+        try:
+            instance.initialize()
+        except Exception:
+            _log.warning("Weather forecast mode could not be initialized, retry in %s seconds", delay, exc_info = True)
+            self.__forecastInitThread = threading.Timer(delay, 
+                                                        self.__initWeatherForecastMode,
+                                                        (instance, min(delay * 2, type(self).INIT_RETRY_MAX)))
+            self.__forecastInitThread.daemon = True
+            self.__forecastInitThread.start()
+            return
+        
+        self.__forecastInitialized = True
+        if self.__shutdownEvent.is_set():
+            return
         
         # start regular update of weather data and brightness adaption if configured
-        queueUpdate(self.__forecastInstance, self.__options.mode)
+        queueUpdate(instance, self.__getForecastMode())
+    
+    """
+        returns the forecast period to be displayed, configured forecast mode overrides command line option
+    """
+    def __getForecastMode(self):
+        mode = Configurations().getForecastMode()
+        if mode is None:
+            mode = self.__options.mode
+        return mode
             
     """
         TODO
@@ -146,6 +225,9 @@ class CatatumboStart():
         else:
             self.__startBasicColorMode()
             self.__activeMode = type(self).MODE_BASICCOLOR
+        
+        # notify live state subscribers
+        events.publish(mode = self.__activeMode)
     
     """
         returns the activated mode
@@ -163,22 +245,105 @@ class CatatumboStart():
         if self.__activeMode == type(self).MODE_WEATHERFORECAST:
             return self.__forecastInstance
         elif self.__activeMode == type(self).MODE_SHAREPRICE:
-            return self.__sharepriceInstanceforecastInstance
+            return self.__sharepriceInstance
         elif self.__activeMode == type(self).MODE_ALARM:
             return self.__alarmInstance
         # if basic color is selected or an invalid value, switch back to basic colors
         else:
             return self.__basiccolorInstance
         
+    """
+        applies a changed configuration to the active mode with a single reload
+        a changed forecast or location causes one update of the forecast including brightness adaption,
+        a changed brightness only causes the brightness adaption
+        
+        :param    reload: parts of the controller to be reloaded, see configuration_schema RELOAD_BRIGHTNESS, RELOAD_LOCATION, RELOAD_FORECAST
+        :type     reload: set
+    """
+    def reloadConfiguration(self, reload):
+        instance = self.getActivedInstance()
+        if instance is None or len(reload) == 0:
+            return
+        
+        if self.__activeMode == type(self).MODE_WEATHERFORECAST and (RELOAD_FORECAST in reload or RELOAD_LOCATION in reload):
+            instance.reloadConfiguration(location = RELOAD_LOCATION in reload)
+            # update restarts the regular update cycle and adapts the brightness, the running cycle is replaced
+            cancelThreads()
+            threading.Timer(0, queueUpdate, (instance, self.__getForecastMode())).start()
+        elif RELOAD_BRIGHTNESS in reload:
+            stopConcurrentThreads()
+            instance.adaptBrightnessToLocalDaytime()
+    
+    """
+        suspends the controller of the active mode and cancels its scheduled updates and fading
+        the controller is kept for a later activation of the mode
+    """
     def __deactiveModeInstance(self):
-        # TODO implement "flush" of current active mode
-        pass
+        instance = self.getActivedInstance()
+        if instance is not None:
+            instance.suspend()
+        
+        cancelThreads()
+    
+    ########################################
+    #         SERVER AND SHUTDOWN          #
+    ########################################
+    """
+        starts the configuration service in a separate thread
+    """
+    def startServer(self):
+        from catatumbo.core.interceptor.server import configuration_service
+        
+        self.__serverThread = threading.Thread(target = configuration_service.startServer,
+                                               name = 'configuration-service')
+        self.__serverThread.start()
+    
+    """
+        requests a graceful shutdown, may be used as signal handler
+    """
+    def requestShutdown(self, *args):
+        self.__shutdownEvent.set()
+    
+    """
+        blocks till shutdown is requested and shuts down afterwards
+    """
+    def waitForShutdown(self):
+        # wait with timeout to allow signal handlers to run in main thread
+        while not self.__shutdownEvent.wait(1):
+            pass
+        self.shutdown()
+    
+    """
+        stops the scheduled updates and fading threads, the configuration service and the logging
+        running requests are completed within the shutdown timeout of the configuration service
+    """
+    def shutdown(self):
+        _log.info("Shutting down")
+        
+        # cancels the scheduled updates and fading threads
+        self.__deactiveModeInstance()
+        
+        # keep the last frame for the next start up
+        instance = self.getActivedInstance()
+        if instance is not None:
+            instance.flushFrame()
+        
+        if self.__serverThread is not None:
+            from catatumbo.core.interceptor.server import configuration_service
+            
+            configuration_service.stopServer()
+            self.__serverThread.join(10)
+            self.__serverThread = None
+        
+        stopLogging()
     
             
 ########################################
 #                MAIN                  #
 ########################################
 if __name__ == '__main__':
+    import catatumbo.starter
+    
     # configuration for multi base example is available via config file
     # only color mode can be selected via cmd line (how about brightness)
     # TODO adapt command line options for later multi mode selection
@@ -187,11 +352,24 @@ if __name__ == '__main__':
                        catatumbo.starter.CatatumboStart.__updated__,
                        par = "extended")
     
-    # start external configuration interceptor
-    # use default configuration: listening externally and on port 8080
-    threading.Thread(target =  catatumbo.core.interceptor.server.configuration_service.startServer).start()
-
+    # non-blocking logging with configured level
+    configureLogging(Configurations().getLogLevel())
+    
+    # collect timing histograms of the hot paths if configured
+    setEnabled(Configurations().isInstrumentationEnabled())
+    
     #event though we have a singleton, python differentiate between __main__.CatatumboStart and catatumbo.starter.CatatumboStart
     ci = catatumbo.starter.CatatumboStart(opts)
+    
+    # graceful shutdown on termination, e.g. by systemd
+    signal.signal(signal.SIGTERM, ci.requestShutdown)
+    signal.signal(signal.SIGINT, ci.requestShutdown)
+    
+    # start external configuration interceptor
+    # use default configuration: listening externally and on port 8080
+    ci.startServer()
+    
     # TODO change standard mode
-    ci.setActiveMode(catatumbo.starter.CatatumboStart.MODE_WEATHERFORECAST)
\ No newline at end of file
+    ci.setActiveMode(catatumbo.starter.CatatumboStart.MODE_WEATHERFORECAST)
+    
+    ci.waitForShutdown()
\ No newline at end of file
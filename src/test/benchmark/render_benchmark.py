@@ -0,0 +1,503 @@
+#!/usr/bin/env python
+# encoding: utf-8
+'''
+Benchmark suite for the render and update hot paths of Catatumbo.
+The benchmarks run on the virtual led backend and on forecasts replayed from test/catatumbo/forecast/fixtures,
+so neither Raspberry, led strip, network nor OWM key is required.
+
+Covered hot paths:
+    multibase.setPixel              NeoPixelMultiBase.setPixel across strip counts
+    multibase.show                  NeoPixelMultiBase.show across strip counts
+    forecast.setPixelBySampleboard  NeoPixelForecast.setPixelBySampleboard for 60 to 50 000 pixels and each MODE_*,
+                                    the continuous color map for MODE_5DAYS_ALL
+    forecast.mapWeatherConditions   classification throughput
+    forecast.fillStrips             latency of fetch, classification and rendering
+    animation.crossfadeFrame        single frame of the crossfade between two forecasts including transfer
+    update.fadeStep                 timing jitter of the brightness fading steps
+    starter.import                  import time of catatumbo.starter in a fresh interpreter
+
+Results are written as JSON to the output file. A previous result file can be passed for comparison,
+regressions beyond the threshold are reported and lead to exit code 1.
+The import of catatumbo.starter has to stay within IMPORT_BUDGET and must not load any of the DEFERRED_MODULES,
+otherwise the budget violation is reported and leads to exit code 1 as well.
+
+Run from the src directory:
+    python3 -m test.benchmark.render_benchmark -o benchmark.json [-c previous.json] [--quick]
+
+@author:     MBizm
+
+@copyright:  2020 organization_name. All rights reserved.
+
+@license:    Apache License 2.0
+
+@deffield    created: October 2026
+@deffield    updated: Updated
+'''
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from datetime import timedelta
+from optparse import OptionParser
+from catatumbo.core.util.configurations import Configurations
+from catatumbo.core.neopixel_multibase import NeoPixelMultiBase
+from catatumbo.controller.forecast.adafruit_forecast import NeoPixelForecast
+from catatumbo.controller.forecast.forecast_colors import ForecastNeoPixelColors
+from catatumbo.controller.forecast.forecast_provider import FileForecastProvider
+from catatumbo.core.util.update_thread import fadeBrightness
+
+__version__ = 0.1
+__updated__ = '2026-10-19'
+
+FIXTURE_DIR     = 'test/catatumbo/forecast/fixtures'
+
+STRIP_COUNTS    = (1, 2, 4, 8)
+STRIP_PIXELS    = 150
+PIXEL_COUNTS    = (60, 300, 1000, 5000, 50000)
+FORECAST_MODES  = (NeoPixelForecast.MODE_TODAY_DAYTIME,
+                   NeoPixelForecast.MODE_TODAY_ALL,
+                   NeoPixelForecast.MODE_TOMORROW_DAYTIME,
+                   NeoPixelForecast.MODE_TOMORROW_ALL,
+                   NeoPixelForecast.MODE_3DAYS_DAYTIME,
+                   NeoPixelForecast.MODE_3DAYS_ALL,
+                   NeoPixelForecast.MODE_5DAYS_DAYTIME,
+                   NeoPixelForecast.MODE_5DAYS_ALL)
+
+# minimum measuring time and repetitions per benchmark
+MIN_TIME        = 0.5
+MIN_REPEAT      = 3
+MAX_REPEAT      = 1000
+
+# relative slow down of the median treated as regression
+REGRESSION_THRESHOLD = 0.2
+
+# maximum import time of catatumbo.starter in seconds and modules that must only be loaded on first use
+IMPORT_BUDGET   = 0.25
+DEFERRED_MODULES = ('flask', 'flask_cors', 'waitress', 'json5', 'pyowm', 'astral', 'ipinfo',
+                    'pytz', 'requests', 'numpy', 'neopixel', 'board')
+IMPORT_REPEAT   = 5
+
+# working directory for configuration and frame ring files
+WORK_DIR        = tempfile.mkdtemp(prefix = 'catatumbo-benchmark-')
+
+
+########################################
+#          UTILITY METHODS             #
+########################################
+"""
+    writes a configuration file for the virtual backend and activates it for all Configurations instances
+
+    :param    strips: list of tuples (pixel number, pixel order) per strip
+    :type     strips: list
+"""
+def configure(strips):
+    config = os.path.join(WORK_DIR, 'BENCHMARKCONFIG.properties')
+
+    with open(config, 'w') as configfile:
+        configfile.write('[Forecast-ProviderData]\n'
+                         'Provider=File\n'
+                         'ReplayDir={0}\n'
+                         '[Forecast-ApplicationData]\n'
+                         'Latitude=52.5244\n'
+                         'Longitude=13.4105\n'
+                         'WinterMode=True\n'
+                         '[GeneralConfiguration]\n'
+                         'AutoBrightnessMAX=0.7\n'
+                         'Backend=virtual\n'
+                         'FrameDir={1}\n'.format(os.path.abspath(FIXTURE_DIR),
+                                                 os.path.join(WORK_DIR, 'frames')))
+        for i, (pixelnum, pixelorder) in enumerate(strips):
+            configfile.write('[Strip{0}]\n'
+                             'PixelPin=D{0}\n'
+                             'PixelNum={1}\n'
+                             'PixelOrder={2}\n'.format(i + 1, pixelnum, pixelorder))
+
+    Configurations.DEFAULT_CONFIG = config
+    Configurations.RUNTIME_CONFIG = os.path.join(WORK_DIR, 'RUNTIMECONFIG.properties')
+    if os.path.exists(Configurations.RUNTIME_CONFIG):
+        os.remove(Configurations.RUNTIME_CONFIG)
+    
+    # strips are shared by all controller instances, the next instance initializes the changed strips
+    NeoPixelMultiBase.releaseStrips()
+
+"""
+    measures a function repeatedly until MIN_TIME and MIN_REPEAT are reached
+
+    :param    func: function to be measured
+    :type     func: callable
+    :param    minTime: minimum measuring time in seconds
+    :type     minTime: float
+    :returns: list of durations in seconds
+"""
+def measure(func, minTime = MIN_TIME):
+    samples = []
+    start = time.perf_counter()
+
+    while len(samples) < MAX_REPEAT and \
+          (len(samples) < MIN_REPEAT or time.perf_counter() - start < minTime):
+        t = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t)
+
+    return samples
+
+"""
+    condenses samples into a result entry
+
+    :param    name: name of the benchmark
+    :type     name: str
+    :param    params: parameters of the benchmark run
+    :type     params: dict
+    :param    samples: measured values
+    :type     samples: list
+    :param    unit: unit of the samples
+    :type     unit: str
+    :param    extra: additional values for the result entry
+    :type     extra: dict
+"""
+def result(name, params, samples, unit = 's', extra = None):
+    ordered = sorted(samples)
+    entry = {"name"     : name,
+             "params"   : params,
+             "unit"     : unit,
+             "n"        : len(samples),
+             "mean"     : statistics.mean(samples),
+             "median"   : statistics.median(samples),
+             "p95"      : ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+             "min"      : ordered[0],
+             "max"      : ordered[-1],
+             "stdev"    : statistics.stdev(samples) if len(samples) > 1 else 0.0}
+    if extra is not None:
+        entry.update(extra)
+
+    print('{0:34} {1:40} median {2:12.6f}{3} p95 {4:12.6f}{3} (n={5})'.format(
+        name, json.dumps(params), entry['median'], unit, entry['p95'], entry['n']))
+    return entry
+
+def createForecast():
+    return NeoPixelForecast(color_schema        = ForecastNeoPixelColors,
+                            forecast_provider   = FileForecastProvider(FIXTURE_DIR))
+
+"""
+    prepares the sampleboard and mask for a forecast mode the same way as NeoPixelForecast.fillStrips
+"""
+def prepareSampleboard(instance, forecast, color_mode):
+    offset = int(forecast.when_starts('date').hour / 3)
+    mask = instance._getMask(color_mode, offset)
+    sampleboard = {}
+    pos = 1 << offset
+    index = 0
+    cdate = forecast.when_starts('date')
+
+    for weather in forecast.get_forecast():
+        if (mask & pos) > 0:
+            sampleboard = instance._fillSampleBoard(cdate, index, sampleboard, weather)
+            index = index + 1
+        pos = pos << 1
+        cdate = cdate + timedelta(hours=3)
+
+    return sampleboard, (mask >> offset) & 0xFFFFFFFFFF
+
+
+########################################
+#             BENCHMARKS               #
+########################################
+def benchmarkMultiBase(quick):
+    results = []
+
+    for count in (STRIP_COUNTS[:2] if quick else STRIP_COUNTS):
+        configure([(STRIP_PIXELS, 'GRBW' if i % 2 == 0 else 'GRB') for i in range(count)])
+        instance = NeoPixelMultiBase(color_schema = ForecastNeoPixelColors)
+        numPixels = instance.getNumPixels()
+        color = ForecastNeoPixelColors.W_RED
+
+        def setAllPixels():
+            for i in range(numPixels):
+                instance.setPixel(i, color)
+
+        samples = measure(setAllPixels)
+        results.append(result('multibase.setPixel',
+                              {"strips" : count, "pixels" : numPixels},
+                              [s / numPixels for s in samples]))
+
+        samples = measure(instance.show)
+        results.append(result('multibase.show',
+                              {"strips" : count, "pixels" : numPixels},
+                              samples))
+
+    return results
+
+def benchmarkSetPixelBySampleboard(quick):
+    results = []
+    forecast = FileForecastProvider(FIXTURE_DIR).getForecast()
+
+    for pixels in (PIXEL_COUNTS[:2] if quick else PIXEL_COUNTS):
+        configure([(pixels, 'GRBW')])
+        instance = createForecast()
+
+        for color_mode in FORECAST_MODES:
+            sampleboard, mask = prepareSampleboard(instance, forecast, color_mode)
+            if len(sampleboard) == 0:
+                continue
+
+            samples = measure(lambda: instance.setPixelBySampleboard(sampleboard, mask),
+                              MIN_TIME / 4 if pixels > 5000 else MIN_TIME)
+            results.append(result('forecast.setPixelBySampleboard',
+                                  {"pixels" : pixels, "mode" : color_mode, "slots" : len(sampleboard)},
+                                  samples))
+
+        # gradients across all slots of the longest forecast period
+        sampleboard, mask = prepareSampleboard(instance, forecast, NeoPixelForecast.MODE_5DAYS_ALL)
+        instance.colorMap = NeoPixelForecast.COLORMAP_CONTINUOUS
+        samples = measure(lambda: instance.setPixelBySampleboard(sampleboard, mask),
+                          MIN_TIME / 4 if pixels > 5000 else MIN_TIME)
+        results.append(result('forecast.setPixelBySampleboard',
+                              {"pixels" : pixels, "mode" : NeoPixelForecast.MODE_5DAYS_ALL, "slots" : len(sampleboard),
+                               "colormap" : NeoPixelForecast.COLORMAP_CONTINUOUS},
+                              samples))
+
+    return results
+
+def benchmarkMapWeatherConditions(quick):
+    configure([(STRIP_PIXELS, 'GRBW')])
+    instance = createForecast()
+    forecast = FileForecastProvider(FIXTURE_DIR).getForecast()
+    cdate = forecast.when_starts('date')
+    weathers = [(w.get_temperature(unit='celsius')['temp'],
+                 w.get_clouds(),
+                 0 if len(w.get_rain()) == 0 else list(w.get_rain().values())[0],
+                 cdate,
+                 w.get_weather_code(),
+                 len(w.get_snow()) > 0,
+                 w.get_wind()['speed'],
+                 w.get_humidity(),
+                 w.get_pressure()['press']) for w in forecast.get_forecast()]
+
+    def classify():
+        for weather in weathers:
+            instance.mapWeatherConditions(*weather)
+
+    samples = measure(classify)
+    return [result('forecast.mapWeatherConditions',
+                   {"conditions" : len(weathers)},
+                   [len(weathers) / s for s in samples],
+                   unit = '/s')]
+
+def benchmarkFillStrips(quick):
+    results = []
+
+    for pixels in ((300,) if quick else (300, 5000)):
+        configure([(pixels, 'GRBW')])
+        instance = createForecast()
+
+        for color_mode in (NeoPixelForecast.MODE_TODAY_ALL, NeoPixelForecast.MODE_5DAYS_ALL):
+            samples = measure(lambda: instance.fillStrips(color_mode))
+            results.append(result('forecast.fillStrips',
+                                  {"pixels" : pixels, "mode" : color_mode},
+                                  samples))
+
+    return results
+
+"""
+    measures single frames of the crossfade from one forecast to another, driven without the frame clock of the animator
+    the result entry lists the frame budget of the configured animation frame rate
+"""
+def benchmarkCrossfadeFrame(quick):
+    results = []
+    forecast = FileForecastProvider(FIXTURE_DIR).getForecast()
+
+    for pixels in (PIXEL_COUNTS[:2] if quick else PIXEL_COUNTS[:3]):
+        configure([(pixels, 'GRBW')])
+        instance = createForecast()
+        first, _ = prepareSampleboard(instance, forecast, NeoPixelForecast.MODE_TODAY_ALL)
+        second, _ = prepareSampleboard(instance, forecast, NeoPixelForecast.MODE_5DAYS_ALL)
+
+        # frames are driven by the benchmark instead of the animator
+        instance.getAnimator().pause()
+        instance.setPixelBySampleboard(first, -1)
+        instance.setPixelBySampleboard(second, -1)
+        transition = instance.getLayerStack().getLayer(type(instance).__name__ + '.transition')
+
+        opacity = [1.0]
+        def crossfadeFrame():
+            opacity[0] = opacity[0] - 0.01 if opacity[0] > 0.01 else 1.0
+            transition.setOpacity(opacity[0])
+            instance.present()
+
+        samples = measure(crossfadeFrame)
+        results.append(result('animation.crossfadeFrame',
+                              {"pixels" : pixels},
+                              samples,
+                              extra = {"budget" : 1.0 / Configurations().getAnimationFPS()}))
+
+    return results
+
+def benchmarkFadeJitter(quick):
+    configure([(STRIP_PIXELS, 'GRBW'), (STRIP_PIXELS, 'GRB')])
+    instance = NeoPixelMultiBase(color_schema = ForecastNeoPixelColors)
+    instance.setBrightness(0.2)
+
+    # record the point in time of each fading step
+    timestamps = []
+    setBrightness = instance.setBrightness
+    def recordBrightness(brightness):
+        timestamps.append(time.perf_counter())
+        setBrightness(brightness)
+    instance.setBrightness = recordBrightness
+
+    step = 0.02
+    fadeBrightness(controller_instance   = instance,
+                   startLevel            = 0.2,
+                   stopLevel             = 0.9,
+                   waitTimeMainThread    = step,
+                   newMainThread         = False,
+                   delta                 = 0.05,
+                   waitTimeSubThread     = step)
+
+    # wait for the fading threads to reach the stop level
+    deadline = time.perf_counter() + 10
+    while abs(instance.getBrightness() - 0.9) > 0.001 and time.perf_counter() < deadline:
+        time.sleep(step)
+
+    jitter = [abs((timestamps[i] - timestamps[i - 1]) - step) for i in range(1, len(timestamps))]
+    return [result('update.fadeStep',
+                   {"interval" : step, "steps" : len(timestamps)},
+                   jitter)]
+
+"""
+    imports catatumbo.starter in fresh interpreters, so already loaded modules of the other benchmarks do not hide costs
+    the result entry lists the deferred modules loaded by the import
+"""
+def benchmarkImportTime(quick):
+    script = ('import sys, time, json\n'
+              't = time.perf_counter()\n'
+              'import catatumbo.starter\n'
+              't = time.perf_counter() - t\n'
+              'print(json.dumps({{"time" : t, "loaded" : [m for m in {0!r} if m in sys.modules]}}))\n').format(DEFERRED_MODULES)
+
+    samples = []
+    loaded = set()
+    for _ in range(2 if quick else IMPORT_REPEAT):
+        output = json.loads(subprocess.check_output([sys.executable, '-c', script]).decode().splitlines()[-1])
+        samples.append(output['time'])
+        loaded.update(output['loaded'])
+
+    return [result('starter.import',
+                   {"budget" : IMPORT_BUDGET},
+                   samples,
+                   extra = {"loaded" : sorted(loaded)})]
+
+
+########################################
+#         RESULT HANDLING              #
+########################################
+def revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr = subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+"""
+    compares the medians of the current results with a previous result file
+
+    :returns: list of regressions
+"""
+def compare(results, previousFile, threshold = REGRESSION_THRESHOLD):
+    with open(previousFile, 'r') as previous:
+        baseline = {(r['name'], json.dumps(r['params'], sort_keys = True)) : r for r in json.load(previous)['results']}
+
+    regressions = []
+    for r in results:
+        base = baseline.get((r['name'], json.dumps(r['params'], sort_keys = True)))
+        if base is None or base['median'] == 0:
+            continue
+
+        # throughput values regress by decreasing, durations by increasing
+        change = (r['median'] - base['median']) / base['median']
+        if r['unit'].startswith('/'):
+            change = -change
+        if change > threshold:
+            regressions.append({"name"      : r['name'],
+                                "params"    : r['params'],
+                                "baseline"  : base['median'],
+                                "current"   : r['median'],
+                                "change"    : change})
+            print('REGRESSION {0} {1}: {2:.6f} -> {3:.6f} ({4:+.0%})'.format(
+                r['name'], json.dumps(r['params']), base['median'], r['median'], change))
+
+    return regressions
+
+"""
+    checks the import time of catatumbo.starter against IMPORT_BUDGET and for eagerly loaded DEFERRED_MODULES
+
+    :returns: list of budget violations
+"""
+def checkImportBudget(results, budget = IMPORT_BUDGET):
+    violations = []
+    for r in results:
+        if r['name'] != 'starter.import':
+            continue
+
+        if r['median'] > budget:
+            violations.append({"name"       : r['name'],
+                               "budget"     : budget,
+                               "current"    : r['median']})
+            print('BUDGET {0}: {1:.6f}s exceeds {2:.6f}s'.format(r['name'], r['median'], budget))
+        if len(r['loaded']) > 0:
+            violations.append({"name"       : r['name'],
+                               "loaded"     : r['loaded']})
+            print('BUDGET {0}: eagerly loaded {1}'.format(r['name'], ', '.join(r['loaded'])))
+
+    return violations
+
+
+########################################
+#                MAIN                  #
+########################################
+BENCHMARKS = (benchmarkMultiBase,
+              benchmarkSetPixelBySampleboard,
+              benchmarkMapWeatherConditions,
+              benchmarkFillStrips,
+              benchmarkCrossfadeFrame,
+              benchmarkFadeJitter,
+              benchmarkImportTime)
+
+if __name__ == '__main__':
+    parser = OptionParser(version = '%%prog v%s (%s)' % (__version__, __updated__))
+    parser.add_option("-o", "--output", dest="output", help="result file in JSON format [default: %default]")
+    parser.add_option("-c", "--compare", dest="compare", help="previous result file for regression comparison")
+    parser.add_option("-q", "--quick", dest="quick", action="store_true", help="reduced set of parameters for smoke runs")
+    parser.set_defaults(output="benchmark.json", quick=False)
+    (opts, args) = parser.parse_args()
+
+    results = []
+    for benchmark in BENCHMARKS:
+        results.extend(benchmark(opts.quick))
+
+    report = {"version"     : __version__,
+              "revision"    : revision(),
+              "timestamp"   : time.strftime('%Y-%m-%dT%H:%M:%S'),
+              "python"      : platform.python_version(),
+              "machine"     : platform.machine(),
+              "platform"    : platform.platform(),
+              "quick"       : opts.quick,
+              "results"     : results}
+
+    regressions = []
+    if opts.compare is not None:
+        regressions = compare(results, opts.compare)
+        report["regressions"] = regressions
+
+    violations = checkImportBudget(results)
+    report["violations"] = violations
+
+    with open(opts.output, 'w') as output:
+        json.dump(report, output, indent = 1)
+
+    sys.exit(1 if len(regressions) > 0 or len(violations) > 0 else 0)